@@ -0,0 +1,192 @@
+// Minimal msgpack codec for the game WebSocket (game.msgpack.v1), served with the other
+// static files instead of from a CDN. Exposes MessagePack.encode and MessagePack.decode
+// for nil, booleans, integers, floats, strings, binaries, arrays and maps; ext types are
+// not used by the protocol and are rejected.
+(function (global) {
+    'use strict';
+
+    const textEncoder = new TextEncoder();
+    const textDecoder = new TextDecoder();
+
+    function decode(bytes) {
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        let offset = 0;
+
+        function string(length) {
+            const value = textDecoder.decode(bytes.subarray(offset, offset + length));
+            offset += length;
+            return value;
+        }
+
+        function binary(length) {
+            const value = bytes.slice(offset, offset + length);
+            offset += length;
+            return value;
+        }
+
+        function array(length) {
+            const value = new Array(length);
+            for (let index = 0; index < length; index++) {
+                value[index] = read();
+            }
+            return value;
+        }
+
+        function map(length) {
+            const value = {};
+            for (let index = 0; index < length; index++) {
+                const key = read();
+                value[key] = read();
+            }
+            return value;
+        }
+
+        function uint64() {
+            const value = view.getBigUint64(offset);
+            offset += 8;
+            return Number(value);
+        }
+
+        function int64() {
+            const value = view.getBigInt64(offset);
+            offset += 8;
+            return Number(value);
+        }
+
+        function read() {
+            if (offset >= bytes.length) {
+                throw new RangeError('msgpack: unexpected end of data');
+            }
+            const type = bytes[offset++];
+            let value;
+
+            if (type <= 0x7f) return type;
+            if (type <= 0x8f) return map(type & 0x0f);
+            if (type <= 0x9f) return array(type & 0x0f);
+            if (type <= 0xbf) return string(type & 0x1f);
+            if (type >= 0xe0) return type - 0x100;
+
+            switch (type) {
+                case 0xc0: return null;
+                case 0xc2: return false;
+                case 0xc3: return true;
+                case 0xc4: value = view.getUint8(offset); offset += 1; return binary(value);
+                case 0xc5: value = view.getUint16(offset); offset += 2; return binary(value);
+                case 0xc6: value = view.getUint32(offset); offset += 4; return binary(value);
+                case 0xca: value = view.getFloat32(offset); offset += 4; return value;
+                case 0xcb: value = view.getFloat64(offset); offset += 8; return value;
+                case 0xcc: value = view.getUint8(offset); offset += 1; return value;
+                case 0xcd: value = view.getUint16(offset); offset += 2; return value;
+                case 0xce: value = view.getUint32(offset); offset += 4; return value;
+                case 0xcf: return uint64();
+                case 0xd0: value = view.getInt8(offset); offset += 1; return value;
+                case 0xd1: value = view.getInt16(offset); offset += 2; return value;
+                case 0xd2: value = view.getInt32(offset); offset += 4; return value;
+                case 0xd3: return int64();
+                case 0xd9: value = view.getUint8(offset); offset += 1; return string(value);
+                case 0xda: value = view.getUint16(offset); offset += 2; return string(value);
+                case 0xdb: value = view.getUint32(offset); offset += 4; return string(value);
+                case 0xdc: value = view.getUint16(offset); offset += 2; return array(value);
+                case 0xdd: value = view.getUint32(offset); offset += 4; return array(value);
+                case 0xde: value = view.getUint16(offset); offset += 2; return map(value);
+                case 0xdf: value = view.getUint32(offset); offset += 4; return map(value);
+            }
+            throw new TypeError(`msgpack: unsupported type 0x${type.toString(16)}`);
+        }
+
+        const value = read();
+        if (offset !== bytes.length) {
+            throw new RangeError('msgpack: trailing data');
+        }
+        return value;
+    }
+
+    function encode(value) {
+        const chunks = [];
+
+        function push(type, size, write) {
+            const chunk = new DataView(new ArrayBuffer(1 + size));
+            chunk.setUint8(0, type);
+            if (write) {
+                write(chunk);
+            }
+            chunks.push(new Uint8Array(chunk.buffer));
+        }
+
+        function header(length, fix, fixMax, type16, type32, type8) {
+            if (length <= fixMax) {
+                push(fix | length, 0);
+            } else if (type8 !== undefined && length <= 0xff) {
+                push(type8, 1, chunk => chunk.setUint8(1, length));
+            } else if (length <= 0xffff) {
+                push(type16, 2, chunk => chunk.setUint16(1, length));
+            } else {
+                push(type32, 4, chunk => chunk.setUint32(1, length));
+            }
+        }
+
+        function integer(number) {
+            if (number >= 0) {
+                if (number <= 0x7f) push(number, 0);
+                else if (number <= 0xff) push(0xcc, 1, chunk => chunk.setUint8(1, number));
+                else if (number <= 0xffff) push(0xcd, 2, chunk => chunk.setUint16(1, number));
+                else if (number <= 0xffffffff) push(0xce, 4, chunk => chunk.setUint32(1, number));
+                else push(0xcf, 8, chunk => chunk.setBigUint64(1, BigInt(number)));
+            } else {
+                if (number >= -0x20) push(number & 0xff, 0);
+                else if (number >= -0x80) push(0xd0, 1, chunk => chunk.setInt8(1, number));
+                else if (number >= -0x8000) push(0xd1, 2, chunk => chunk.setInt16(1, number));
+                else if (number >= -0x80000000) push(0xd2, 4, chunk => chunk.setInt32(1, number));
+                else push(0xd3, 8, chunk => chunk.setBigInt64(1, BigInt(number)));
+            }
+        }
+
+        function write(item) {
+            if (item === null || item === undefined) {
+                push(0xc0, 0);
+            } else if (item === false || item === true) {
+                push(item ? 0xc3 : 0xc2, 0);
+            } else if (typeof item === 'number') {
+                if (Number.isSafeInteger(item)) {
+                    integer(item);
+                } else {
+                    push(0xcb, 8, chunk => chunk.setFloat64(1, item));
+                }
+            } else if (typeof item === 'string') {
+                const encoded = textEncoder.encode(item);
+                header(encoded.length, 0xa0, 0x1f, 0xda, 0xdb, 0xd9);
+                chunks.push(encoded);
+            } else if (item instanceof Uint8Array) {
+                if (item.length <= 0xff) push(0xc4, 1, chunk => chunk.setUint8(1, item.length));
+                else if (item.length <= 0xffff) push(0xc5, 2, chunk => chunk.setUint16(1, item.length));
+                else push(0xc6, 4, chunk => chunk.setUint32(1, item.length));
+                chunks.push(item);
+            } else if (Array.isArray(item)) {
+                header(item.length, 0x90, 0x0f, 0xdc, 0xdd);
+                item.forEach(write);
+            } else if (typeof item === 'object') {
+                const keys = Object.keys(item);
+                header(keys.length, 0x80, 0x0f, 0xde, 0xdf);
+                for (const key of keys) {
+                    write(key);
+                    write(item[key]);
+                }
+            } else {
+                throw new TypeError(`msgpack: can not encode ${typeof item}`);
+            }
+        }
+
+        write(value);
+
+        const length = chunks.reduce((total, chunk) => total + chunk.length, 0);
+        const bytes = new Uint8Array(length);
+        let offset = 0;
+        for (const chunk of chunks) {
+            bytes.set(chunk, offset);
+            offset += chunk.length;
+        }
+        return bytes;
+    }
+
+    global.MessagePack = {encode: encode, decode: decode};
+})(window);
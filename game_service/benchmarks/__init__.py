@@ -0,0 +1,27 @@
+import os
+import sys
+from pathlib import Path
+
+import django
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    """Configures the game service settings without Redis, channels or the users service."""
+    if str(SERVICE_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVICE_DIR))
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'game_service.settings')
+    os.environ.setdefault('GAME_SERVICE_SECRET_KEY', 'benchmark-secret-key')
+    os.environ.setdefault('DEBUG', 'False')
+    os.environ.setdefault('RUNNING', 'local')
+    os.environ.setdefault('GAME_SERVICE_HOST', '127.0.0.3')
+    os.environ.setdefault('GAME_SERVICE_PORT', '8003')
+    os.environ.setdefault('USERS_SERVICE_HOST', '127.0.0.2')
+    os.environ.setdefault('USERS_SERVICE_PORT', '8002')
+    os.environ.setdefault('REDIS_HOST', 'localhost')
+    os.environ.setdefault('REDIS_PORT', '6379')
+
+    django.setup()
@@ -0,0 +1,87 @@
+"""
+Throughput of bot-only games driven by BotPool, on one core.
+
+Plays bot versus bot games concurrently in one event loop, without Redis, channels or
+the users service, and reports finished games and turns per second.
+
+Usage (from the game_service directory):
+    python -m benchmarks.bench_bots                                  # 2000 games, 500 at a time
+    python -m benchmarks.bench_bots --games 10000 --concurrency 2000
+    python -m benchmarks.bench_bots --think-time 0.01 0.05           # bots think before acting
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from benchmarks import setup_django
+
+setup_django()
+
+from game_app.game import game as game_module  # noqa: E402
+from game_app.game.ai_logic import Bot  # noqa: E402
+from game_app.game.bot_pool import BotPool  # noqa: E402
+from game_app.game.game import Game  # noqa: E402
+from benchmarks.bench_engine import StubUsersManager  # noqa: E402
+
+
+async def play_game(seed: int) -> int:
+    game = Game()
+    for slot in (1, 2):
+        bot = Bot(seed=f'{seed}:{slot}')
+        bot.name = f'Bot{slot}'
+        await game.set_character(bot)
+    await game.game_task
+    return game.turn_number
+
+
+async def play(games: int, concurrency: int) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(seed: int) -> int:
+        async with semaphore:
+            return await play_game(seed)
+
+    return sum(await asyncio.gather(*(limited(seed) for seed in range(games))))
+
+
+def run(games: int, concurrency: int, think_time: tuple) -> dict:
+    logging.getLogger('game_server').setLevel(logging.WARNING)
+    original_users_manager = game_module.AsyncUsersManager
+    game_module.AsyncUsersManager = StubUsersManager
+    BotPool.MIN_THINK_TIME, BotPool.MAX_THINK_TIME = think_time
+    try:
+        started = time.perf_counter()
+        turns = asyncio.run(play(games, concurrency))
+        elapsed = time.perf_counter() - started
+    finally:
+        game_module.AsyncUsersManager = original_users_manager
+        BotPool.reset()
+
+    return {
+        'games': games,
+        'concurrency': concurrency,
+        'think_time': list(think_time),
+        'seconds': round(elapsed, 3),
+        'games_per_second': round(games / elapsed, 1),
+        'turns_per_second': round(turns / elapsed, 1),
+        'turns_per_game': round(turns / games, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Bot-only game throughput')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--think-time', type=float, nargs=2, default=(0.0, 0.0), metavar=('MIN', 'MAX'),
+                        help='Seconds a bot thinks before acting')
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.games, args.concurrency, tuple(args.think_time)), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Microbenchmarks for the fight engine hot path.
+
+Runs without Redis, channels or HTTP: observers are stubs, AsyncUsersManager is replaced
+by a no-op and the turn scheduler runs on a fake clock.
+
+Usage (from the game_service directory):
+    python -m benchmarks.bench_engine                      # run and print JSON
+    python -m benchmarks.bench_engine --compare            # compare with the stored baseline
+    python -m benchmarks.bench_engine --update-baseline    # store the results as the new baseline
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from benchmarks import setup_django
+
+setup_django()
+
+from game_app.game import game as game_module  # noqa: E402
+from game_app.game.actions import Action, ActionsFactory, ResolutionTable  # noqa: E402
+from game_app.game.ai_logic import Bot  # noqa: E402
+from game_app.game.characters import make_character  # noqa: E402
+from game_app.game.game import Game, Character  # noqa: E402
+from game_app.game.scheduler import TurnScheduler  # noqa: E402
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_THRESHOLD = 0.25
+
+
+class StubUsersManager:
+    async def report_match(self, match):
+        pass
+
+
+class StubObserver:
+    async def send_start(self, message):
+        pass
+
+    async def send_turn(self, message):
+        pass
+
+    async def send_timer(self, message):
+        pass
+
+    async def send_game_result(self, message):
+        pass
+
+
+class ScriptedPlayer(StubObserver):
+    """
+    Picks its next action as soon as a turn is broadcast, like a fast client, and
+    acknowledges every version so it gets turn deltas between keyframes.
+    """
+    CYCLE = ('feint', 'rest', 'feint', 'defence')
+
+    def __init__(self, character: Character) -> None:
+        self.character = character
+        self.turn = 0
+        self.acked_version = None
+
+    def act(self) -> None:
+        self.character.get_actions()
+        self.character.set_action(self.CYCLE[self.turn % len(self.CYCLE)])
+        self.turn += 1
+
+    async def send_start(self, message):
+        self.acked_version = message['version']
+        self.act()
+
+    async def send_turn(self, message):
+        self.acked_version = message['version']
+        self.act()
+
+
+async def fake_clock_run(scheduler: TurnScheduler) -> None:
+    """Replacement for TurnScheduler.run that advances the wheel without sleeping."""
+    try:
+        while scheduler.active:
+            await asyncio.sleep(0)
+            scheduler.tick()
+    finally:
+        scheduler.loop_task = None
+
+
+def measure(func: Callable[[], None], number: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter_ns() - started) / number)
+
+    return {
+        'number': number,
+        'repeat': repeat,
+        'ns_per_op_min': round(min(timings), 1),
+        'ns_per_op_median': round(statistics.median(timings), 1),
+    }
+
+
+def bench_resolve_actions(number: int, repeat: int) -> dict:
+    left = ActionsFactory.create_action(action_name='attack', energy_cost=20, action_power=20)
+    right = ActionsFactory.create_action(action_name='defence', energy_cost=20, action_power=0)
+    return measure(lambda: Action.resolve_actions(left, right), number, repeat)
+
+
+def bench_resolution_table(number: int, repeat: int) -> dict:
+    left = ActionsFactory.create_action(action_name='attack', energy_cost=20, action_power=20)
+    right = ActionsFactory.create_action(action_name='defence', energy_cost=20, action_power=0)
+    return measure(lambda: ResolutionTable.resolve(left, right), number, repeat)
+
+
+def bench_set_get_action(number: int, repeat: int) -> dict:
+    character = make_character('p1')
+    character.get_actions()
+
+    def run():
+        character.set_action('feint')
+        character.get_action()
+
+    return measure(run, number, repeat)
+
+
+def bench_game_turn(number: int, repeat: int) -> dict:
+    game = Game()
+    game.characters[1] = make_character('p1', endurance=10 ** 6)
+    game.characters[2] = make_character('p2', endurance=10 ** 6)
+
+    def run():
+        for character in game.characters.values():
+            character.get_actions()
+            character.set_action('attack')
+        game.turn()
+
+    return measure(run, number, repeat)
+
+
+def bench_bot_make_move(number: int, repeat: int) -> dict:
+    bot = Bot()
+    opponent = make_character('p1')
+    bot.status = bot.get_status()
+    bot.opponent_status = opponent.get_status()
+    return measure(bot.make_move, number, repeat)
+
+
+def run_game(scripted: bool) -> None:
+    async def play():
+        game = Game()
+        for name in ('p1', 'p2'):
+            character = make_character(name, endurance=10 ** 6)
+            game.set_observer(ScriptedPlayer(character) if scripted else StubObserver())
+            await game.set_character(character)
+        await game.game_task
+
+    asyncio.run(play())
+
+
+def bench_game_start(number: int, repeat: int, scripted: bool) -> dict:
+    original_run = TurnScheduler.run
+    original_users_manager = game_module.AsyncUsersManager
+    TurnScheduler.run = fake_clock_run
+    game_module.AsyncUsersManager = StubUsersManager
+    try:
+        return measure(lambda: run_game(scripted), number, repeat)
+    finally:
+        TurnScheduler.run = original_run
+        TurnScheduler.reset()
+        game_module.AsyncUsersManager = original_users_manager
+
+
+BENCHMARKS: dict[str, Callable[[int, int], dict]] = {
+    'action_resolve_actions': bench_resolve_actions,
+    'action_resolution_table': bench_resolution_table,
+    'character_set_get_action': bench_set_get_action,
+    'game_turn': bench_game_turn,
+    'bot_make_move': bench_bot_make_move,
+    'game_start_100_turns': lambda number, repeat: bench_game_start(number, repeat, scripted=True),
+    'game_start_100_timeouts': lambda number, repeat: bench_game_start(number, repeat, scripted=False),
+}
+
+ITERATIONS: dict[str, int] = {
+    'action_resolve_actions': 20000,
+    'action_resolution_table': 20000,
+    'character_set_get_action': 20000,
+    'game_turn': 10000,
+    'bot_make_move': 10000,
+    'game_start_100_turns': 20,
+    'game_start_100_timeouts': 5,
+}
+
+
+def run_benchmarks(selected: list, repeat: int, scale: float) -> dict:
+    logging.getLogger('game_server').setLevel(logging.WARNING)
+
+    results = {}
+    for name in selected:
+        number = max(1, int(ITERATIONS[name] * scale))
+        results[name] = BENCHMARKS[name](number, repeat)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> tuple[list, bool]:
+    """
+    Compares the best timings with the baseline; the minimum is the least noisy estimate.
+
+    Returns report rows and whether any benchmark regressed by more than threshold.
+    """
+    rows = []
+    regressed = False
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append({'benchmark': name, 'status': 'new'})
+            continue
+
+        ratio = result['ns_per_op_min'] / base['ns_per_op_min']
+        status = 'ok'
+        if ratio > 1 + threshold:
+            status = 'regression'
+            regressed = True
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+
+        rows.append({
+            'benchmark': name,
+            'baseline_ns': base['ns_per_op_min'],
+            'current_ns': result['ns_per_op_min'],
+            'ratio': round(ratio, 3),
+            'status': status,
+        })
+
+    return rows, regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Fight engine microbenchmarks')
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS), help='Benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for iteration counts')
+    parser.add_argument('--output', type=Path, default=None, help='Write results JSON to this file')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH)
+    parser.add_argument('--compare', action='store_true', help='Compare with the baseline, exit 1 on regression')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    current = run_benchmarks(args.benchmarks, args.repeat, args.scale)
+    output = {'current': current}
+    exit_code = 0
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        rows, regressed = compare(current, baseline, args.threshold)
+        output['comparison'] = rows
+        exit_code = int(regressed)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2) + '\n')
+
+    text = json.dumps(output, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n')
+    print(text)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
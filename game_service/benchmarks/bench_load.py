@@ -0,0 +1,470 @@
+"""
+In-process load test of the ASGI application.
+
+Runs game_service.asgi.application in this process on an in-memory channel layer, an
+in-memory Redis and a stub users service, and drives simulated players through the whole
+flow over raw ASGI websocket events: the global lobby, /search, the game_match invite,
+the game socket and every turn until the game result.
+
+Turn latency is measured from the later of the two actions of a turn until the turn frame
+reaches a client, so it covers the consumers, turn resolution, snapshots and broadcasting.
+Redis and the users service answer instantly here, so the numbers are the cost of the
+service itself on one core, before any network round trip.
+
+Usage (from the game_service directory):
+    python -m benchmarks.bench_load                           # 200 players, 100 games
+    python -m benchmarks.bench_load --players 2000 --ramp 10  # players arrive over 10 seconds
+    python -m benchmarks.bench_load --strategy rest           # every game lasts Game.MAX_TURNS turns
+    python -m benchmarks.bench_load --msgpack                 # binary frames
+"""
+import argparse
+import asyncio
+import fnmatch
+import itertools
+import json
+import logging
+import random
+import resource
+import statistics
+import sys
+import time
+from unittest import mock
+
+import msgpack
+from asgiref.testing import ApplicationCommunicator
+
+from benchmarks import setup_django
+
+setup_django()
+
+from django.test import override_settings  # noqa: E402
+
+from game_app.game import protocol  # noqa: E402
+from game_app.game.game import Game, GameHandler, GameState  # noqa: E402
+from game_app.game.game_searching import GameSearching  # noqa: E402
+from game_app.game.leases import GameLeases  # noqa: E402
+from game_app.game.outbox import ResultsPublisher  # noqa: E402
+from game_app.utils import GamesManager, RedisServer  # noqa: E402
+from game_service.asgi import application  # noqa: E402
+
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+RECEIVE_TIMEOUT = Game.TURN_TIME + 10  # Seconds a client waits for the next frame
+
+
+def to_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode('utf-8')
+
+
+class InMemoryRedis:
+    """
+    The subset of the redis.Redis client used by RedisServer, kept in dicts.
+
+    Values are returned as bytes like redis-py does; expiry and stream trimming are ignored.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.data: dict = {}
+        self.stream_ids = itertools.count(1)
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = to_bytes(value)
+        return True
+
+    def eval(self, script, numkeys, *args):
+        """Runs the lease scripts of RedisServer; other scripts are not supported."""
+        keys, (owner, *_) = args[:numkeys], args[numkeys:]
+        owned = [self.data.get(key) == to_bytes(owner) for key in keys]
+        if script == RedisServer.REFRESH_LEASES_SCRIPT:
+            return [int(value) for value in owned]
+        if script == RedisServer.RELEASE_LEASE_SCRIPT:
+            return self.delete(keys[0]) if owned[0] else 0
+        raise NotImplementedError('Unknown script')
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def incrby(self, key, amount=1):
+        value = int(self.data.get(key, b'0')) + amount
+        self.data[key] = to_bytes(value)
+        return value
+
+    def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(to_bytes(value) for value in values)
+        return len(items)
+
+    def ltrim(self, key, start, end):
+        items = self.data.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        self.data[key] = items[start:end] if start >= 0 else items[max(0, len(items) + start):end]
+        return True
+
+    def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def zadd(self, key, mapping):
+        members = self.data.setdefault(key, {})
+        members.update({to_bytes(member): score for member, score in mapping.items()})
+        return len(mapping)
+
+    def zrem(self, key, *members):
+        scores = self.data.get(key, {})
+        return sum(scores.pop(to_bytes(member), None) is not None for member in members)
+
+    def zrange(self, key, start, end):
+        members = [member for member, _ in sorted(self.data.get(key, {}).items(), key=lambda item: item[1])]
+        return members[start:] if end == -1 else members[start:end + 1]
+
+    def sadd(self, key, *members):
+        items = self.data.setdefault(key, set())
+        before = len(items)
+        items.update(to_bytes(member) for member in members)
+        return len(items) - before
+
+    def sismember(self, key, member):
+        return to_bytes(member) in self.data.get(key, set())
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.data.setdefault(key, {})
+        if field is not None:
+            fields[to_bytes(field)] = to_bytes(value)
+        for name, item in (mapping or {}).items():
+            fields[to_bytes(name)] = to_bytes(item)
+        return 1
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(to_bytes(field))
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hdel(self, key, *fields):
+        values = self.data.get(key, {})
+        return sum(values.pop(to_bytes(field), None) is not None for field in fields)
+
+    def hexists(self, key, field):
+        return to_bytes(field) in self.data.get(key, {})
+
+    def hincrby(self, key, field, amount=1):
+        fields = self.data.setdefault(key, {})
+        value = int(fields.get(to_bytes(field), b'0')) + amount
+        fields[to_bytes(field)] = to_bytes(value)
+        return value
+
+    def xadd(self, name, fields, maxlen=None, approximate=True):
+        entry_id = f'{int(time.time() * 1000)}-{next(self.stream_ids)}'.encode()
+        self.data.setdefault(name, []).append((entry_id, {to_bytes(k): to_bytes(v) for k, v in fields.items()}))
+        return entry_id
+
+    def keys(self, pattern='*'):
+        return [key for key in self.data if fnmatch.fnmatch(key, pattern)]
+
+
+class InMemoryPipeline:
+    def __init__(self, client: InMemoryRedis) -> None:
+        self.client: InMemoryRedis = client
+        self.calls: list = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        results = [method(*args, **kwargs) for method, args, kwargs in self.calls]
+        self.calls = []
+        return results
+
+
+class StubCharactersResponse:
+    """Users service answer to the characters request of GameConsumer.connect."""
+
+    def __init__(self, url: str) -> None:
+        self.username: str = url.rstrip('/').rsplit('/', 1)[-1]
+
+    def json(self) -> list:
+        return [{
+            'name': character_name(self.username),
+            'owner': self.username,
+            'strength': 5,
+            'agility': 5,
+            'stamina': 5,
+            'endurance': 5,
+            'level': 1,
+            'experience': 0,
+        }]
+
+
+def character_name(username: str) -> str:
+    return f'{username}_hero'
+
+
+class SocketClosed(Exception):
+    pass
+
+
+class WebsocketClient:
+    """
+    Client side of one websocket, speaking raw ASGI events to the application.
+    """
+
+    def __init__(self, application, path: str, subprotocols: tuple = ()) -> None:
+        self.communicator = ApplicationCommunicator(application, {
+            'type': 'websocket',
+            'path': path,
+            'query_string': b'',
+            'headers': [],
+            'subprotocols': list(subprotocols),
+        })
+
+    async def connect(self) -> None:
+        await self.communicator.send_input({'type': 'websocket.connect'})
+        event = await self.communicator.receive_output(RECEIVE_TIMEOUT)
+        if event['type'] != 'websocket.accept':
+            raise SocketClosed(f'Connection refused: {event}')
+
+    async def send(self, frame) -> None:
+        if isinstance(frame, bytes):
+            await self.communicator.send_input({'type': 'websocket.receive', 'bytes': frame})
+        else:
+            await self.communicator.send_input({'type': 'websocket.receive', 'text': frame})
+
+    async def receive(self):
+        event = await self.communicator.receive_output(RECEIVE_TIMEOUT)
+        if event['type'] == 'websocket.close':
+            raise SocketClosed(f'Closed by the server with code {event.get("code")}')
+        return event.get('bytes') if event.get('bytes') is not None else event.get('text')
+
+    async def disconnect(self) -> None:
+        await self.communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.communicator.wait(RECEIVE_TIMEOUT)
+
+
+def decode_frame(frame) -> dict:
+    """Server frame as the message dict, statuses with action names."""
+    if not isinstance(frame, bytes):
+        return json.loads(frame)
+
+    packed = msgpack.unpackb(frame)
+    message_type = protocol.MESSAGE_TYPES[packed[0]]
+    data = {'message_type': message_type, **dict(zip(protocol.FIELDS[message_type], packed[1:]))}
+    for field in ('p1_status', 'p2_status'):
+        if field in data:
+            health, energy, codes, is_dead = data[field]
+            data[field] = [health, energy, [protocol.ACTION_NAMES[code] for code in codes], is_dead]
+    return data
+
+
+def encode_choice(choice: str, binary: bool):
+    if binary:
+        return msgpack.packb([protocol.ACTION_CODES[choice]])
+    return json.dumps({'choice': choice})
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.frames: int = 0
+        self.turn_latencies: list[float] = []
+        self.search_times: list[float] = []  # From /search to the game_match invite
+        self.games_finished: int = 0
+        self.peak_games: int = 0
+        self.errors: list[str] = []
+        # Time of the latest action sent for every (room, state version)
+        self.actions_sent: dict[tuple, float] = {}
+
+
+class Player:
+    STRATEGIES = ('random', 'rest')
+
+    def __init__(self, application, username: str, stats: LoadStats, strategy: str, binary: bool) -> None:
+        self.application = application
+        self.username: str = username
+        self.character_name: str = character_name(username)
+        self.stats: LoadStats = stats
+        self.strategy: str = strategy
+        self.binary: bool = binary
+        self.rng: random.Random = random.Random(username)
+
+    async def play(self) -> bool:
+        """Returns whether the game was played to its result."""
+        phase = 'search'
+        try:
+            room_token = await self.search()
+            phase = 'fight'
+            await self.fight(room_token)
+            return True
+        except (SocketClosed, asyncio.TimeoutError, KeyError, ValueError) as e:
+            self.stats.errors.append(f'{self.username} ({phase}): {type(e).__name__} {e}')
+            return False
+
+    async def search(self) -> str:
+        lobby = WebsocketClient(self.application, f'/ws/global/{self.username}/')
+        await lobby.connect()
+        started = time.perf_counter()
+        await lobby.send(json.dumps({'message': '/search', 'username': self.username}))
+
+        while True:
+            data = json.loads(await lobby.receive())
+            self.stats.frames += 1
+            if data.get('event_type') == '/game_match':
+                self.stats.search_times.append(time.perf_counter() - started)
+                break
+
+        # The client leaves the lobby for the game page, which asks for a player token
+        await lobby.disconnect()
+        return data['target_url'].strip('/').rsplit('/', 1)[-1]
+
+    async def fight(self, room_token: str) -> None:
+        token = GamesManager().generate_token(self.username)
+        path = f'/ws/game/{room_token}/{self.username}/{self.character_name}/{token}/'
+        subprotocols = (protocol.MSGPACK_SUBPROTOCOL,) if self.binary else ()
+        game = WebsocketClient(self.application, path, subprotocols)
+        await game.connect()
+
+        while True:
+            received = await game.receive()
+            now = time.perf_counter()
+            data = decode_frame(received)
+            self.stats.frames += 1
+
+            message_type = data['message_type']
+            if message_type == 'game result':
+                break
+            if message_type == 'turn':
+                sent = self.stats.actions_sent.get((room_token, data['version'] - 1))
+                if sent is not None:
+                    self.stats.turn_latencies.append(now - sent)
+            if message_type in ('game started', 'turn'):
+                self.update_peak_games()
+                await self.act(game, room_token, data)
+
+        await game.disconnect()
+
+    async def act(self, game: WebsocketClient, room_token: str, data: dict) -> None:
+        slot = 'p1' if data['p1_username'] == self.character_name else 'p2'
+        actions = data[f'{slot}_status'][2]
+        if not actions:
+            return
+
+        if self.strategy == 'rest' and 'rest' in actions:
+            choice = 'rest'
+        else:
+            choice = self.rng.choice(sorted(actions))
+
+        key = (room_token, data['version'])
+        self.stats.actions_sent[key] = time.perf_counter()
+        await game.send(encode_choice(choice, self.binary))
+
+    def update_peak_games(self) -> None:
+        live = sum(game.state == GameState.RUNNING for game in GameHandler.games.values())
+        self.stats.peak_games = max(self.stats.peak_games, live)
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def drive(players: int, ramp: float, strategy: str, binary: bool) -> LoadStats:
+    stats = LoadStats()
+
+    async def arrive(index: int) -> None:
+        if ramp > 0:
+            await asyncio.sleep(ramp * index / players)
+        if await Player(application, f'player{index}', stats, strategy, binary).play():
+            stats.games_finished += 1
+
+    await asyncio.gather(*(arrive(index) for index in range(players)))
+    stats.games_finished //= 2
+    return stats
+
+
+def run(players: int, ramp: float, strategy: str, binary: bool, search_interval: int) -> dict:
+    logging.getLogger('game_server').setLevel(logging.WARNING)
+    redis_client = InMemoryRedis()
+    original_interval = GameSearching.TIMEOUT
+    GameSearching.TIMEOUT = search_interval
+
+    try:
+        with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS), \
+                mock.patch('game_app.utils.redis.Redis', return_value=redis_client), \
+                mock.patch('game_app.consumers.game_consumer.requests.get', side_effect=StubCharactersResponse):
+            started = time.perf_counter()
+            stats = asyncio.run(drive(players, ramp, strategy, binary))
+            elapsed = time.perf_counter() - started
+    finally:
+        GameSearching.TIMEOUT = original_interval
+        GameSearching.LOOP_TASK = None
+        GameSearching.OBSERVERS.clear()
+        GameHandler.games.clear()
+        GameHandler.SWEEPER_TASK = None
+        GameLeases.reset()
+        ResultsPublisher.reset()
+
+    latencies = stats.turn_latencies
+    return {
+        'players': players,
+        'strategy': strategy,
+        'codec': protocol.MSGPACK_CODEC if binary else protocol.JSON_CODEC,
+        'seconds': round(elapsed, 3),
+        'games_finished': stats.games_finished,
+        'peak_concurrent_games': stats.peak_games,
+        'turns_per_second': round(len(latencies) / 2 / elapsed, 1),
+        'frames_per_second': round(stats.frames / elapsed, 1),
+        'turn_latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'mean': round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        },
+        # ru_maxrss is in kilobytes on Linux
+        'search_seconds': {
+            'p50': round(percentile(stats.search_times, 0.50), 3),
+            'p99': round(percentile(stats.search_times, 0.99), 3),
+        },
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'errors': len(stats.errors),
+        'first_errors': stats.errors[:5],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='In-process load test of the game service')
+    parser.add_argument('--players', type=int, default=200, help='Simulated players, two per game')
+    parser.add_argument('--ramp', type=float, default=0.0, help='Seconds over which players arrive')
+    parser.add_argument('--strategy', choices=Player.STRATEGIES, default='random',
+                        help='random actions, or rest only so every game runs all turns')
+    parser.add_argument('--msgpack', action='store_true', help='Use the msgpack subprotocol')
+    parser.add_argument('--search-interval', type=int, default=1,
+                        help='Seconds between matchmaking rounds (GameSearching.TIMEOUT)')
+    args = parser.parse_args(argv)
+
+    result = run(args.players, args.ramp, args.strategy, args.msgpack, args.search_interval)
+    print(json.dumps(result, indent=2))
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
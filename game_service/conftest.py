@@ -0,0 +1,18 @@
+import os
+import django
+
+
+os.environ['DJANGO_SETTINGS_MODULE'] = 'game_service.settings'
+
+# The game service reads its settings from the environment; provide local defaults for tests
+os.environ.setdefault('GAME_SERVICE_SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('DEBUG', 'False')
+os.environ.setdefault('RUNNING', 'local')
+os.environ.setdefault('GAME_SERVICE_HOST', '127.0.0.3')
+os.environ.setdefault('GAME_SERVICE_PORT', '8003')
+os.environ.setdefault('USERS_SERVICE_HOST', '127.0.0.2')
+os.environ.setdefault('USERS_SERVICE_PORT', '8002')
+os.environ.setdefault('REDIS_HOST', 'localhost')
+os.environ.setdefault('REDIS_PORT', '6379')
+
+django.setup()
@@ -1,9 +1,12 @@
-import json
 import logging
 import requests
 
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from game_app import metrics
+from game_app.game import protocol
 from game_app.game.game import GameHandler, Character
 from game_app.utils import RedisServer
 from game_service.microservices.users_api import *
@@ -12,6 +15,8 @@ logger = logging.getLogger('game_server')
 
 
 class GameConsumer(AsyncWebsocketConsumer):
+    ROOM_ELSEWHERE_CODE = 4009
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.room_token = None
@@ -21,6 +26,10 @@ class GameConsumer(AsyncWebsocketConsumer):
         self.character = None
         self.character_name = None
         self.token = None
+        self.codec = protocol.JSON_CODEC
+        self.legacy_timer = False
+        self.acked_version = None  # Last state version the client applied, base of turn deltas
+        self.accepted = False
         self.redis = RedisServer()
 
     async def connect(self):
@@ -34,6 +43,9 @@ class GameConsumer(AsyncWebsocketConsumer):
         }
         self.character_name = self.scope['url_route']['kwargs']['char_name']
         self.token = self.scope['url_route']['kwargs']['token']
+        # ?timer=legacy keeps the old per-second timer frames for clients that rely on them
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        self.legacy_timer = query.get('timer', [''])[0] == 'legacy'
         logger.debug(f'Token: {self.token}')
         stored_username = self.redis.get_player_by_token(self.token)
         stored_username = stored_username.decode("utf-8")
@@ -52,7 +64,14 @@ class GameConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             self.channel_name
         )
-        await self.accept()
+        # Clients offering the msgpack subprotocol get binary frames, the rest stay on JSON
+        if protocol.MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            self.codec = protocol.MSGPACK_CODEC
+            await self.accept(subprotocol=protocol.MSGPACK_SUBPROTOCOL)
+        else:
+            await self.accept()
+        self.accepted = True
+        metrics.SOCKET_CONNECTIONS.inc()
 
         await self.channel_layer.group_send(
             self.room_group_name,
@@ -62,38 +81,48 @@ class GameConsumer(AsyncWebsocketConsumer):
             }
         )
 
-        game = GameHandler.get_or_add(self.room_token)
+        game = await GameHandler.get_or_add(self.room_token)
+        if game is None:
+            # Another worker holds the lease of the room and runs its game
+            await self.close(code=GameConsumer.ROOM_ELSEWHERE_CODE)
+            return
         game.set_observer(self)
 
         if game.game_started:
-            self.character = game.get_character_by_name(self.username)
-            p1_status, p2_status = game.get_status()
-            data_dict = {
-                'message_type': 'game started',
-                'message': 'reconnect',
-                'p1_username': game.characters[1].get_name(),
-                'p1_status': p1_status,
-                'p2_username': game.characters[2].get_name(),
-                'p2_status': p2_status,
-            }
-            data = json.dumps(data_dict)
-            await self.send(text_data=data)
+            self.character = game.get_character_by_name(self.character_name)
+            # Full state; deltas follow once the client acknowledges this version
+            await self.send_message(game.start_message('reconnect'))
+            if game.turn_deadline_at is not None:
+                await self.send_message(game.turn_started_message())
         else:
             await game.set_character(self.character)
 
     async def disconnect(self, close_code):
+        if self.accepted:
+            metrics.SOCKET_DISCONNECTIONS.inc()
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
         )
-        game = GameHandler.get_or_add(self.room_token)
-        game.remove_observer(self)
+        game = GameHandler.get(self.room_token)
+        if game is not None:
+            game.remove_observer(self)
 
     async def receive(self, text_data=None, bytes_data=None):
-        data = json.loads(text_data)
+        metrics.SOCKET_MESSAGES.inc()
+        data = protocol.decode_client_message(text_data, bytes_data)
+        if 'ack' in data:
+            self.acked_version = data['ack']
+            game = GameHandler.get(self.room_token)
+            if self.acked_version is None and game is not None and game.game_started:
+                # The client lost the base of a delta: full state now, deltas follow its ack
+                await self.send_message(game.start_message('resync'))
+            return
+
         choice = data['choice']
         logger.debug(f'Player {self.character.get_name()}: action: {choice}')
 
+        # Signals the owning game, which resolves the turn as soon as both players acted
         self.character.set_action(choice)
 
     async def player_connect(self, event):
@@ -101,44 +130,14 @@ class GameConsumer(AsyncWebsocketConsumer):
             'message_type': 'player connect',
             'message': event['message']
         }
-        await self.send(text_data=json.dumps(data))
-
-    async def send_start(self, message):
-        data = {
-            'message_type': 'game started',
-            'message': message['message'],
-            'p1_username': message['p1_username'],
-            'p1_status': message['p1_status'],
-            'p2_username': message['p2_username'],
-            'p2_status': message['p2_status'],
-        }
-        logger.debug(f'Message: {message}')
-        await self.send(text_data=json.dumps(data))
+        await self.send_message(data)
 
-    async def send_turn(self, message):
-        data = {
-            'message_type': 'turn',
-            'message': message['message'],
-            'p1_username': message['p1_username'],
-            'p1_status': message['p1_status'],
-            'p1_action': message['p1_action'],
-            'p2_username': message['p2_username'],
-            'p2_status': message['p2_status'],
-            'p2_action': message['p2_action'],
-        }
-        await self.send(text_data=json.dumps(data))
+    async def send_message(self, data: dict):
+        await self.send_frame(protocol.encode(data, self.codec))
 
-    async def send_timer(self, message):
-        data = {
-            'message_type': 'timer',
-            'message': message['message'],
-            'timer': message['timer'],
-        }
-        await self.send(text_data=json.dumps(data))
-
-    async def send_game_result(self, message):
-        data = {
-            'message_type': 'game result',
-            'message': message['message'],
-        }
-        await self.send(text_data=json.dumps(data))
+    async def send_frame(self, frame):
+        """Writes a frame pre-encoded by the game broadcaster."""
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
@@ -0,0 +1,65 @@
+import logging
+
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from game_app.game import protocol, spectators
+from game_app.game.spectators import SnapshotCache
+
+logger = logging.getLogger('game_server')
+
+
+class SpectatorConsumer(AsyncWebsocketConsumer):
+    """
+    Read-only view of a game, fed through the channel layer group of its room.
+    """
+    UNKNOWN_ROOM_CODE = 4004
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.room_token = None
+        self.group_name = None
+        self.codec = protocol.JSON_CODEC
+        self.counted = False
+
+    async def connect(self):
+        self.room_token = self.scope['url_route']['kwargs']['room_token']
+        self.group_name = spectators.group_name(self.room_token)
+
+        if protocol.MSGPACK_SUBPROTOCOL in self.scope.get('subprotocols', []):
+            self.codec = protocol.MSGPACK_CODEC
+            await self.accept(subprotocol=protocol.MSGPACK_SUBPROTOCOL)
+        else:
+            await self.accept()
+
+        # Join before taking the snapshot, so no event falls between the two
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        self.counted = await spectators.add_spectators(self.room_token, 1)
+
+        messages = await SnapshotCache.get(self.room_token)
+        if messages is None:
+            logger.debug(f'Spectator: no game in room {self.room_token}')
+            await self.close(code=SpectatorConsumer.UNKNOWN_ROOM_CODE)
+            return
+
+        for message in messages:
+            await self.send_frame(protocol.encode(message, self.codec))
+
+    async def disconnect(self, close_code):
+        if self.group_name is not None:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if self.counted:
+            self.counted = False
+            await spectators.add_spectators(self.room_token, -1)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        # Spectators can not act
+        pass
+
+    async def spectator_frame(self, event):
+        await self.send_frame(event[self.codec])
+
+    async def send_frame(self, frame):
+        if isinstance(frame, bytes):
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
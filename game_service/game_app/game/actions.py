@@ -3,11 +3,17 @@ from abc import ABC
 
 
 class Effect(ABC):
+    """
+    Immutable effect applied to a Status; instances are shared through EffectsFactory.
+    """
+    __slots__ = ('effect_power',)
+
+    effect_name: str = ''
+    use_on: str = ''
+    parameter: str = ''
+    state: str = ''
+
     def __init__(self, effect_power: int = 0):
-        self.effect_name: str = ''
-        self.use_on: str = ''
-        self.parameter: str = ''
-        self.state: str = ''
         self.effect_power: int = effect_power
 
     def __str__(self):
@@ -15,60 +21,62 @@ class Effect(ABC):
 
 
 class UseEnergy(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'use_energy'
-        self.use_on: str = 'self'
-        self.parameter: str = 'energy'
-        self.state: str = 'sub'
+    __slots__ = ()
+
+    effect_name: str = 'use_energy'
+    use_on: str = 'self'
+    parameter: str = 'energy'
+    state: str = 'sub'
 
 
 class GainEnergy(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'gain_energy'
-        self.use_on: str = 'self'
-        self.parameter: str = 'energy'
-        self.state: str = 'add'
+    __slots__ = ()
+
+    effect_name: str = 'gain_energy'
+    use_on: str = 'self'
+    parameter: str = 'energy'
+    state: str = 'add'
 
 
 class Damage(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'damage'
-        self.use_on: str = 'enemy'
-        self.parameter: str = 'health'
-        self.state: str = 'sub'
+    __slots__ = ()
+
+    effect_name: str = 'damage'
+    use_on: str = 'enemy'
+    parameter: str = 'health'
+    state: str = 'sub'
 
 
 class Block(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'block'
-        self.use_on: str = 'self'
-        self.parameter: str = 'health'
-        self.state: str = 'mul'
+    __slots__ = ()
+
+    effect_name: str = 'block'
+    use_on: str = 'self'
+    parameter: str = 'health'
+    state: str = 'mul'
 
 
 class EnergyPenalty(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'energy_penalty'
-        self.use_on: str = 'enemy'
-        self.parameter: str = 'energy'
-        self.state: str = 'mul'
+    __slots__ = ()
+
+    effect_name: str = 'energy_penalty'
+    use_on: str = 'enemy'
+    parameter: str = 'energy'
+    state: str = 'mul'
 
 
 class Stun(Effect):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.effect_name: str = 'stun'
-        self.use_on: str = 'enemy'
-        self.parameter: str = 'skip'
-        self.state: str = 'true'
+    __slots__ = ()
+
+    effect_name: str = 'stun'
+    use_on: str = 'enemy'
+    parameter: str = 'skip'
+    state: str = 'true'
 
 
 class EffectsFactory:
+    MAX_CACHED = 4096
+
     effect_classes: dict[str, type[Effect]] = {
         'use_energy': UseEnergy,
         'gain_energy': GainEnergy,
@@ -77,23 +85,41 @@ class EffectsFactory:
         'energy_penalty': EnergyPenalty,
         'stun': Stun,
     }
+    effects_cache: dict[tuple[str, int], Effect] = {}
 
     @classmethod
-    def create_effect(cls, effect_name: str, **kwargs) -> Effect:
+    def create_effect(cls, effect_name: str, effect_power: int = 0) -> Effect:
+        key = (effect_name, effect_power)
+        effect = cls.effects_cache.get(key)
+        if effect is not None:
+            return effect
+
         effect_class = cls.effect_classes.get(effect_name)
         if effect_class:
-            return effect_class(**kwargs)
+            if len(cls.effects_cache) >= cls.MAX_CACHED:
+                cls.effects_cache.clear()
+            effect = effect_class(effect_power=effect_power)
+            cls.effects_cache[key] = effect
+            return effect
         else:
             raise ValueError(f'Unknown effect: {effect_name}')
 
 
 class Action(ABC):
+    """
+    Immutable action; instances are shared flyweights handed out by ActionsFactory.
+
+    Effects depend on the energy cost and power of the action, counter actions only on its type.
+    """
+    __slots__ = ('energy_cost', 'action_power', 'effects')
+
+    action_name: str = ''
+    counter_actions: dict[str, dict[str, Effect]] = {}
+
     def __init__(self, energy_cost: int = 0, action_power: int = 0) -> None:
-        self.action_name: str = ''
         self.energy_cost: int = energy_cost
         self.action_power: int = action_power
         self.effects: dict[str, Effect] = {}
-        self.counter_actions: dict[str, dict[str, Effect]] = {}
 
     def __str__(self) -> str:
         return self.action_name
@@ -123,9 +149,12 @@ class Action(ABC):
 
 
 class Attack(Action):
+    __slots__ = ()
+
+    action_name: str = 'attack'
+
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
-        self.action_name: str = 'attack'
         self.effects['use_energy'] = EffectsFactory.create_effect(effect_name='use_energy',
                                                                   effect_power=self.energy_cost)
 
@@ -134,48 +163,60 @@ class Attack(Action):
 
 
 class Defence(Action):
-    def __init__(self, **kwargs) -> None:
-        super().__init__(**kwargs)
-        self.action_name: str = 'defence'
-        self.effects['use_energy'] = EffectsFactory.create_effect(effect_name='use_energy',
-                                                                  effect_power=self.energy_cost)
-        self.counter_actions['attack'] = {
+    __slots__ = ()
+
+    action_name: str = 'defence'
+    counter_actions: dict[str, dict[str, Effect]] = {
+        'attack': {
             'block': EffectsFactory.create_effect(effect_name='block',
                                                   effect_power=0),
             'energy_penalty': EffectsFactory.create_effect(effect_name='energy_penalty',
                                                            effect_power=2),
             'stun': EffectsFactory.create_effect(effect_name='stun',
                                                  effect_power=0),
-        }
+        },
+    }
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.effects['use_energy'] = EffectsFactory.create_effect(effect_name='use_energy',
+                                                                  effect_power=self.energy_cost)
 
 
 class Feint(Action):
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.action_name: str = 'feint'
-        self.counter_actions['defence'] = {
+    __slots__ = ()
+
+    action_name: str = 'feint'
+    counter_actions: dict[str, dict[str, Effect]] = {
+        'defence': {
             'energy_penalty': EffectsFactory.create_effect(effect_name='energy_penalty',
                                                            effect_power=2),
             'stun': EffectsFactory.create_effect(effect_name='stun',
                                                  effect_power=0),
-        }
+        },
+    }
 
 
 class Rest(Action):
+    __slots__ = ()
+
+    action_name: str = 'rest'
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.action_name: str = 'rest'
         self.effects['gain_energy'] = EffectsFactory.create_effect(effect_name='gain_energy',
                                                                    effect_power=self.energy_cost)
 
 
 class Pass(Action):
-    def __init__(self, **kwargs):
-        self.action_name: str = 'pass'
-        super().__init__(**kwargs)
+    __slots__ = ()
+
+    action_name: str = 'pass'
 
 
 class ActionsFactory:
+    MAX_CACHED = 4096
+
     action_classes: dict[str, type[Action]] = {
         'attack': Attack,
         'defence': Defence,
@@ -183,36 +224,124 @@ class ActionsFactory:
         'rest': Rest,
         'pass': Pass,
     }
+    actions_cache: dict[tuple[str, int, int], Action] = {}
 
     @classmethod
-    def create_action(cls, action_name: str = '', **kwargs) -> Action:
+    def create_action(cls, action_name: str = '', energy_cost: int = 0, action_power: int = 0) -> Action:
+        key = (action_name, energy_cost, action_power)
+        action = cls.actions_cache.get(key)
+        if action is not None:
+            return action
+
         action_class = cls.action_classes.get(action_name)
         if action_class:
-            return action_class(**kwargs)
+            if len(cls.actions_cache) >= cls.MAX_CACHED:
+                cls.actions_cache.clear()
+            action = action_class(energy_cost=energy_cost, action_power=action_power)
+            cls.actions_cache[key] = action
+            return action
         else:
             raise ValueError(f'Unknown action: {action_name}')
 
 
+PASS_ACTION: Action = ActionsFactory.create_action(action_name='pass')
+
+
 class Status:
-    def __init__(self):
-        self.status = {
-            'health': 0,
-            'energy': 0,
-            'skip': False,
-        }
+    __slots__ = ('health', 'energy', 'skip')
+
+    def __init__(self, health: int = 0, energy: int = 0, skip: bool = False):
+        self.health: int = health
+        self.energy: int = energy
+        self.skip: bool = skip
 
     def __str__(self):
-        return f'Heath: {self.status["health"]}, Energy: {self.status["energy"]}, Skip: {self.status["skip"]}'
+        return f'Heath: {self.health}, Energy: {self.energy}, Skip: {self.skip}'
+
+    def __eq__(self, other):
+        if not isinstance(other, Status):
+            return NotImplemented
+        return (self.health, self.energy, self.skip) == (other.health, other.energy, other.skip)
 
     def apply_effect(self, effect: Effect):
         if effect.state == 'add':
-            self.status[effect.parameter] += effect.effect_power
+            setattr(self, effect.parameter, getattr(self, effect.parameter) + effect.effect_power)
 
         elif effect.state == 'sub':
-            self.status[effect.parameter] -= effect.effect_power
+            setattr(self, effect.parameter, getattr(self, effect.parameter) - effect.effect_power)
 
         elif effect.state == 'mul':
-            self.status[effect.parameter] *= effect.effect_power
+            setattr(self, effect.parameter, getattr(self, effect.parameter) * effect.effect_power)
 
         elif effect.state == 'true':
-            self.status[effect.parameter] = True
+            setattr(self, effect.parameter, True)
+
+
+class ResolutionTable:
+    """
+    Precompiled outcome of every pair of actions.
+
+    Every status delta produced by Action.resolve_actions is a linear combination of the
+    energy cost and power of both actions, so each pair compiles to integer coefficients
+    over (left energy cost, left power, right energy cost, right power). Resolving a turn
+    is then a table lookup plus a few integer operations.
+    """
+    PARAMETERS = 4
+    table: dict[tuple[type[Action], type[Action]], tuple] = {}
+
+    @staticmethod
+    def _reference_status(left_name: str, right_name: str, params: tuple) -> tuple[Status, Status]:
+        left_action = ActionsFactory.create_action(action_name=left_name,
+                                                   energy_cost=params[0],
+                                                   action_power=params[1])
+        right_action = ActionsFactory.create_action(action_name=right_name,
+                                                    energy_cost=params[2],
+                                                    action_power=params[3])
+        return Action.resolve_actions(left_action, right_action)
+
+    @classmethod
+    def compile(cls) -> None:
+        """Rebuilds the table from the current action definitions."""
+        names = ActionsFactory.action_classes
+        basis = [tuple(int(i == j) for j in range(cls.PARAMETERS)) for i in range(cls.PARAMETERS)]
+        check_params = (3, 5, 7, 11)
+        table = {}
+
+        for left_name in names:
+            for right_name in names:
+                base = cls._reference_status(left_name, right_name, (0,) * cls.PARAMETERS)
+                per_param = [cls._reference_status(left_name, right_name, params) for params in basis]
+
+                entry = []
+                for side in range(2):
+                    health = tuple(status[side].health for status in per_param)
+                    energy = tuple(status[side].energy for status in per_param)
+                    entry.append((health, energy, base[side].skip))
+
+                table[(names[left_name], names[right_name])] = tuple(entry)
+
+                check = cls._reference_status(left_name, right_name, check_params)
+                for side in range(2):
+                    health, energy, skip = entry[side]
+                    if (check[side].health != sum(c * p for c, p in zip(health, check_params))
+                            or check[side].energy != sum(c * p for c, p in zip(energy, check_params))
+                            or check[side].skip != skip):
+                        raise ValueError(f'Actions {left_name}/{right_name} can not be compiled into a linear table')
+
+        cls.table = table
+
+    @classmethod
+    def resolve(cls, left_action: Action, right_action: Action) -> tuple[Status, Status]:
+        left_entry, right_entry = cls.table[(type(left_action), type(right_action))]
+        lc, lp = left_action.energy_cost, left_action.action_power
+        rc, rp = right_action.energy_cost, right_action.action_power
+
+        return tuple(
+            Status(health[0] * lc + health[1] * lp + health[2] * rc + health[3] * rp,
+                   energy[0] * lc + energy[1] * lp + energy[2] * rc + energy[3] * rp,
+                   skip)
+            for health, energy, skip in (left_entry, right_entry)
+        )
+
+
+ResolutionTable.compile()
@@ -1,8 +1,14 @@
 import logging
 import random
 
-from game_app.game.actions import ActionsFactory, Action
-from game_app.game.game import Character
+from typing import Optional, Union
+
+from django.conf import settings
+
+from game_app.game import lookahead
+from game_app.game.actions import Action, PASS_ACTION
+from game_app.game.bot_policy import BotPolicy, DEFAULT_POLICY
+from game_app.game.game import Character, GameState
 
 
 logger = logging.getLogger('game_server')
@@ -21,77 +27,84 @@ bot_dict = {
 
 
 class Bot(Character):
-    def __init__(self):
+    OWNER = bot_dict['owner']
+    is_bot = True
+
+    def __init__(self, seed: Optional[Union[int, str]] = None):
         super().__init__(bot_dict)
-        actions = ActionsFactory.action_classes.keys()
-        self.actions_dict = {action: 0 for action in actions}
+        # Seeded from the game, so a replay seed reproduces the bot's decisions
+        self.random = random.Random(seed)
+        self.policy: BotPolicy = DEFAULT_POLICY
         self.status = None
         self.opponent_status = None
+        self.opponent: Optional[Character] = None
 
-    def reset_actions(self):
-        actions = list(ActionsFactory.action_classes.keys())
-        self.actions_dict = {action: (1 if i < 3 else 0) for i, action in enumerate(actions)}
+    @classmethod
+    def from_snapshot(cls, snapshot: list, seed: Optional[Union[int, str]] = None) -> Character:
+        bot = cls(seed)
+        bot.restore(snapshot)
+        return bot
 
     def make_move(self) -> Action:
-        self.reset_actions()
-
-        if self.status[1] < 20:
-            return ActionsFactory.create_action(action_name='pass')
-
-        if self.status[1] < 50:
-            self.actions_dict['rest'] += 1
-
-        if self.status[1] > self.opponent_status[1]:
-            self.actions_dict['attack'] += 1
-
-        if self.status[0] > self.opponent_status[0]:
-            self.actions_dict['feint'] += 1
-
-        if self.status[0] < self.opponent_status[0]:
-            self.actions_dict['defence'] += 1
-
-        if all(action not in self.opponent_status[2] for action in ('attack', 'defend')):
-            self.actions_dict['defence'] = 0
-            self.actions_dict['feint'] = 0
+        if self.status[1] < BotPolicy.PASS_ENERGY:
+            return PASS_ACTION
 
         self.get_action()
-        for action in self.actions_dict.keys():
-            if action not in self.available_actions:
-                self.actions_dict[action] = 0
-
-        actions_list = []
-        for key, value in self.actions_dict.items():
-            for i in range(value):
-                actions_list.append(key)
-
-        if len(actions_list) == 0:
-            actions_list.append('pass')
-
-        logger.debug(f'Actions list: {actions_list}')
-        return random.choice(actions_list)
-
-    async def send_start(self, message):
-        if message['p1_username'] == 'Bot':
-            self.status = message['p1_status']
-            self.opponent_status = message['p2_status']
+        return self.policy.decide(self.status, self.opponent_status, self.available_actions, self.random)
+
+    def act(self, version: int) -> None:
+        """
+        Picks the action for the game state of the given version, read straight from the game.
+        """
+        game = self.game
+        if (game is None or game.state_version != version or game.state in (GameState.FINISHED, GameState.EVICTED)
+                or self.ready_to_act or self.is_dead):
+            return
+
+        opponent = game.characters[2] if game.characters[1] is self else game.characters[1]
+        self.opponent = opponent
+        # Cached per status version; refreshes the available actions of both characters
+        self.get_state()
+        opponent.get_state()
+        self.status = (self.health, self.energy, self.available_actions)
+        self.opponent_status = (opponent.health, opponent.energy, opponent.available_actions)
+
+        move = self.make_move()
+        if isinstance(move, str) and move in self.available_actions:
+            self.set_action(move)
         else:
-            self.status = message['p2_status']
-            self.opponent_status = message['p1_status']
-
-        self.set_action(self.make_move())
+            # Passing: submit it at once instead of letting the turn time out
+            self.get_action()
+            self.ready_to_act = True
+            game.action_submitted(self)
+
+
+class MonteCarloBot(Bot):
+    """
+    Harder bot: picks the action with the best result over playouts of its policy from the
+    current state, see lookahead.MonteCarloSearch. A decision is bounded by PLAYOUTS and
+    TIME_BUDGET seconds of CPU on the event loop.
+    """
+    PLAYOUTS = 400
+    TIME_BUDGET = 0.005  # Seconds per decision
+    DEPTH = 15  # Turns per playout
+
+    def __init__(self, seed: Optional[Union[int, str]] = None, playouts: int = PLAYOUTS,
+                 time_budget: Optional[float] = TIME_BUDGET, depth: int = DEPTH):
+        super().__init__(seed)
+        self.search = lookahead.MonteCarloSearch(playouts, time_budget, depth, self.random, self.policy)
+
+    def make_move(self) -> str:
+        self.get_action()
+        return lookahead.ACTION_NAMES[self.search.search(self, self.opponent)]
 
-    async def send_turn(self, message):
-        if message['p1_username'] == 'Bot':
-            self.status = message['p1_status']
-            self.opponent_status = message['p2_status']
-        else:
-            self.status = message['p2_status']
-            self.opponent_status = message['p1_status']
 
-        self.set_action(self.make_move())
+BOT_CLASSES: dict[str, type[Bot]] = {
+    'normal': Bot,
+    'hard': MonteCarloBot,
+}
 
-    async def send_timer(self, timer):
-        pass
 
-    async def send_game_result(self, game_result):
-        pass
+def bot_class() -> type[Bot]:
+    """The bot filling timed out searches, by settings.BOT_DIFFICULTY."""
+    return BOT_CLASSES.get(settings.BOT_DIFFICULTY, Bot)
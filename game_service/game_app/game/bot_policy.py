@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+
+from bisect import bisect_right
+from itertools import accumulate, product
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+from game_app.game.actions import ActionsFactory
+
+
+logger = logging.getLogger('game_server')
+
+
+class BotPolicy:
+    """
+    Bot decisions compiled into a lookup table.
+
+    The policy only depends on a few discrete features of the two statuses: whether the
+    bot's energy is low, how energy and health compare with the opponent, whether the
+    opponent can attack and which actions the bot has. Every combination is compiled
+    into the available actions with cumulative weights, so a decision is one table index
+    and one bisect of a random number.
+    """
+    PASS_ENERGY = 20  # Below this the bot passes, see Bot.make_move
+    LOW_ENERGY = 50
+
+    ACTIONS: tuple = tuple(ActionsFactory.action_classes.keys())
+    ACTION_BITS: dict[str, int] = {name: 1 << index for index, name in enumerate(ACTIONS)}
+    MASKS = 1 << len(ACTIONS)
+
+    DEFAULT_WEIGHTS: dict[str, int] = {
+        'attack': 1,
+        'defence': 1,
+        'feint': 1,
+        'rest_on_low_energy': 1,
+        'attack_on_more_energy': 1,
+        'feint_on_more_health': 1,
+        'defence_on_less_health': 1,
+    }
+
+    def __init__(self, weights: Optional[dict[str, int]] = None) -> None:
+        weights = weights or {}
+        unknown = set(weights) - set(BotPolicy.DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f'Unknown bot policy weights: {", ".join(sorted(unknown))}')
+        if any(not isinstance(weight, int) or weight < 0 for weight in weights.values()):
+            raise ValueError('Bot policy weights must be non-negative integers')
+
+        self.weights: dict[str, int] = {**BotPolicy.DEFAULT_WEIGHTS, **weights}
+        self.table: list[tuple[tuple, tuple]] = []
+        self.compile()
+
+    @classmethod
+    def from_file(cls, path) -> BotPolicy:
+        """
+        Loads a policy file written by the tune_bot_policy command: {"weights": {...}, ...}.
+
+        Raises:
+            ValueError: If the file can not be read or holds invalid weights.
+        """
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as e:
+            raise ValueError(f'Bot policy {path} can not be read: {e}')
+        return cls(data.get('weights'))
+
+    def to_file(self, path, **meta) -> None:
+        Path(path).write_text(json.dumps({'weights': self.weights, **meta}, indent=2) + '\n')
+
+    @staticmethod
+    def key(status, opponent_status, available_actions) -> int:
+        """
+        Table index of a state: see index for the discretised features.
+        """
+        health, energy = status[0], status[1]
+        opponent_health = opponent_status[0]
+        mask = 0
+        for action in available_actions:
+            mask |= BotPolicy.ACTION_BITS[action]
+
+        return ((((energy < BotPolicy.LOW_ENERGY) * 2 + (energy > opponent_status[1])) * 3
+                 + (health > opponent_health) - (health < opponent_health) + 1) * 2
+                + ('attack' in opponent_status[2])) * BotPolicy.MASKS + mask
+
+    @staticmethod
+    def index(low_energy: bool, more_energy: bool, health_order: int, opponent_attacks: bool, mask: int) -> int:
+        # health_order is 0, 1 or 2 for less, equal or more health than the opponent
+        return (((low_energy * 2 + more_energy) * 3 + health_order) * 2 + opponent_attacks) * BotPolicy.MASKS + mask
+
+    def weigh(self, low_energy: bool, more_energy: bool, health_order: int, opponent_attacks: bool) -> dict:
+        weights = self.weights
+        action_weights = {name: weights.get(name, 0) for name in BotPolicy.ACTIONS}
+
+        if low_energy:
+            action_weights['rest'] += weights['rest_on_low_energy']
+        if more_energy:
+            action_weights['attack'] += weights['attack_on_more_energy']
+        if health_order > 1:
+            action_weights['feint'] += weights['feint_on_more_health']
+        if health_order < 1:
+            action_weights['defence'] += weights['defence_on_less_health']
+
+        # Nothing to defend against or feint
+        if not opponent_attacks:
+            action_weights['defence'] = 0
+            action_weights['feint'] = 0
+
+        return action_weights
+
+    def compile(self) -> None:
+        table = [None] * (2 * 2 * 3 * 2 * BotPolicy.MASKS)
+        for low_energy, more_energy, health_order, opponent_attacks in product((0, 1), (0, 1), (0, 1, 2), (0, 1)):
+            action_weights = self.weigh(low_energy, more_energy, health_order, opponent_attacks)
+
+            for mask in range(BotPolicy.MASKS):
+                choices = [(name, weight) for name, weight in action_weights.items()
+                           if weight > 0 and mask & BotPolicy.ACTION_BITS[name]]
+                if not choices:
+                    choices = [('pass', 1)]
+
+                names = tuple(name for name, _ in choices)
+                cumulative = tuple(accumulate(weight for _, weight in choices))
+                table[self.index(low_energy, more_energy, health_order, opponent_attacks, mask)] = (names, cumulative)
+
+        self.table = table
+
+    def decide(self, status, opponent_status, available_actions, rng: random.Random = random) -> str:
+        names, cumulative = self.table[self.key(status, opponent_status, available_actions)]
+        if len(names) == 1:
+            return names[0]
+        return names[bisect_right(cumulative, rng.random() * cumulative[-1], 0, len(names) - 1)]
+
+
+def load_default_policy() -> BotPolicy:
+    """
+    The policy of every bot: settings.BOT_POLICY_PATH if set, the built-in weights otherwise.
+    """
+    if settings.BOT_POLICY_PATH:
+        try:
+            return BotPolicy.from_file(settings.BOT_POLICY_PATH)
+        except ValueError as e:
+            logger.warning(f'{e}; using the default bot policy')
+    return BotPolicy()
+
+
+DEFAULT_POLICY: BotPolicy = load_default_policy()
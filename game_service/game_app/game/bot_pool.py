@@ -0,0 +1,80 @@
+import asyncio
+import heapq
+import itertools
+import logging
+
+
+logger = logging.getLogger('game_server')
+
+
+class BotPool:
+    """
+    Process-wide driver of every bot seat.
+
+    Bots are not observers of their game: whenever a game has published a new state it
+    hands its bots to schedule, and the bots read the state straight from the game. Without
+    think time a bot acts right away. Otherwise it is queued in a heap served by a single
+    task, so thousands of thinking bots cost one timer. A queued decision is dropped when
+    the game moved on to another state version in the meantime.
+    """
+    _instance = None
+
+    MIN_THINK_TIME = 0.0  # Seconds
+    MAX_THINK_TIME = 0.0
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.queue = []
+            cls._instance.counter = itertools.count()
+            cls._instance.wakeup = None
+            cls._instance.loop_task = None
+        return cls._instance
+
+    def schedule(self, bot, version: int) -> None:
+        think_time = 0.0
+        if BotPool.MAX_THINK_TIME > 0:
+            think_time = bot.random.uniform(BotPool.MIN_THINK_TIME, BotPool.MAX_THINK_TIME)
+
+        if think_time <= 0:
+            bot.act(version)
+            return
+
+        loop = asyncio.get_running_loop()
+        entry = (loop.time() + think_time, next(self.counter), bot, version)
+        heapq.heappush(self.queue, entry)
+
+        if self.loop_task is None or self.loop_task.done():
+            self.wakeup = asyncio.Event()
+            self.loop_task = asyncio.create_task(self.run())
+        elif self.queue[0] is entry:
+            self.wakeup.set()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self.queue:
+                delay = self.queue[0][0] - loop.time()
+                if delay > 0:
+                    self.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self.wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                _, _, bot, version = heapq.heappop(self.queue)
+                try:
+                    bot.act(version)
+                except Exception as e:
+                    logger.error(f'Bot {bot.get_name()} failed to act: {e}')
+        except asyncio.CancelledError:
+            logger.debug('Bot pool was cancelled.')
+        finally:
+            self.loop_task = None
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.loop_task is not None:
+            cls._instance.loop_task.cancel()
+        cls._instance = None
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+
+from collections import deque
+from typing import Callable, Optional
+
+from game_app import metrics
+from game_app.game import protocol
+
+logger = logging.getLogger('game_server')
+
+
+class EncodedMessage:
+    """
+    Message payload shared by every observer of a broadcast, encoded once per wire format.
+    """
+    __slots__ = ('data', 'droppable', 'frames')
+
+    def __init__(self, data: dict, droppable: bool = False) -> None:
+        self.data: dict = data
+        self.droppable: bool = droppable
+        self.frames: dict = {}
+
+    def frame(self, codec: str = protocol.JSON_CODEC):
+        frame = self.frames.get(codec)
+        if frame is None:
+            frame = protocol.encode(self.data, codec)
+            self.frames[codec] = frame
+        return frame
+
+
+class ObserverQueue:
+    """
+    Bounded send buffer of one socket observer.
+
+    Frames are written by a drain task that only runs while the buffer is not empty, so a
+    slow socket never delays the other observers. When the buffer is full, droppable
+    frames (timer updates) are discarded; any other frame closes the slow client.
+    """
+    MAX_PENDING = 32
+    CLOSE_CODE = 4008
+
+    def __init__(self, observer, on_close: Callable) -> None:
+        self.observer = observer
+        self.on_close: Callable = on_close
+        self.pending: deque = deque()
+        self.drain_task: Optional[asyncio.Task] = None
+        self.dropped: int = 0
+        self.closed: bool = False
+
+    def put(self, message: EncodedMessage) -> None:
+        if self.closed:
+            return
+
+        if len(self.pending) >= ObserverQueue.MAX_PENDING:
+            if message.droppable:
+                self.dropped += 1
+                return
+
+            logger.warning(f'Observer {self.observer} is too slow, closing connection')
+            self.close()
+            return
+
+        self.pending.append(message)
+        if self.drain_task is None:
+            self.drain_task = asyncio.create_task(self.drain())
+
+    async def drain(self) -> None:
+        try:
+            while self.pending:
+                message = self.pending.popleft()
+                frame = message.frame(getattr(self.observer, 'codec', protocol.JSON_CODEC))
+                started = time.perf_counter()
+                await self.observer.send_frame(frame)
+                metrics.OBSERVER_SEND.observe(time.perf_counter() - started)
+        except Exception as e:
+            logger.warning(f'Observer {self.observer} send failed: {e}')
+            self.close()
+        finally:
+            self.drain_task = None
+
+    def close(self) -> None:
+        if self.closed:
+            return
+
+        self.closed = True
+        self.pending.clear()
+        if self.drain_task is not None and self.drain_task is not asyncio.current_task():
+            self.drain_task.cancel()
+        asyncio.create_task(self.observer.close(code=ObserverQueue.CLOSE_CODE))
+        self.on_close(self.observer)
+
+    def cancel(self) -> None:
+        self.closed = True
+        self.pending.clear()
+        if self.drain_task is not None and self.drain_task is not asyncio.current_task():
+            self.drain_task.cancel()
+
+
+class Broadcaster:
+    """
+    Fans game messages out to observers.
+
+    Socket observers (those with send_frame) receive frames through their own ObserverQueue,
+    built from a payload encoded once per message. In-process observers such as bots are
+    called directly with the message dict.
+    """
+
+    def __init__(self, on_close: Callable) -> None:
+        self.on_close: Callable = on_close
+        self.queues: dict = {}
+
+    @staticmethod
+    def is_socket(observer) -> bool:
+        return hasattr(observer, 'send_frame')
+
+    def add(self, observer) -> None:
+        if Broadcaster.is_socket(observer):
+            self.queues[observer] = ObserverQueue(observer, self.on_close)
+
+    def remove(self, observer) -> None:
+        queue = self.queues.pop(observer, None)
+        if queue is not None:
+            queue.cancel()
+
+    async def broadcast(self, observers: list, method: str, data: dict, droppable: bool = False) -> None:
+        message = EncodedMessage(data, droppable=droppable)
+        for observer in tuple(observers):
+            queue = self.queues.get(observer)
+            if queue is not None:
+                queue.put(message)
+            else:
+                await getattr(observer, method)(data)
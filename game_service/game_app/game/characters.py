@@ -0,0 +1,17 @@
+"""
+Characters built from explicit stats, for the benchmarks and the test cases.
+"""
+from game_app.game.game import Character
+
+
+def make_character(name, owner=None, strength=5, agility=5, stamina=5, endurance=5, level=1, experience=0):
+    return Character({
+        'name': name,
+        'owner': owner or name,
+        'strength': strength,
+        'agility': agility,
+        'stamina': stamina,
+        'endurance': endurance,
+        'level': level,
+        'experience': experience,
+    })
@@ -1,23 +1,58 @@
+from __future__ import annotations
+
 import asyncio
 import logging
+import random
+import time
+import uuid
 
+from collections import OrderedDict
+from enum import Enum
 from typing import Optional
 
-from game_app.game.actions import ActionsFactory, Action, Status
-from game_app.utils import UsersManager
+import msgpack
+import redis
+
+from game_app import metrics
+from game_app.game import spectators
+from game_app.game.actions import ActionsFactory, Action, Status, ResolutionTable, PASS_ACTION
+from game_app.game.bot_pool import BotPool
+from game_app.game.broadcast import Broadcaster
+from game_app.game.game_log import GameLogWriter
+from game_app.game.leases import GameLeases
+from game_app.game.outbox import ResultsPublisher
+from game_app.game.replay import Replay, pack_turn
+from game_app.game.scheduler import TurnScheduler, TurnDeadline
+from game_app.game.snapshots import SnapshotWriter
+from game_app.utils import AsyncUsersManager, RedisServer
 
 
 logger = logging.getLogger('game_server')
 
 
 class Character:
+    is_bot = False  # Bots are driven by BotPool instead of a socket
+
     hp_per_endurance = 20
     en_per_stamina = 20
     dmg_per_strength = 4
     be_per_stamina = 2
     ae_per_stamina = 8
 
+    # Every set of actions a character can be offered, shared instead of rebuilt per call
+    ALL_ACTIONS: frozenset = frozenset(ActionsFactory.action_classes) - {'pass'}
+    LOW_ENERGY_ACTIONS: frozenset = ALL_ACTIONS - {'attack', 'defence'}
+    SKIP_ACTIONS: frozenset = frozenset({'pass'})
+    NO_ACTIONS: frozenset = frozenset()
+
     def __init__(self, character: dict) -> None:
+        # Strength, agility, stamina, endurance
+        self.stats: tuple = (
+            character.get('strength'),
+            character.get('agility'),
+            character.get('stamina'),
+            character.get('endurance'),
+        )
         self.MAX_ENERGY: int = character.get('stamina') * Character.en_per_stamina
         self.OWNER_USERNAME: str = character.get('owner')
 
@@ -35,29 +70,39 @@ class Character:
         self.skip_turn: bool = False
         self.is_dead: bool = False
 
-        self.available_actions: set = set()
-        self.current_action: Action = ActionsFactory.create_action(action_name='pass')
-        self.last_action: Action = ActionsFactory.create_action(action_name='pass')
+        self.available_actions: frozenset = Character.NO_ACTIONS
+        self.current_action: Action = PASS_ACTION
+        self.last_action: Action = PASS_ACTION
         self.ready_to_act: bool = False
+        self.game: Optional[Game] = None
+
+        # Bumped whenever health, energy or available actions may have changed
+        self.status_version: int = 0
+        self.state_cache: Optional[tuple[int, dict]] = None
 
     def set_action(self, action: str):
         logger.debug(f'{self.name} selected: {action}')
         self.get_action()
         if action in self.available_actions:
-            action_power = 0
-            if action == 'attack':
-                action_power = self.damage
-            elif action == 'rest':
-                action_power = self.aer
-
-            self.current_action = ActionsFactory.create_action(action_name=action,
-                                                               energy_cost=self.epa,
-                                                               action_power=action_power)
+            self.current_action = self.build_action(action)
             self.ready_to_act = True
+            if self.game is not None:
+                self.game.action_submitted(self)
+
+    def build_action(self, action: str) -> Action:
+        action_power = 0
+        if action == 'attack':
+            action_power = self.damage
+        elif action == 'rest':
+            action_power = self.aer
+
+        return ActionsFactory.create_action(action_name=action,
+                                            energy_cost=self.epa,
+                                            action_power=action_power)
 
     def get_action(self) -> Action:
         self.last_action = self.current_action
-        self.current_action = ActionsFactory.create_action(action_name='pass')
+        self.current_action = PASS_ACTION
         self.ready_to_act = False
         return self.last_action
 
@@ -68,42 +113,93 @@ class Character:
         return self.name
 
     def apply_status(self, stat: Status) -> None:
-        self.health += stat.status.get('health')
+        self.health += stat.health
         if self.health <= 0:
             self.is_dead = True
 
-        self.energy += stat.status.get('energy')
+        self.energy += stat.energy
         if self.energy < 0:
             self.energy = 0
         elif self.energy > self.MAX_ENERGY:
             self.energy = self.MAX_ENERGY
             
-        self.skip_turn = stat.status.get('skip')
+        self.skip_turn = stat.skip
 
     def get_actions(self) -> list:
-        self.available_actions = set()
         if self.is_dead:
-            return []
-
-        if self.skip_turn:
-            self.available_actions = {'pass'}
-
+            self.available_actions = Character.NO_ACTIONS
+        elif self.skip_turn:
+            self.available_actions = Character.SKIP_ACTIONS
+        elif self.energy < self.epa:
+            self.available_actions = Character.LOW_ENERGY_ACTIONS
         else:
-            self.available_actions = set(ActionsFactory.action_classes.keys())
-            self.available_actions.remove('pass')
-            if self.energy < self.epa:
-                self.available_actions.remove('attack')
-                self.available_actions.remove('defence')
+            self.available_actions = Character.ALL_ACTIONS
 
         return list(self.available_actions)
 
     def turn(self, stat: Status):
         self.apply_status(stat)
         self.energy += self.ber
+        self.status_version += 1
 
     def get_status(self) -> (int, int, set, bool):
         return self.health, self.energy, self.get_actions(), self.is_dead
 
+    def get_state(self) -> tuple[int, dict]:
+        """
+        Returns the status as a versioned dict, only rebuilt after the character changed.
+        """
+        if self.state_cache is None or self.state_cache[0] != self.status_version:
+            self.get_actions()
+            self.state_cache = (self.status_version, {
+                'health': self.health,
+                'energy': self.energy,
+                'actions': sorted(self.available_actions),
+                'is_dead': self.is_dead,
+            })
+        return self.state_cache
+
+    def snapshot(self) -> list:
+        pending_action = self.current_action.action_name if self.ready_to_act else None
+        return [
+            self.name, self.OWNER_USERNAME, *self.stats, self.level, self.experience,
+            self.health, self.energy, self.skip_turn, self.is_dead, pending_action,
+        ]
+
+    def restore(self, snapshot: list) -> None:
+        (self.name, self.OWNER_USERNAME, *_, self.health, self.energy,
+         self.skip_turn, self.is_dead, pending_action) = snapshot
+
+        self.status_version += 1
+        self.get_actions()
+        if pending_action is not None:
+            self.current_action = self.build_action(pending_action)
+            self.ready_to_act = True
+
+    @classmethod
+    def from_snapshot(cls, snapshot: list) -> Character:
+        name, owner, strength, agility, stamina, endurance, level, experience = snapshot[:8]
+        character = cls({
+            'name': name,
+            'owner': owner,
+            'strength': strength,
+            'agility': agility,
+            'stamina': stamina,
+            'endurance': endurance,
+            'level': level,
+            'experience': experience,
+        })
+        character.restore(snapshot)
+        return character
+
+
+class GameState(Enum):
+    CREATED = 'created'
+    WAITING = 'waiting'
+    RUNNING = 'running'
+    FINISHED = 'finished'
+    EVICTED = 'evicted'
+
 
 class Game:
     MAX_TURNS = 100
@@ -111,23 +207,84 @@ class Game:
     RATING_PER_GAME = 25
     EXP_GAIN = 10
 
-    def __init__(self) -> None:
+    SNAPSHOT_VERSION = 4
+    KEYFRAME_INTERVAL = 10  # Every n-th turn update is sent in full to every client
+
+    def __init__(self, room_token: str = '') -> None:
+        # Games without a room token (tests, simulations) are not persisted
+        self.room_token: str = room_token
+        self.match_id: str = uuid.uuid4().hex  # Makes result reporting idempotent in the users service
+        self.seed: int = random.getrandbits(32)  # Seeds the bots, stored in the replay
         self.characters: dict[int, Optional[Character]] = {1: None, 2: None}
         self.turn_number = 0
         self.game_started: bool = False
+        self.state: GameState = GameState.CREATED
+        self.last_activity: float = time.monotonic()
 
         self.names_dict: dict = {}
         self.observers: list = []
+        self.timer_observers: list = []  # Observers using the legacy per-second timer
+        self.broadcaster: Broadcaster = Broadcaster(on_close=self.remove_observer)
+
+        # Recent client-visible states by version, the bases turn deltas are computed against:
+        # the cached state dicts of both characters, shared while a character is unchanged
+        self.state_version: int = 0
+        self.state_history: OrderedDict[int, tuple[dict, dict]] = OrderedDict()
+
+        # Turn messages written to the match history when the game ends; a game resumed
+        # from a snapshot only logs the turns played after the restart
+        self.game_log: list[str] = []
+        # Packed actions of every turn played, see replay.Replay
+        self.replay_actions: bytearray = bytearray()
 
         self.current_game_task = None
+        self.game_task: Optional[asyncio.Task] = None
+        self.turn_deadline: Optional[TurnDeadline] = None
+        self.turn_deadline_at: Optional[float] = None  # Wall clock time of the current turn deadline
+        self.resume_delay: Optional[float] = None
+        self.turn_ready_at: Optional[float] = None  # When the second player acted, for the turn enqueue time
 
     def calc_experience(self, target_character_level: int, enemy_character_level: int) -> int:
         exp_coef = enemy_character_level / target_character_level
         exp_gain = self.EXP_GAIN * exp_coef
         return int(exp_gain)
 
+    def touch(self) -> None:
+        self.last_activity = time.monotonic()
+        GameHandler.touch(self)
+
+    def is_abandoned(self) -> bool:
+        """
+        A room can be evicted once no player socket observes it, whatever its state.
+
+        Bots are driven by BotPool and never observe their game, so a running game against
+        a bot whose player disconnected is abandoned too.
+        """
+        return not self.observers
+
+    def evict(self) -> None:
+        """
+        Stops the game and drops every reference to observers; the Redis snapshot is kept.
+        """
+        self.state = GameState.EVICTED
+        TurnScheduler().cancel(self.turn_deadline)
+        if self.game_task is not None and not self.game_task.done():
+            self.game_task.cancel()
+        self.game_task = None
+
+        for observer in self.observers:
+            self.broadcaster.remove(observer)
+        self.observers.clear()
+        self.timer_observers.clear()
+        for character in self.characters.values():
+            if character is not None:
+                character.game = None
+
     async def set_character(self, character: Character) -> None:
         logger.debug(f'PLayer {character.OWNER_USERNAME} connected with: Character {character.get_name()}')
+        self.touch()
+        if self.state == GameState.CREATED:
+            self.state = GameState.WAITING
 
         if self.characters[1] is None:
             self.characters[1] = character
@@ -135,11 +292,13 @@ class Game:
             self.characters[2] = character
 
         self.names_dict[character.get_name()] = character
+        character.game = self
 
         if all(self.characters.values()) and not self.game_started:
             await self.send_start()
             self.game_started = True
-            asyncio.create_task(self.start())
+            self.state = GameState.RUNNING
+            self.game_task = asyncio.create_task(self.start())
 
     def get_character_by_name(self, name):
         return self.names_dict[name]
@@ -148,28 +307,57 @@ class Game:
         return self.characters[1].get_status(), self.characters[2].get_status()
 
     def turn_ready(self) -> bool:
-        return all(player.ready_to_act for player in self.characters.values())
-
-    async def start(self) -> None:
-        for i in range(Game.MAX_TURNS):
-            self.turn_number += 1
-            duration = Game.TURN_TIME
-            while duration > 0:
-                if self.turn_ready():
-                    game_message = self.turn()
-                    await self.send_turn(game_message)
-                    break
-
-                await asyncio.sleep(1)
-                duration -= 1
-                await self.send_timer(duration)
-
-            if duration == 0:
-                game_message = self.turn()
-                await self.send_turn(game_message)
+        return self.characters[1].ready_to_act and self.characters[2].ready_to_act
+
+    def action_submitted(self, character: Character) -> None:
+        self.touch()
+        if self.turn_ready():
+            self.turn_ready_at = time.perf_counter()
+            if self.turn_deadline is not None:
+                TurnScheduler().wake_early(self.turn_deadline)
+
+    async def wait_turn(self) -> None:
+        if self.turn_ready():
+            # A restored turn both players already acted in has no deadline any more
+            self.turn_deadline_at = self.resume_delay = None
+            self.save_snapshot(*self.characters.values())
+            metrics.TURNS_VOLUNTARY.inc()
+            return
+
+        delay = Game.TURN_TIME if self.resume_delay is None else self.resume_delay
+        self.resume_delay = None
+        self.turn_deadline = TurnScheduler().schedule(self, delay, timer=self.needs_timer())
+        self.turn_deadline_at = time.time() + delay
+        self.save_snapshot(*self.characters.values())
+        await self.send_turn_started()
+        try:
+            timed_out = await self.turn_deadline.wait()
+        finally:
+            TurnScheduler().cancel(self.turn_deadline)
+            self.turn_deadline = None
+            self.turn_deadline_at = None
+
+        if timed_out:
+            metrics.TURNS_TIMEOUT.inc()
+        else:
+            metrics.TURNS_VOLUNTARY.inc()
+
+    async def start(self, first_turn: int = 0) -> None:
+        for i in range(first_turn, Game.MAX_TURNS):
+            self.turn_number = i + 1
+            await self.wait_turn()
+            # None when the turn timed out
+            ready_at, self.turn_ready_at = self.turn_ready_at, None
+
+            game_message = self.turn()
+            self.game_log.append(game_message)
+            self.touch()
+            await self.send_turn(game_message)
+            if ready_at is not None:
+                metrics.TURN_ENQUEUE.observe(time.perf_counter() - ready_at)
 
             game_result = self.check_end_condition(i)
-            if game_result != '':
+            if game_result is not None:
                 if self.current_game_task is not None:
                     self.current_game_task.cancel()
                     try:
@@ -178,9 +366,28 @@ class Game:
                     except asyncio.CancelledError:
                         pass
 
-                await self.send_game_result(game_result)
+                self.state = GameState.FINISHED
+                self.delete_snapshot()
+                await self.send_game_result(game_result['result'])
+
+                reporting_started = time.perf_counter()
+                # The result first: the match history is best effort
+                await self.report_result(game_result)
+                try:
+                    self.write_log(game_result)
+                except Exception as e:
+                    logger.warning(f'Game {self.room_token}: game log was not written: {e}')
+                metrics.RESULT_REPORT.observe(time.perf_counter() - reporting_started)
+                metrics.GAMES_FINISHED.inc()
                 break
 
+    async def resume(self, first_turn: int) -> None:
+        # Bots restored with the game pick their pending action again
+        self.record_state()
+        self.schedule_bots()
+
+        await self.start(first_turn)
+
     def turn(self) -> str:
         for character in self.characters.values():
             character.skip_turn = False
@@ -188,10 +395,11 @@ class Game:
         p1_action = self.characters[1].get_action()
         p2_action = self.characters[2].get_action()
 
-        status1, status2 = Action.resolve_actions(p1_action, p2_action)
+        status1, status2 = ResolutionTable.resolve(p1_action, p2_action)
 
         self.characters[1].turn(status1)
         self.characters[2].turn(status2)
+        self.replay_actions.append(pack_turn(p1_action, p2_action))
 
         game_message = (
             f'Turn: {self.turn_number}:\n'
@@ -201,103 +409,476 @@ class Game:
 
         return game_message
 
-    def check_end_condition(self, turn_number: int) -> str:
-        c1_name = self.characters[1].OWNER_USERNAME
-        c2_name = self.characters[2].OWNER_USERNAME
+    def check_end_condition(self, turn_number: int) -> Optional[dict]:
+        """
+        Returns the match result once the game is over, None while it goes on.
 
-        if self.characters[1].is_dead and self.characters[2].is_dead:
-            UsersManager.add_draw(c1_name)
-            UsersManager.add_draw(c2_name)
-            return 'draw'
+        The result holds the text sent to players and the changes of every player:
+        outcome, rating change and experience gained by the character.
+        """
+        c1, c2 = self.characters[1], self.characters[2]
 
-        if self.characters[1].is_dead:
-            UsersManager.add_loss(c1_name)
-            UsersManager.change_rating(c1_name, -self.RATING_PER_GAME)
+        if c1.is_dead and c2.is_dead:
+            return self.match_result('draw', None, None)
 
-            UsersManager.add_win(c2_name)
-            UsersManager.change_rating(c2_name, self.RATING_PER_GAME)
+        if c1.is_dead:
+            return self.match_result(f'{c2.OWNER_USERNAME} win', winner=c2, loser=c1)
 
-            experience_to_gain = self.calc_experience(self.characters[2].level, self.characters[1].level)
-            UsersManager.update_experience(self.characters[2].get_name(), experience_to_gain)
+        if c2.is_dead:
+            return self.match_result(f'{c1.OWNER_USERNAME} win', winner=c1, loser=c2)
 
-            return f'{c2_name} win'
-
-        if self.characters[2].is_dead:
-            UsersManager.add_win(c1_name)
-            UsersManager.change_rating(c1_name, self.RATING_PER_GAME)
-
-            UsersManager.add_loss(c2_name)
-            UsersManager.change_rating(c2_name, -self.RATING_PER_GAME)
-
-            experience_to_gain = self.calc_experience(self.characters[1].level, self.characters[2].level)
-            UsersManager.update_experience(self.characters[1].get_name(), experience_to_gain)
+        if turn_number == Game.MAX_TURNS - 1:
+            return self.match_result('draw', None, None)
+        return None
 
-            return f'{c1_name} win'
+    def match_result(self, result: str, winner: Optional[Character], loser: Optional[Character]) -> dict:
+        players = []
+        for character in self.characters.values():
+            if winner is None:
+                outcome, rating, experience = 'draw', 0, 0
+            elif character is winner:
+                outcome, rating = 'win', self.RATING_PER_GAME
+                experience = self.calc_experience(winner.level, loser.level)
+            else:
+                outcome, rating, experience = 'loss', -self.RATING_PER_GAME, 0
+
+            players.append({
+                'username': character.OWNER_USERNAME,
+                'character': character.get_name(),
+                'outcome': outcome,
+                'rating': rating,
+                'experience': experience,
+            })
+
+        return {
+            'match_id': self.match_id,
+            'result': result,
+            'players': players,
+        }
 
-        if turn_number == Game.MAX_TURNS - 1:
-            UsersManager.add_draw(c1_name)
-            UsersManager.add_draw(c2_name)
-            return 'draw'
-        return ''
+    async def report_result(self, game_result: dict) -> None:
+        """
+        Appends the result to the Redis outbox drained by ResultsReporter; games without a
+        room token, or a failing Redis, report straight to the users service instead.
+        """
+        if self.room_token:
+            try:
+                await ResultsPublisher().publish(game_result)
+                return
+            except redis.exceptions.RedisError as e:
+                logger.warning(f'Game {self.room_token}: result was not added to the outbox: {e}')
+
+        await AsyncUsersManager().report_match(game_result)
+
+    def write_log(self, game_result: dict) -> None:
+        """
+        Hands the finished game to the background match history writer, if it is enabled.
+        """
+        writer = GameLogWriter()
+        if not self.room_token or not writer.is_enabled():
+            return
+
+        try:
+            replay = self.replay()
+        except ValueError as e:
+            # Names longer than a replay can hold: the game is logged without its replay
+            logger.warning(f'Game {self.room_token}: replay was not recorded: {e}')
+            replay = None
+
+        writer.submit({'game_log': self.game_log, 'game_result': game_result, 'replay': replay})
+
+    def replay(self) -> bytes:
+        return Replay.record(self).encode()
 
     def set_observer(self, observer):
         self.observers.append(observer)
+        self.broadcaster.add(observer)
+        if getattr(observer, 'legacy_timer', False):
+            self.timer_observers.append(observer)
+            TurnScheduler().set_timer(self.turn_deadline, True)
 
     def remove_observer(self, observer):
-        self.observers.remove(observer)
-
-    async def send_start(self) -> None:
-        message = {
-            'message': 'game started',
+        if observer in self.observers:
+            self.observers.remove(observer)
+        self.broadcaster.remove(observer)
+        if observer in self.timer_observers:
+            self.timer_observers.remove(observer)
+            if not self.timer_observers:
+                TurnScheduler().set_timer(self.turn_deadline, False)
+
+    def start_message(self, message: str = 'game started') -> dict:
+        return {
+            'message_type': 'game started',
+            'message': message,
+            'version': self.state_version,
             'p1_username': self.characters[1].get_name(),
             'p1_status': self.characters[1].get_status(),
             'p2_username': self.characters[2].get_name(),
             'p2_status': self.characters[2].get_status(),
         }
 
-        for observer in self.observers:
-            await observer.send_start(message)
-
-    async def send_turn(self, game_message) -> None:
-        message = {
+    def record_state(self) -> tuple[dict, dict]:
+        """
+        Stores the current state of both characters under a new version.
+        """
+        states = (self.characters[1].get_state()[1], self.characters[2].get_state()[1])
+        self.state_version += 1
+        self.state_history[self.state_version] = states
+        while len(self.state_history) > Game.KEYFRAME_INTERVAL:
+            self.state_history.popitem(last=False)
+        return states
+
+    def turn_message(self, game_message: str, states: tuple[dict, dict]) -> dict:
+        p1_state, p2_state = states
+        return {
+            'message_type': 'turn',
             'message': game_message,
+            'version': self.state_version,
             'p1_username': self.characters[1].get_name(),
-            'p1_status': self.characters[1].get_status(),
+            'p1_status': tuple(p1_state.values()),
             'p1_action': self.characters[1].get_last_action(),
             'p2_username': self.characters[2].get_name(),
-            'p2_status': self.characters[2].get_status(),
+            'p2_status': tuple(p2_state.values()),
+            'p2_action': self.characters[2].get_last_action(),
+        }
+
+    def delta_message(self, game_message: str, states: tuple[dict, dict], base: int) -> dict:
+        changes = {}
+        for slot, state, base_state in zip((1, 2), states, self.state_history[base]):
+            if state is base_state:
+                continue
+            for field, value in state.items():
+                if base_state[field] != value:
+                    changes[f'p{slot}_{field}'] = value
+
+        return {
+            'message_type': 'turn delta',
+            'message': game_message,
+            'version': self.state_version,
+            'base': base,
+            'changes': changes,
+            'p1_action': self.characters[1].get_last_action(),
             'p2_action': self.characters[2].get_last_action(),
         }
 
+    async def send_start(self) -> None:
+        self.record_state()
+        message = self.start_message()
+        await self.broadcaster.broadcast(self.observers, 'send_start', message)
+        await self.publish(message)
+        self.schedule_bots()
+
+    async def send_turn(self, game_message) -> None:
+        states = self.record_state()
+
+        # Clients get a delta against the last version they acknowledged, or a keyframe
+        # when they have not acknowledged anything still in the history; the full message
+        # is only built for them and for spectators
+        message = None
+        keyframe = self.state_version % Game.KEYFRAME_INTERVAL == 0
+        groups: dict[Optional[int], list] = {}
         for observer in self.observers:
-            await observer.send_turn(message)
+            base = getattr(observer, 'acked_version', None)
+            if keyframe or base not in self.state_history or base == self.state_version:
+                base = None
+            groups.setdefault(base, []).append(observer)
+
+        for base, observers in groups.items():
+            if base is None:
+                message = message or self.turn_message(game_message, states)
+                await self.broadcaster.broadcast(observers, 'send_turn', message)
+            else:
+                await self.broadcaster.broadcast(observers, 'send_turn', self.delta_message(game_message, states, base))
+
+        if self.is_watched():
+            await self.publish(message or self.turn_message(game_message, states))
+        self.schedule_bots()
+
+    def schedule_bots(self) -> None:
+        """
+        Lets the bots of the game pick their action for the current state version.
+        """
+        for character in self.characters.values():
+            if character.is_bot and not character.is_dead:
+                BotPool().schedule(character, self.state_version)
+
+    def turn_started_message(self) -> dict:
+        return {
+            'message_type': 'turn_started',
+            'turn': self.turn_number,
+            'deadline': self.turn_deadline_at,
+            'server_time': time.time(),
+        }
+
+    async def send_turn_started(self) -> None:
+        # Clients count down to the deadline locally; bots do not need it
+        sockets = [observer for observer in self.observers if Broadcaster.is_socket(observer)]
+        message = self.turn_started_message()
+        await self.broadcaster.broadcast(sockets, 'send_turn_started', message)
+        await self.publish(message)
+
+    def needs_timer(self) -> bool:
+        """
+        Per-second timer updates are only sent to clients that opted into the legacy timer.
+        """
+        return bool(self.timer_observers)
 
     async def send_timer(self, timer: int) -> None:
         message = {
+            'message_type': 'timer',
             'message': 'timer update',
             'timer': timer,
         }
 
-        for observer in self.observers:
-            await observer.send_timer(message)
+        # Timer updates are superseded by the next one, so slow clients may skip them
+        await self.broadcaster.broadcast(list(self.timer_observers), 'send_timer', message, droppable=True)
 
     async def send_game_result(self, game_result):
         message = {
+            'message_type': 'game result',
             'message': f'game ended: {game_result}',
         }
 
-        for observer in self.observers:
-            await observer.send_game_result(message)
+        await self.broadcaster.broadcast(self.observers, 'send_game_result', message)
+        await self.publish(message)
+
+    async def publish(self, message: dict) -> None:
+        """
+        Sends the message once to the spectators of the room, on whatever worker they are.
+        Players have been sent the message in-process before; rooms nobody watches are skipped.
+        """
+        if not self.is_watched():
+            return
+
+        try:
+            await spectators.publish(self.room_token, message)
+        except Exception as e:
+            logger.warning(f'Game {self.room_token}: message was not published to spectators: {e}')
+
+    def is_watched(self) -> bool:
+        return bool(self.room_token) and spectators.SpectatorCounter().is_watched(self.room_token)
+
+    def snapshot(self, *characters: Character) -> dict[str, bytes]:
+        """
+        Encodes the game record and the given characters as Redis hash fields.
+
+        Games are saved once per turn, when it starts, so a restored game replays that turn.
+        """
+        data = {'game': [Game.SNAPSHOT_VERSION, self.turn_number, self.game_started, self.turn_deadline_at,
+                         self.match_id, self.seed, bytes(self.replay_actions)]}
+        for slot, character in self.characters.items():
+            if character is not None and character in characters:
+                data[str(slot)] = character.snapshot()
+
+        return {field: msgpack.packb(value) for field, value in data.items()}
+
+    def save_snapshot(self, *characters: Character) -> None:
+        """
+        Hands the game record and the given characters to the snapshot writer, off the event loop.
+        """
+        if not self.room_token:
+            return
+
+        SnapshotWriter().submit(self.room_token, self.snapshot(*characters))
+
+    def delete_snapshot(self) -> None:
+        if not self.room_token:
+            return
+
+        SnapshotWriter().delete(self.room_token)
+
+    @classmethod
+    def from_snapshot(cls, room_token: str, snapshot: dict[bytes, bytes]) -> Optional[Game]:
+        """
+        Rebuilds a game from its Redis snapshot; returns None for unknown snapshot versions.
+        """
+        from game_app.game.ai_logic import Bot, bot_class
+
+        data = {field.decode('utf-8'): msgpack.unpackb(value) for field, value in snapshot.items()}
+        version, *game_record = data['game']
+        if version != Game.SNAPSHOT_VERSION:
+            return None
+        turn_number, game_started, turn_deadline_at, match_id, seed, replay_actions = game_record
+
+        game = cls(room_token)
+        game.match_id = match_id
+        game.seed = seed
+        game.replay_actions = bytearray(replay_actions)
+        game.turn_number = turn_number
+        game.game_started = game_started
+        game.state = GameState.RUNNING if game_started else GameState.WAITING
+
+        for slot in (1, 2):
+            character_snapshot = data.get(str(slot))
+            if character_snapshot is None:
+                continue
+
+            if character_snapshot[1] == Bot.OWNER:
+                character = bot_class().from_snapshot(character_snapshot, seed=f'{seed}:{turn_number}')
+            else:
+                character = Character.from_snapshot(character_snapshot)
+
+            game.characters[slot] = character
+            game.names_dict[character.get_name()] = character
+            character.game = game
+
+        if turn_deadline_at is not None:
+            # Snapshots are written when a turn starts: that turn is replayed with the time that was left
+            game.turn_deadline_at = turn_deadline_at
+            game.resume_delay = max(0.0, turn_deadline_at - time.time())
+
+        return game
+
+    @classmethod
+    async def restore(cls, room_token: str) -> Optional[Game]:
+        """
+        Loads the game from its Redis snapshot off the event loop; the caller resumes it.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, RedisServer().get_game_snapshot, room_token)
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Game {room_token}: snapshot was not loaded: {e}')
+            return None
+
+        if not snapshot:
+            return None
+
+        return cls.from_snapshot(room_token, snapshot)
 
 
 class GameHandler:
-    games = {}
+    """
+    Registry of the rooms hosted by this worker.
+
+    Rooms are kept in least recently used order. A background sweeper evicts finished rooms
+    and rooms whose second player never joined. Before a room is added past MAX_GAMES the
+    least recently used room no player is connected to is evicted.
+
+    A room is only hosted while this worker holds its lease, see GameLeases: a running game
+    another worker lost is resumed from its snapshot once that worker's lease expired.
+    """
+    MAX_GAMES = 10000
+    WAITING_TTL = 300  # Seconds a room may wait for its players
+    FINISHED_TTL = 60  # Seconds a finished room is kept for late observers
+    SWEEP_INTERVAL = 30
+
+    games: OrderedDict[str, Game] = OrderedDict()
+    evicted_count = 0
+    SWEEPER_TASK = None
+
+    @classmethod
+    def get(cls, room_token: str) -> Optional[Game]:
+        return cls.games.get(room_token)
 
     @classmethod
-    def get_or_add(cls, room_token: str) -> Game:
+    async def get_or_add(cls, room_token: str) -> Optional[Game]:
+        """
+        Returns the room, restored from its snapshot or created if this worker does not host it yet.
+
+        Returns None while another worker holds the lease of the room.
+        """
+        room_game = cls.games.get(room_token)
+        if room_game is not None:
+            cls.games.move_to_end(room_token)
+            return room_game
+
+        if not await GameLeases().acquire(room_token):
+            logger.info(f'Game {room_token} is hosted by another worker')
+            return None
+        restored = await Game.restore(room_token)
+
+        # Another socket of the room may have added it while the lease and snapshot were loaded
         room_game = cls.games.get(room_token)
-        if not room_game:
-            room_game = Game()
-            cls.games[room_token] = room_game
+        if room_game is not None:
+            return room_game
+
+        cls.enforce_limit()
+        room_game = restored or Game(room_token)
+        cls.games[room_token] = room_game
+        cls.start_sweeper()
+        if room_game.game_started:
+            logger.info(f'Game {room_token}: resuming turn {room_game.turn_number}')
+            room_game.game_task = asyncio.create_task(room_game.resume(room_game.turn_number - 1))
 
         return room_game
+
+    @classmethod
+    def touch(cls, game: Game) -> None:
+        if cls.games.get(game.room_token) is game:
+            cls.games.move_to_end(game.room_token)
+
+    @classmethod
+    def evict(cls, room_token: str) -> None:
+        game = cls.games.pop(room_token, None)
+        GameLeases().release(room_token)
+        if game is not None:
+            game.evict()
+            cls.evicted_count += 1
+            logger.debug(f'Game {room_token} evicted')
+
+    @classmethod
+    def enforce_limit(cls) -> None:
+        """
+        Makes room for one more game, never evicting a room a player is connected to.
+        """
+        while len(cls.games) >= cls.MAX_GAMES:
+            room_token = next((token for token, game in cls.games.items() if game.is_abandoned()), None)
+            if room_token is None:
+                logger.warning(f'Games limit {cls.MAX_GAMES} exceeded, no abandoned room to evict')
+                return
+            cls.evict(room_token)
+
+    @classmethod
+    def sweep(cls) -> None:
+        now = time.monotonic()
+        expired = []
+        for room_token, game in cls.games.items():
+            idle = now - game.last_activity
+            if game.state == GameState.FINISHED and idle > cls.FINISHED_TTL:
+                expired.append(room_token)
+            elif game.state in (GameState.CREATED, GameState.WAITING) and idle > cls.WAITING_TTL:
+                expired.append(room_token)
+
+        for room_token in expired:
+            cls.evict(room_token)
+
+    @classmethod
+    def start_sweeper(cls) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of the event loop (management commands, tests) there is nothing to sweep
+            return
+
+        if cls.SWEEPER_TASK is None or cls.SWEEPER_TASK.done():
+            cls.SWEEPER_TASK = asyncio.create_task(cls.sweep_loop())
+
+    @classmethod
+    async def sweep_loop(cls) -> None:
+        try:
+            while cls.games:
+                await asyncio.sleep(cls.SWEEP_INTERVAL)
+                cls.sweep()
+        except asyncio.CancelledError:
+            logger.debug('Games sweeper was cancelled.')
+        finally:
+            cls.SWEEPER_TASK = None
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        stats = {
+            'live': 0,
+            'waiting': 0,
+            'finished': 0,
+            'evicted': cls.evicted_count,
+        }
+        for game in cls.games.values():
+            if game.state == GameState.RUNNING:
+                stats['live'] += 1
+            elif game.state in (GameState.CREATED, GameState.WAITING):
+                stats['waiting'] += 1
+            elif game.state == GameState.FINISHED:
+                stats['finished'] += 1
+
+        return stats
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import mongoengine
+
+from django.conf import settings
+
+from game_app.models import GameModel
+
+
+logger = logging.getLogger('game_server')
+
+
+class GameLogWriter:
+    """
+    Process-wide background writer of finished games into GameModel.
+
+    Games hand over their log with submit, which only appends to a bounded queue. A flush
+    task inserts the queue with insert_many once BATCH_SIZE games are waiting or every
+    FLUSH_INTERVAL seconds; the insert runs on a dedicated thread, so Mongo latency never
+    reaches the event loop. When MAX_PENDING games are waiting the oldest ones are dropped.
+
+    The collection can be passed in (anything with insert_many); by default GameModel's
+    collection is used once settings.MONGO_URI is configured.
+    """
+    _instance = None
+
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL = 5  # Seconds
+    MAX_PENDING = 2000
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.collection = None
+            cls._instance.pending = deque()
+            cls._instance.dropped = 0
+            cls._instance.written = 0
+            cls._instance.batch_ready = None
+            cls._instance.flush_task = None
+            cls._instance.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='game_log')
+        return cls._instance
+
+    def __init__(self, collection=None) -> None:
+        if collection is not None:
+            self.collection = collection
+
+    def is_enabled(self) -> bool:
+        return self.collection is not None or bool(settings.MONGO_URI)
+
+    def submit(self, record: dict) -> None:
+        """
+        Queues a finished game: {'game_log': [turn messages], 'game_result': {...}, 'replay': bytes}.
+        """
+        if not self.is_enabled():
+            return
+
+        if len(self.pending) >= GameLogWriter.MAX_PENDING:
+            self.pending.popleft()
+            self.dropped += 1
+            logger.warning(f'Game log queue is full, {self.dropped} game logs dropped so far')
+
+        self.pending.append(record)
+
+        if self.batch_ready is None:
+            self.batch_ready = asyncio.Event()
+        if len(self.pending) >= GameLogWriter.BATCH_SIZE:
+            self.batch_ready.set()
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        try:
+            while self.pending:
+                if len(self.pending) < GameLogWriter.BATCH_SIZE:
+                    try:
+                        await asyncio.wait_for(self.batch_ready.wait(), GameLogWriter.FLUSH_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                self.batch_ready.clear()
+
+                if not await self.flush():
+                    await asyncio.sleep(GameLogWriter.FLUSH_INTERVAL)
+        except asyncio.CancelledError:
+            logger.debug('Game log writer was cancelled.')
+        finally:
+            self.flush_task = None
+
+    async def flush(self) -> bool:
+        """
+        Writes one batch; returns False if it failed and was put back in the queue.
+        """
+        batch = [self.pending.popleft() for _ in range(min(GameLogWriter.BATCH_SIZE, len(self.pending)))]
+        if not batch:
+            return True
+
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.insert, batch)
+        except Exception as e:
+            logger.warning(f'Game logs were not written, {len(batch)} games will be retried: {e}')
+            free = GameLogWriter.MAX_PENDING - len(self.pending)
+            self.dropped += max(0, len(batch) - free)
+            self.pending.extendleft(reversed(batch[:free]))
+            return False
+
+        self.written += len(batch)
+        return True
+
+    def insert(self, batch: list) -> None:
+        documents = [
+            GameModel(
+                game_log='\n\n'.join(record['game_log']),
+                game_result=record['game_result'],
+                replay=record.get('replay'),
+            ).to_mongo().to_dict()
+            for record in batch
+        ]
+        self.get_collection().insert_many(documents, ordered=False)
+
+    def get_collection(self):
+        if self.collection is None:
+            mongoengine.connect(host=settings.MONGO_URI)
+            self.collection = GameModel._get_collection()
+        return self.collection
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.flush_task is not None:
+            cls._instance.flush_task.cancel()
+        cls._instance = None
@@ -1,7 +1,7 @@
 import asyncio
 import logging
 
-from game_app.game.ai_logic import Bot
+from game_app.game.ai_logic import bot_class
 from game_app.game.game import GameHandler
 
 logger = logging.getLogger('game_server')
@@ -115,9 +115,11 @@ class GameSearching:
 
         for user in usernames:
             if user == 'Bot':
-                new_bot = Bot()
-                game = GameHandler.get_or_add(room_token)
-                game.set_observer(new_bot)
+                game = await GameHandler.get_or_add(room_token)
+                if game is None:
+                    logger.warning(f'Room {room_token} for the bot game is hosted by another worker')
+                    continue
+                new_bot = bot_class()(seed=game.seed)
                 await game.set_character(new_bot)
             else:
                 await GameSearching.OBSERVERS[user].game_match(message)
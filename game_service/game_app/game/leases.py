@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+from game_app.utils import RedisServer
+
+
+logger = logging.getLogger('game_server')
+
+
+class GameLeases:
+    """
+    Process-wide ownership of the rooms hosted by this worker.
+
+    A worker only hosts a room while it holds the room's lease, a game_owner_<room> key
+    set with NX and a TTL. A background task refreshes the leases of every hosted room
+    well before they expire. A worker that dies stops refreshing, and another worker can
+    take the room over from its snapshot once the lease expired, so one match never has
+    two turn loops. Rooms whose lease was lost, or could not be refreshed for a whole TTL,
+    are evicted locally.
+    """
+    _instance = None
+
+    TTL = 30  # Seconds
+    REFRESH_INTERVAL = 10
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.redis = None
+            cls._instance.owner = uuid.uuid4().hex
+            cls._instance.rooms = set()
+            cls._instance.refreshed_at = time.monotonic()
+            cls._instance.refresh_task = None
+            cls._instance.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='leases')
+        return cls._instance
+
+    async def acquire(self, room_token: str) -> bool:
+        """
+        Returns whether this worker holds the lease of the room, taking it if it is free.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            acquired = await loop.run_in_executor(
+                self.executor, self.get_redis().acquire_game_lease, room_token, self.owner, GameLeases.TTL,
+            )
+        except redis.exceptions.RedisError as e:
+            logger.warning(f'Game {room_token}: lease was not acquired: {e}')
+            return False
+
+        if acquired:
+            if not self.rooms:
+                self.refreshed_at = time.monotonic()
+            self.rooms.add(room_token)
+            self.schedule()
+        return acquired
+
+    def release(self, room_token: str) -> None:
+        if room_token not in self.rooms:
+            return
+        self.rooms.discard(room_token)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of the event loop the lease simply expires
+            return
+        loop.run_in_executor(self.executor, self.release_lease, room_token)
+
+    def release_lease(self, room_token: str) -> None:
+        try:
+            self.get_redis().release_game_lease(room_token, self.owner)
+        except redis.exceptions.RedisError as e:
+            logger.debug(f'Game {room_token}: lease was not released, it expires: {e}')
+
+    def schedule(self) -> None:
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        try:
+            while self.rooms:
+                await asyncio.sleep(GameLeases.REFRESH_INTERVAL)
+                await self.refresh()
+        except asyncio.CancelledError:
+            logger.debug('Lease refresher was cancelled.')
+        finally:
+            self.refresh_task = None
+
+    async def refresh(self) -> None:
+        rooms = list(self.rooms)
+        if not rooms:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            owned = await loop.run_in_executor(
+                self.executor, self.get_redis().refresh_game_leases, rooms, self.owner, GameLeases.TTL,
+            )
+        except redis.exceptions.RedisError as e:
+            if time.monotonic() - self.refreshed_at < GameLeases.TTL:
+                logger.warning(f'Leases of {len(rooms)} games were not refreshed: {e}')
+                return
+            # Other workers may have taken the rooms over by now
+            logger.error(f'Leases of {len(rooms)} games expired: {e}')
+            owned = [False] * len(rooms)
+        else:
+            self.refreshed_at = time.monotonic()
+
+        lost = [room_token for room_token, kept in zip(rooms, owned) if not kept and room_token in self.rooms]
+        if lost:
+            from game_app.game.game import GameHandler
+
+            for room_token in lost:
+                logger.warning(f'Game {room_token}: lease lost, evicting the room')
+                self.rooms.discard(room_token)
+                GameHandler.evict(room_token)
+
+    def get_redis(self) -> RedisServer:
+        if self.redis is None:
+            self.redis = RedisServer()
+        return self.redis
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.refresh_task is not None:
+            cls._instance.refresh_task.cancel()
+        cls._instance = None
@@ -0,0 +1,212 @@
+"""
+Allocation-free fight state for lookahead search.
+
+A fight is a flat list of STATE_SIZE ints, health, energy, skip and is_dead for both
+sides, next to a tuple of constants per side taken from Character. step applies one turn
+in place with the coefficients of ResolutionTable flattened per pair of action codes, so
+playouts create no Game, Character, Action or Status objects. The results match
+Game.turn, which resolves turns through the same table.
+"""
+import random
+import time
+
+from bisect import bisect_right
+
+from typing import Optional
+
+from game_app.game.actions import ActionsFactory, ResolutionTable
+from game_app.game.bot_policy import BotPolicy
+
+
+ACTION_NAMES: tuple = tuple(ActionsFactory.action_classes.keys())
+ACTION_CODES: dict[str, int] = {name: code for code, name in enumerate(ACTION_NAMES)}
+ACTIONS = len(ACTION_NAMES)
+
+ATTACK = ACTION_CODES['attack']
+DEFENCE = ACTION_CODES['defence']
+FEINT = ACTION_CODES['feint']
+REST = ACTION_CODES['rest']
+PASS = ACTION_CODES['pass']
+
+# State layout, SIDE apart for the second fighter
+HEALTH, ENERGY, SKIP, DEAD = range(4)
+SIDE = 4
+STATE_SIZE = 2 * SIDE
+
+# Available action codes by the index available returns, mirroring Character.get_actions
+NO_ACTIONS, SKIP_ACTIONS, TIRED_ACTIONS, ALL_ACTIONS = range(4)
+AVAILABLE: tuple = ((), (PASS,), (FEINT, REST), (ATTACK, DEFENCE, FEINT, REST))
+AVAILABLE_MASKS: tuple = tuple(sum(BotPolicy.ACTION_BITS[ACTION_NAMES[code]] for code in codes) for codes in AVAILABLE)
+
+
+def compile_coefficients() -> tuple:
+    """
+    Flattens ResolutionTable into one tuple per left * ACTIONS + right action code:
+    left health (4), left energy (4), left skip, right health (4), right energy (4), right skip.
+    """
+    classes = ActionsFactory.action_classes
+    coefficients = []
+    for left_name in ACTION_NAMES:
+        for right_name in ACTION_NAMES:
+            entry = ResolutionTable.table[(classes[left_name], classes[right_name])]
+            flat = []
+            for health, energy, skip in entry:
+                flat.extend(health)
+                flat.extend(energy)
+                flat.append(int(skip))
+            coefficients.append(tuple(flat))
+    return tuple(coefficients)
+
+
+COEFFICIENTS: tuple = compile_coefficients()
+
+
+def constants(character) -> tuple:
+    """max energy, damage, energy per action, base and active energy recharge of a Character."""
+    return character.MAX_ENERGY, character.damage, character.epa, character.ber, character.aer
+
+
+def load(state: list, character, opponent) -> None:
+    for offset, fighter in ((0, character), (SIDE, opponent)):
+        state[offset + HEALTH] = fighter.health
+        state[offset + ENERGY] = fighter.energy
+        state[offset + SKIP] = int(fighter.skip_turn)
+        state[offset + DEAD] = int(fighter.is_dead)
+
+
+def available(state: list, offset: int, epa: int) -> int:
+    if state[offset + DEAD]:
+        return NO_ACTIONS
+    if state[offset + SKIP]:
+        return SKIP_ACTIONS
+    if state[offset + ENERGY] < epa:
+        return TIRED_ACTIONS
+    return ALL_ACTIONS
+
+
+def step(state: list, left: tuple, right: tuple, left_action: int, right_action: int) -> None:
+    """
+    Plays one turn in place, like Game.turn followed by Character.turn for both sides.
+    """
+    (lh0, lh1, lh2, lh3, le0, le1, le2, le3, left_skip,
+     rh0, rh1, rh2, rh3, re0, re1, re2, re3, right_skip) = COEFFICIENTS[left_action * ACTIONS + right_action]
+
+    left_max, left_damage, left_epa, left_ber, left_aer = left
+    right_max, right_damage, right_epa, right_ber, right_aer = right
+    # Energy cost and power as built by Character.build_action
+    lc = left_epa
+    lp = left_damage if left_action == ATTACK else left_aer if left_action == REST else 0
+    rc = right_epa
+    rp = right_damage if right_action == ATTACK else right_aer if right_action == REST else 0
+
+    health = state[HEALTH] + lh0 * lc + lh1 * lp + lh2 * rc + lh3 * rp
+    state[HEALTH] = health
+    if health <= 0:
+        state[DEAD] = 1
+    energy = state[ENERGY] + le0 * lc + le1 * lp + le2 * rc + le3 * rp
+    state[ENERGY] = (0 if energy < 0 else left_max if energy > left_max else energy) + left_ber
+    state[SKIP] = left_skip
+
+    health = state[SIDE + HEALTH] + rh0 * lc + rh1 * lp + rh2 * rc + rh3 * rp
+    state[SIDE + HEALTH] = health
+    if health <= 0:
+        state[SIDE + DEAD] = 1
+    energy = state[SIDE + ENERGY] + re0 * lc + re1 * lp + re2 * rc + re3 * rp
+    state[SIDE + ENERGY] = (0 if energy < 0 else right_max if energy > right_max else energy) + right_ber
+    state[SIDE + SKIP] = right_skip
+
+
+def compile_policy(policy: BotPolicy) -> list:
+    """
+    The table of a BotPolicy with action codes instead of names, for playouts.
+    """
+    return [(tuple(ACTION_CODES[name] for name in names), cumulative) for names, cumulative in policy.table]
+
+
+class MonteCarloSearch:
+    """
+    Flat Monte Carlo search over the first action of the searching side.
+
+    Candidate actions are tried round robin, each followed by up to depth turns where both
+    sides play the compiled bot policy, the most likely model of an opponent we know. The
+    action with the best mean result wins. A decision stops after playouts playouts or
+    time_budget seconds, whichever comes first, so its CPU cost is bounded.
+    """
+
+    def __init__(self, playouts: int, time_budget: Optional[float], depth: int, rng: random.Random,
+                 policy: BotPolicy) -> None:
+        self.playouts: int = playouts
+        self.time_budget: Optional[float] = time_budget
+        self.depth: int = depth
+        self.rng: random.Random = rng
+        self.table: list = compile_policy(policy)
+        self.root: list = [0] * STATE_SIZE
+        self.state: list = [0] * STATE_SIZE
+        self.last_playouts: int = 0
+
+    def search(self, character, opponent) -> int:
+        """
+        Returns the action code with the best mean playout result for character.
+        """
+        own, enemy = constants(character), constants(opponent)
+        root, state = self.root, self.state
+        load(root, character, opponent)
+
+        candidates = AVAILABLE[available(root, 0, own[2])]
+        if len(candidates) <= 1:
+            self.last_playouts = 0
+            return candidates[0] if candidates else PASS
+
+        totals = [0.0] * len(candidates)
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        move = self.move
+        depth = self.depth
+
+        playouts = 0
+        while playouts < self.playouts:
+            index = playouts % len(candidates)
+            state[:] = root
+            action = candidates[index]
+
+            for _ in range(depth):
+                step(state, own, enemy, action, move(state, SIDE, 0, enemy[2], own[2]))
+                if state[DEAD] or state[SIDE + DEAD]:
+                    break
+                action = move(state, 0, SIDE, own[2], enemy[2])
+
+            totals[index] += self.evaluate(state)
+            playouts += 1
+            if deadline is not None and playouts % len(candidates) == 0 and time.perf_counter() >= deadline:
+                break
+
+        self.last_playouts = playouts
+        rounds = [playouts // len(candidates) + (index < playouts % len(candidates)) for index in range(len(candidates))]
+        best = max(range(len(candidates)), key=lambda index: totals[index] / max(1, rounds[index]))
+        return candidates[best]
+
+    def move(self, state: list, offset: int, other: int, epa: int, other_epa: int) -> int:
+        """
+        Action code picked by the policy for the side at offset, like Bot.make_move.
+        """
+        energy = state[offset + ENERGY]
+        if energy < BotPolicy.PASS_ENERGY:
+            return PASS
+
+        health, other_health = state[offset + HEALTH], state[other + HEALTH]
+        key = ((((energy < BotPolicy.LOW_ENERGY) * 2 + (energy > state[other + ENERGY])) * 3
+                + (health > other_health) - (health < other_health) + 1) * 2
+               + (available(state, other, other_epa) == ALL_ACTIONS)) * BotPolicy.MASKS \
+            + AVAILABLE_MASKS[available(state, offset, epa)]
+        codes, cumulative = self.table[key]
+        if len(codes) == 1:
+            return codes[0]
+        return codes[bisect_right(cumulative, self.rng.random() * cumulative[-1], 0, len(codes) - 1)]
+
+    @staticmethod
+    def evaluate(state: list) -> float:
+        """1 for a win, -1 for a loss, 0 for a double knockout, the health balance otherwise."""
+        dead, enemy_dead = state[DEAD], state[SIDE + DEAD]
+        if dead or enemy_dead:
+            return enemy_dead - dead
+        health, enemy_health = state[HEALTH], state[SIDE + HEALTH]
+        return (health - enemy_health) / (health + enemy_health)
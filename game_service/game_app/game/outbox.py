@@ -0,0 +1,169 @@
+"""
+Durable outbox of finished matches.
+
+Game appends every result to a Redis Stream with one XADD; ResultsReporter workers read
+the stream through a consumer group and send the results to the users service in
+batches. Entries are only acknowledged once the users service applied them, so results
+survive users service outages and worker restarts. The users service records match ids,
+which makes the at-least-once delivery of the stream apply every match exactly once.
+"""
+import asyncio
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import msgpack
+import redis
+import requests
+
+from game_app.utils import RedisServer
+from game_service.microservices.users_api import get_users_record_matches_url
+
+
+logger = logging.getLogger('game_server')
+
+
+def publish_match_result(redis_server: RedisServer, match: dict) -> None:
+    data = msgpack.packb({'match_id': match['match_id'], 'players': match['players']})
+    redis_server.add_match_result(match['match_id'], data)
+
+
+class ResultsPublisher:
+    """
+    Process-wide producer of the match results stream.
+
+    Every game of the worker appends its result through one shared Redis client, and the
+    XADD runs on a dedicated thread, so Redis latency never reaches the event loop.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.redis = None
+            cls._instance.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='results')
+        return cls._instance
+
+    async def publish(self, match: dict) -> None:
+        """
+        Raises:
+            RedisError: If the result could not be added to the stream.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, publish_match_result, self.get_redis(), match)
+
+    def get_redis(self) -> RedisServer:
+        if self.redis is None:
+            self.redis = RedisServer()
+        return self.redis
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._instance = None
+
+
+class ResultsReporter:
+    """
+    Consumer group worker that drains the match results stream into the users service.
+
+    A batch is sent as one record_matches request. If the users service rejects the batch
+    as invalid, its matches are sent one by one and the rejected ones are moved to the dead
+    letter stream; other failures leave the batch pending to be claimed again later. Entries
+    delivered more than MAX_DELIVERIES times are dead-lettered as well. Redis errors, a
+    restart for example, are retried with the same backoff and recreate the consumer group.
+    """
+    BATCH_SIZE = 200
+    BLOCK_MS = 5000
+    CLAIM_IDLE_MS = 30000  # Pending entries idle for this long are retried
+    MAX_DELIVERIES = 5
+    RETRY_DELAY = 1  # Seconds, doubled after every failed batch
+    MAX_RETRY_DELAY = 60
+    TIMEOUT = (3.05, 10)
+
+    def __init__(self, consumer: str, redis_server: Optional[RedisServer] = None,
+                 session: Optional[requests.Session] = None, batch_size: int = BATCH_SIZE) -> None:
+        self.consumer: str = consumer
+        self.batch_size: int = batch_size
+        self.redis: RedisServer = redis_server if redis_server is not None else RedisServer()
+        self.session: requests.Session = session if session is not None else requests.Session()
+        self.retry_delay: float = 0
+        self.group_created: bool = False
+
+    def run(self, once: bool = False) -> None:
+        while True:
+            try:
+                if not self.group_created:
+                    self.redis.create_results_group()
+                    self.group_created = True
+                self.process_batch()
+                self.retry_delay = 0
+            except (requests.exceptions.RequestException, redis.exceptions.RedisError) as e:
+                if isinstance(e, redis.exceptions.RedisError):
+                    # A restarted Redis may have lost the stream and its group
+                    self.group_created = False
+                self.retry_delay = min(max(self.retry_delay * 2, ResultsReporter.RETRY_DELAY),
+                                       ResultsReporter.MAX_RETRY_DELAY)
+                logger.warning(f'Match results were not reported, retrying in {self.retry_delay}s: {e}')
+                time.sleep(self.retry_delay)
+
+            if once:
+                return
+
+    def fetch(self) -> list:
+        entries = self.redis.claim_match_results(self.consumer, ResultsReporter.CLAIM_IDLE_MS, self.batch_size)
+        if entries:
+            deliveries = self.redis.get_match_results_deliveries([entry_id for entry_id, _ in entries])
+            retried = []
+            for entry_id, fields in entries:
+                if deliveries.get(entry_id, 0) > ResultsReporter.MAX_DELIVERIES:
+                    self.redis.dead_letter_match_result(entry_id, fields, 'too many deliveries')
+                else:
+                    retried.append((entry_id, fields))
+            entries = retried
+
+        # Only wait for new results when nothing is left to retry
+        block_ms = None if entries else ResultsReporter.BLOCK_MS
+        count = self.batch_size - len(entries)
+        if count > 0:
+            entries += self.redis.read_match_results(self.consumer, count, block_ms)
+        return entries
+
+    def process_batch(self) -> int:
+        """
+        Reports one batch; returns the number of acknowledged entries.
+
+        Raises:
+            RequestException: If the users service could not be reached or failed.
+            RedisError: If the stream could not be read or updated.
+        """
+        entries = self.fetch()
+        if not entries:
+            return 0
+
+        matches = [msgpack.unpackb(fields[b'data']) for _, fields in entries]
+        response = self.post(matches)
+        if response.status_code != 400:
+            response.raise_for_status()
+            self.redis.ack_match_results([entry_id for entry_id, _ in entries])
+            return len(entries)
+
+        # Find the invalid matches instead of blocking the stream with the whole batch
+        acknowledged = []
+        for (entry_id, fields), match in zip(entries, matches):
+            response = self.post([match])
+            if response.status_code == 400:
+                self.redis.dead_letter_match_result(entry_id, fields, response.text)
+            else:
+                response.raise_for_status()
+                acknowledged.append(entry_id)
+
+        if acknowledged:
+            self.redis.ack_match_results(acknowledged)
+        return len(acknowledged)
+
+    def post(self, matches: list) -> requests.Response:
+        return self.session.post(
+            get_users_record_matches_url(), json={'matches': matches}, timeout=ResultsReporter.TIMEOUT,
+        )
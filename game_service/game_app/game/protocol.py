@@ -0,0 +1,112 @@
+"""
+Wire codecs of the game WebSocket.
+
+JSON text frames are the default. Clients that offer the MSGPACK_SUBPROTOCOL get binary
+msgpack frames instead: every message is an array whose first item is the integer message
+type, followed by the values of FIELDS for that type. Statuses are packed as
+[health, energy, [action codes], is_dead] and action names as integer codes. The changes
+of a turn delta are a map from STATE_FIELDS codes to the new values.
+
+Clients send {"choice": name} or {"ack": version} as JSON, or [action code] and
+[CLIENT_ACK, version] as msgpack. An ack of null asks for the full state again, sent by
+clients that got a delta against a version they no longer have.
+"""
+import json
+
+import msgpack
+
+from game_app.game.actions import ActionsFactory
+
+
+JSON_CODEC = 'json'
+MSGPACK_CODEC = 'msgpack'
+MSGPACK_SUBPROTOCOL = 'game.msgpack.v1'
+
+MESSAGE_TYPES: tuple = (
+    'player connect',
+    'game started',
+    'turn',
+    'timer',
+    'game result',
+    'turn_started',
+    'turn delta',
+)
+MESSAGE_CODES: dict[str, int] = {name: code for code, name in enumerate(MESSAGE_TYPES)}
+
+FIELDS: dict[str, tuple] = {
+    'player connect': ('message',),
+    'game started': ('message', 'version', 'p1_username', 'p1_status', 'p2_username', 'p2_status'),
+    'turn': ('message', 'version', 'p1_username', 'p1_status', 'p1_action', 'p2_username', 'p2_status',
+             'p2_action'),
+    'timer': ('message', 'timer'),
+    'game result': ('message',),
+    'turn_started': ('turn', 'deadline', 'server_time'),
+    'turn delta': ('message', 'version', 'base', 'changes', 'p1_action', 'p2_action'),
+}
+
+STATE_FIELDS: tuple = tuple(
+    f'p{slot}_{field}' for slot in (1, 2) for field in ('health', 'energy', 'actions', 'is_dead')
+)
+STATE_CODES: dict[str, int] = {name: code for code, name in enumerate(STATE_FIELDS)}
+
+CLIENT_ACK = -1
+
+ACTION_NAMES: tuple = tuple(ActionsFactory.action_classes.keys())
+ACTION_CODES: dict[str, int] = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+
+def pack_action(action_name: str):
+    return ACTION_CODES.get(action_name)
+
+
+def pack_status(status) -> list:
+    health, energy, actions, is_dead = status
+    return [health, energy, sorted(ACTION_CODES[action] for action in actions), is_dead]
+
+
+def pack_changes(changes: dict) -> dict:
+    packed = {}
+    for field, value in changes.items():
+        if field.endswith('_actions'):
+            value = sorted(ACTION_CODES[action] for action in value)
+        packed[STATE_CODES[field]] = value
+    return packed
+
+
+def pack_message(data: dict) -> list:
+    message_type = data['message_type']
+    packed = [MESSAGE_CODES[message_type]]
+    for field in FIELDS[message_type]:
+        value = data.get(field)
+        if field.endswith('_status'):
+            value = pack_status(value)
+        elif field.endswith('_action'):
+            value = pack_action(value)
+        elif field == 'changes':
+            value = pack_changes(value)
+        packed.append(value)
+    return packed
+
+
+def encode(data: dict, codec: str = JSON_CODEC):
+    """Returns a text frame for JSON and a binary frame for msgpack."""
+    if codec == MSGPACK_CODEC:
+        return msgpack.packb(pack_message(data))
+    return json.dumps(data)
+
+
+def decode_client_message(text_data=None, bytes_data=None) -> dict:
+    """
+    Returns a client message as {"choice": action name} or {"ack": state version}.
+    """
+    if bytes_data is None:
+        return json.loads(text_data)
+
+    packed = msgpack.unpackb(bytes_data)
+    if packed[0] == CLIENT_ACK:
+        return {'ack': packed[1]}
+
+    code = packed[0]
+    if not 0 <= code < len(ACTION_NAMES):
+        raise ValueError(f'Unknown action code: {code}')
+    return {'choice': ACTION_NAMES[code]}
@@ -0,0 +1,135 @@
+"""
+Compact binary match replays.
+
+A replay is a header followed by one byte per turn (big endian):
+
+    MAGIC (2 bytes), VERSION (u8), RNG seed (u32), turns (u16)
+    for both players: name and owner (u8 length + utf-8), strength, agility, stamina,
+                      endurance and level (u16 each)
+    per turn: action code of player 1 in the high nibble, player 2 in the low nibble
+
+Action codes are the protocol ones, so the VERSION has to be bumped whenever the actions
+change. A 100 turn match between players with typical names takes under 200 bytes.
+Replay.turns re-runs the recorded actions through the same resolution as Game.turn and
+yields every intermediate state.
+"""
+from __future__ import annotations
+
+import struct
+
+from typing import Iterator
+
+from game_app.game.actions import Action, ResolutionTable
+from game_app.game.protocol import ACTION_CODES, ACTION_NAMES
+
+
+MAGIC = b'GR'
+VERSION = 1
+
+HEADER = struct.Struct('>2sBIH')
+STATS = struct.Struct('>5H')
+STAT_NAMES = ('strength', 'agility', 'stamina', 'endurance', 'level')
+
+
+def pack_turn(p1_action: Action, p2_action: Action) -> int:
+    return ACTION_CODES[p1_action.action_name] << 4 | ACTION_CODES[p2_action.action_name]
+
+
+def unpack_turn(turn: int) -> tuple[str, str]:
+    return ACTION_NAMES[turn >> 4], ACTION_NAMES[turn & 0x0F]
+
+
+def pack_text(text: str) -> bytes:
+    data = text.encode('utf-8')
+    if len(data) > 255:
+        raise ValueError(f'Name is too long for a replay: {text}')
+    return bytes((len(data),)) + data
+
+
+class Replay:
+    """
+    Recorded match: the RNG seed of the game, the stat sheets of both players and the
+    packed actions of every turn.
+    """
+
+    def __init__(self, seed: int, sheets: list[dict], actions: bytes) -> None:
+        self.seed: int = seed
+        self.sheets: list[dict] = sheets
+        self.actions: bytes = bytes(actions)
+
+    @classmethod
+    def record(cls, game) -> Replay:
+        sheets = []
+        for character in game.characters.values():
+            strength, agility, stamina, endurance = character.stats
+            sheets.append({
+                'name': character.get_name(),
+                'owner': character.OWNER_USERNAME,
+                'strength': strength,
+                'agility': agility,
+                'stamina': stamina,
+                'endurance': endurance,
+                'level': character.level,
+            })
+        return cls(game.seed, sheets, game.replay_actions)
+
+    def encode(self) -> bytes:
+        data = [HEADER.pack(MAGIC, VERSION, self.seed, len(self.actions))]
+        for sheet in self.sheets:
+            data.append(pack_text(sheet['name']))
+            data.append(pack_text(sheet['owner']))
+            data.append(STATS.pack(*(sheet[stat] for stat in STAT_NAMES)))
+        data.append(self.actions)
+        return b''.join(data)
+
+    @classmethod
+    def decode(cls, data: bytes) -> Replay:
+        """
+        Raises:
+            ValueError: If the data is not a replay of this version or is truncated.
+        """
+        try:
+            magic, version, seed, turns = HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError(f'Invalid replay: {e}')
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'Unsupported replay: {magic!r} version {version}')
+
+        offset = HEADER.size
+        sheets = []
+        try:
+            for _ in range(2):
+                texts = []
+                for _ in range(2):
+                    length = data[offset]
+                    texts.append(data[offset + 1:offset + 1 + length].decode('utf-8'))
+                    offset += 1 + length
+                sheet = {'name': texts[0], 'owner': texts[1], 'experience': 0}
+                sheet.update(zip(STAT_NAMES, STATS.unpack_from(data, offset)))
+                offset += STATS.size
+                sheets.append(sheet)
+        except (IndexError, UnicodeDecodeError, struct.error) as e:
+            raise ValueError(f'Invalid replay: {e}')
+
+        actions = data[offset:]
+        if len(actions) != turns:
+            raise ValueError(f'Invalid replay: {len(actions)} of {turns} turns')
+        return cls(seed, sheets, actions)
+
+    def turns(self) -> Iterator[tuple]:
+        """
+        Replays the match, yielding after every turn:
+        (turn number, (p1 action, p2 action), (p1 health, energy, is_dead), (p2 health, energy, is_dead))
+        """
+        from game_app.game.game import Character
+
+        characters = [Character(sheet) for sheet in self.sheets]
+        for turn_number, turn in enumerate(self.actions, start=1):
+            names = unpack_turn(turn)
+            statuses = ResolutionTable.resolve(*(character.build_action(name)
+                                                 for character, name in zip(characters, names)))
+            for character, status in zip(characters, statuses):
+                character.turn(status)
+
+            yield (turn_number, names, *((character.health, character.energy, character.is_dead)
+                                         for character in characters))
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import math
+
+from typing import Optional
+
+
+logger = logging.getLogger('game_server')
+
+
+class TurnDeadline:
+    def __init__(self, game, expires_tick: int, rounds: int, slot: int) -> None:
+        self.game = game
+        self.expires_tick: int = expires_tick
+        self.rounds: int = rounds
+        self.slot: int = slot
+        self.waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def wake(self, timed_out: bool) -> None:
+        if not self.waiter.done():
+            self.waiter.set_result(timed_out)
+
+    async def wait(self) -> bool:
+        return await self.waiter
+
+
+class TurnScheduler:
+    """
+    Process-wide hashed timing wheel that owns the turn deadline of every running game.
+
+    One ticking task serves all rooms, so the number of event loop timers does not grow
+    with the number of games. The wheel only wakes a game whose deadline expired; games
+    whose players both acted are woken directly through Game.action_submitted.
+
+    A tick only visits the slot whose deadlines are expiring and the deadlines of games
+    that opted into per-second timer updates, never every running game.
+    """
+    _instance = None
+
+    TICK = 1  # Seconds per wheel slot
+    WHEEL_SIZE = 64
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.wheel = [set() for _ in range(cls.WHEEL_SIZE)]
+            cls._instance.active = set()
+            cls._instance.timed = set()  # Deadlines of games sending per-second timer updates
+            cls._instance.current_tick = 0
+            cls._instance.loop_task = None
+        return cls._instance
+
+    def schedule(self, game, delay: float, timer: bool = False) -> TurnDeadline:
+        ticks = max(1, math.ceil(delay / TurnScheduler.TICK))
+        slot = (self.current_tick + ticks) % TurnScheduler.WHEEL_SIZE
+        rounds = (ticks - 1) // TurnScheduler.WHEEL_SIZE
+
+        deadline = TurnDeadline(game, self.current_tick + ticks, rounds, slot)
+        self.wheel[slot].add(deadline)
+        self.active.add(deadline)
+        if timer:
+            self.timed.add(deadline)
+
+        if self.loop_task is None or self.loop_task.done():
+            self.loop_task = asyncio.create_task(self.run())
+
+        return deadline
+
+    def cancel(self, deadline: Optional[TurnDeadline]) -> None:
+        if deadline is None:
+            return
+
+        self.wheel[deadline.slot].discard(deadline)
+        self.active.discard(deadline)
+        self.timed.discard(deadline)
+
+    def set_timer(self, deadline: Optional[TurnDeadline], enabled: bool) -> None:
+        """
+        Starts or stops the per-second timer updates of a pending deadline.
+        """
+        if deadline is None or deadline not in self.active:
+            return
+
+        if enabled:
+            self.timed.add(deadline)
+        else:
+            self.timed.discard(deadline)
+
+    def wake_early(self, deadline: TurnDeadline) -> None:
+        self.cancel(deadline)
+        deadline.wake(timed_out=False)
+
+    def remaining(self, deadline: TurnDeadline) -> int:
+        return max(0, deadline.expires_tick - self.current_tick) * TurnScheduler.TICK
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while self.active:
+                next_tick += TurnScheduler.TICK
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                self.tick()
+        except asyncio.CancelledError:
+            logger.debug('Turn scheduler was cancelled.')
+        finally:
+            self.loop_task = None
+
+    def tick(self) -> None:
+        self.current_tick += 1
+        slot = self.current_tick % TurnScheduler.WHEEL_SIZE
+
+        expired = []
+        for deadline in tuple(self.wheel[slot]):
+            if deadline.rounds > 0:
+                deadline.rounds -= 1
+            else:
+                expired.append(deadline)
+
+        for deadline in self.timed:
+            asyncio.create_task(deadline.game.send_timer(self.remaining(deadline)))
+
+        for deadline in expired:
+            if deadline in self.active:
+                self.cancel(deadline)
+                deadline.wake(timed_out=True)
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.loop_task is not None:
+            cls._instance.loop_task.cancel()
+        cls._instance = None
@@ -0,0 +1,282 @@
+"""
+Headless batch combat simulator for balance analysis.
+
+Runs many fights at once as NumPy arrays, following the same rules as Game.turn:
+stats come from the Character formulas and every turn is resolved through the
+coefficients of ResolutionTable, so results match the per-object engine.
+"""
+from typing import Callable, Optional
+
+import numpy as np
+
+from game_app.game.actions import ActionsFactory, ResolutionTable
+from game_app.game.bot_policy import BotPolicy
+from game_app.game.game import Character, Game
+
+
+ACTION_NAMES: tuple = tuple(ActionsFactory.action_classes.keys())
+ACTION_CODES: dict[str, int] = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+ATTACK = ACTION_CODES['attack']
+DEFENCE = ACTION_CODES['defence']
+FEINT = ACTION_CODES['feint']
+REST = ACTION_CODES['rest']
+PASS = ACTION_CODES['pass']
+
+DRAW = 0
+P1_WIN = 1
+P2_WIN = 2
+
+# Policy signature: policy(me, enemy, available, rng) -> action codes, one per fight
+Policy = Callable[[dict, dict, np.ndarray, np.random.Generator], np.ndarray]
+
+
+def compile_coefficients() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the resolution table as arrays indexed by [left code, right code, side, parameter].
+    """
+    count = len(ACTION_NAMES)
+    health = np.zeros((count, count, 2, ResolutionTable.PARAMETERS), dtype=np.int64)
+    energy = np.zeros((count, count, 2, ResolutionTable.PARAMETERS), dtype=np.int64)
+    skip = np.zeros((count, count, 2), dtype=bool)
+
+    for left_name, left_code in ACTION_CODES.items():
+        for right_name, right_code in ACTION_CODES.items():
+            entry = ResolutionTable.table[(ActionsFactory.action_classes[left_name],
+                                           ActionsFactory.action_classes[right_name])]
+            for side, (side_health, side_energy, side_skip) in enumerate(entry):
+                health[left_code, right_code, side] = side_health
+                energy[left_code, right_code, side] = side_energy
+                skip[left_code, right_code, side] = side_skip
+
+    return health, energy, skip
+
+
+def available_actions(side: dict) -> np.ndarray:
+    """Mirrors Character.get_actions as a (fights, actions) boolean mask."""
+    available = np.zeros((len(side['health']), len(ACTION_NAMES)), dtype=bool)
+    active = ~side['is_dead'] & ~side['skip']
+    has_energy = side['energy'] >= side['epa']
+
+    available[:, ATTACK] = active & has_energy
+    available[:, DEFENCE] = active & has_energy
+    available[:, FEINT] = active
+    available[:, REST] = active
+    available[:, PASS] = ~side['is_dead'] & side['skip']
+    return available
+
+
+class FighterBatch:
+    """
+    State of one side of every fight in a batch, built from a (fights, 4) array of
+    strength, agility, stamina and endurance.
+    """
+
+    def __init__(self, stats: np.ndarray) -> None:
+        stats = np.asarray(stats, dtype=np.int64)
+        strength, agility, stamina, endurance = stats.T
+
+        self.max_energy: np.ndarray = stamina * Character.en_per_stamina
+        self.health: np.ndarray = endurance * Character.hp_per_endurance
+        self.energy: np.ndarray = self.max_energy.copy()
+        self.damage: np.ndarray = strength * Character.dmg_per_strength
+        self.epa: np.ndarray = 100 // agility
+        self.ber: np.ndarray = stamina * Character.be_per_stamina
+        self.aer: np.ndarray = stamina * Character.ae_per_stamina
+
+        self.skip: np.ndarray = np.zeros(len(stats), dtype=bool)
+        self.is_dead: np.ndarray = np.zeros(len(stats), dtype=bool)
+
+    def view(self) -> dict:
+        return {
+            'health': self.health,
+            'energy': self.energy,
+            'damage': self.damage,
+            'epa': self.epa,
+            'max_energy': self.max_energy,
+            'skip': self.skip,
+            'is_dead': self.is_dead,
+        }
+
+    def available_actions(self) -> np.ndarray:
+        return available_actions(self.view())
+
+    def action_params(self, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Energy cost and power of the chosen actions, as set by Character.set_action."""
+        acting = codes != PASS
+        energy_cost = np.where(acting, self.epa, 0)
+        action_power = np.where(codes == ATTACK, self.damage, np.where(codes == REST, self.aer, 0))
+        return energy_cost, action_power
+
+    def apply(self, health_delta: np.ndarray, energy_delta: np.ndarray, skip: np.ndarray) -> None:
+        """Mirrors Character.turn."""
+        self.health += health_delta
+        self.is_dead |= self.health <= 0
+        self.energy = np.clip(self.energy + energy_delta, 0, self.max_energy) + self.ber
+        self.skip = skip
+
+    def select(self, mask: np.ndarray) -> None:
+        """Keeps only the fights selected by mask."""
+        for name in ('max_energy', 'health', 'energy', 'damage', 'epa', 'ber', 'aer', 'skip', 'is_dead'):
+            setattr(self, name, getattr(self, name)[mask])
+
+
+def random_policy(me: dict, enemy: dict, available: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Picks uniformly among the available actions."""
+    return weighted_choice(available.astype(np.int16), rng)
+
+
+def bot_policy(me: dict, enemy: dict, available: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Vectorised Bot.make_move."""
+    weights = np.zeros(available.shape, dtype=np.int16)
+    weights[:, [ATTACK, DEFENCE, FEINT]] = 1
+
+    weights[:, REST] += me['energy'] < 50
+    weights[:, ATTACK] += me['energy'] > enemy['energy']
+    weights[:, FEINT] += me['health'] > enemy['health']
+    weights[:, DEFENCE] += me['health'] < enemy['health']
+
+    enemy_available = available_actions(enemy)
+    enemy_cannot_attack = ~enemy_available[:, ATTACK]
+    weights[enemy_cannot_attack, DEFENCE] = 0
+    weights[enemy_cannot_attack, FEINT] = 0
+
+    weights[~available] = 0
+
+    codes = weighted_choice(weights, rng)
+
+    # Bot does not act at all below 20 energy
+    codes[me['energy'] < 20] = PASS
+    return codes
+
+
+def table_policy(policy: BotPolicy) -> Policy:
+    """
+    Vectorised lookup in the compiled table of a BotPolicy, the way Bot.make_move decides.
+    """
+    table = np.zeros((len(policy.table), len(ACTION_NAMES)), dtype=np.int16)
+    for index, (names, cumulative) in enumerate(policy.table):
+        for name, low, high in zip(names, (0,) + cumulative, cumulative):
+            table[index, ACTION_CODES[name]] = high - low
+    action_bits = np.array([BotPolicy.ACTION_BITS[name] for name in ACTION_NAMES], dtype=np.int64)
+
+    def policy_codes(me: dict, enemy: dict, available: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        health_order = (me['health'] > enemy['health']).astype(np.int64) - (me['health'] < enemy['health']) + 1
+        keys = policy.index(
+            (me['energy'] < BotPolicy.LOW_ENERGY).astype(np.int64),
+            (me['energy'] > enemy['energy']).astype(np.int64),
+            health_order,
+            available_actions(enemy)[:, ATTACK].astype(np.int64),
+            available.astype(np.int64) @ action_bits,
+        )
+        codes = weighted_choice(table[keys], rng)
+        codes[me['energy'] < BotPolicy.PASS_ENERGY] = PASS
+        return codes
+
+    return policy_codes
+
+
+def weighted_choice(weights: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Picks one action per row with probability proportional to its weight; rows without
+    any weight pick pass.
+    """
+    cumulative = np.cumsum(weights, axis=1)
+    total = cumulative[:, -1]
+    threshold = rng.random(len(weights)) * total
+    codes = (cumulative <= threshold[:, None]).sum(axis=1)
+    codes = np.minimum(codes, len(ACTION_NAMES) - 1)
+    codes[total <= 0] = PASS
+    return codes
+
+
+class BatchSimulator:
+    POLICIES: dict[str, Policy] = {
+        'random': random_policy,
+        'bot': bot_policy,
+    }
+
+    def __init__(self, p1_policy: Policy = random_policy, p2_policy: Policy = random_policy,
+                 seed: Optional[int] = None) -> None:
+        self.p1_policy: Policy = p1_policy
+        self.p2_policy: Policy = p2_policy
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.health_coef, self.energy_coef, self.skip_table = compile_coefficients()
+
+    def run(self, p1_stats: np.ndarray, p2_stats: np.ndarray, max_turns: int = Game.MAX_TURNS) -> np.ndarray:
+        """
+        Fights every row of p1_stats against the same row of p2_stats.
+
+        Returns one result per fight: DRAW, P1_WIN or P2_WIN.
+        """
+        p1 = FighterBatch(p1_stats)
+        p2 = FighterBatch(p2_stats)
+
+        results = np.full(len(p1.health), DRAW, dtype=np.int8)
+        # Indices of the fights still running; finished fights are dropped from the batch
+        fight_index = np.arange(len(p1.health))
+
+        for _ in range(max_turns):
+            p1_available = p1.available_actions()
+            p2_available = p2.available_actions()
+            p1_codes = self._validate(self.p1_policy(p1.view(), p2.view(), p1_available, self.rng), p1_available)
+            p2_codes = self._validate(self.p2_policy(p2.view(), p1.view(), p2_available, self.rng), p2_available)
+
+            p1_cost, p1_power = p1.action_params(p1_codes)
+            p2_cost, p2_power = p2.action_params(p2_codes)
+            health_coef = self.health_coef[p1_codes, p2_codes]
+            energy_coef = self.energy_coef[p1_codes, p2_codes]
+            skip = self.skip_table[p1_codes, p2_codes]
+
+            for side, fighter in enumerate((p1, p2)):
+                health = health_coef[:, side]
+                energy = energy_coef[:, side]
+                fighter.apply(
+                    health[:, 0] * p1_cost + health[:, 1] * p1_power + health[:, 2] * p2_cost + health[:, 3] * p2_power,
+                    energy[:, 0] * p1_cost + energy[:, 1] * p1_power + energy[:, 2] * p2_cost + energy[:, 3] * p2_power,
+                    skip[:, side],
+                )
+
+            ended = p1.is_dead | p2.is_dead
+            if ended.any():
+                results[fight_index[ended & p1.is_dead & ~p2.is_dead]] = P2_WIN
+                results[fight_index[ended & p2.is_dead & ~p1.is_dead]] = P1_WIN
+
+                running = ~ended
+                fight_index = fight_index[running]
+                p1.select(running)
+                p2.select(running)
+
+            if len(fight_index) == 0:
+                break
+
+        return results
+
+    @staticmethod
+    def _validate(codes: np.ndarray, available: np.ndarray) -> np.ndarray:
+        """Unavailable choices are ignored by Character.set_action and resolve as pass."""
+        codes = np.asarray(codes, dtype=np.int64)
+        return np.where(available[np.arange(len(codes)), codes], codes, PASS)
+
+    def win_rate_matrix(self, allocations: list, fights: int = 1000,
+                        max_turns: int = Game.MAX_TURNS) -> dict[str, np.ndarray]:
+        """
+        Fights every allocation of (strength, agility, stamina, endurance) against every other.
+
+        Returns matrices indexed by [p1 allocation, p2 allocation] with the share of p1 wins,
+        p2 wins and draws.
+        """
+        allocations = np.asarray(allocations, dtype=np.int64)
+        count = len(allocations)
+
+        p1_index = np.repeat(np.arange(count), count * fights)
+        p2_index = np.tile(np.repeat(np.arange(count), fights), count)
+
+        results = self.run(allocations[p1_index], allocations[p2_index], max_turns=max_turns)
+        results = results.reshape(count, count, fights)
+
+        return {
+            'p1_win': (results == P1_WIN).mean(axis=2),
+            'p2_win': (results == P2_WIN).mean(axis=2),
+            'draw': (results == DRAW).mean(axis=2),
+        }
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from game_app.utils import RedisServer
+
+
+logger = logging.getLogger('game_server')
+
+
+class SnapshotWriter:
+    """
+    Process-wide background writer of game snapshots into Redis.
+
+    Games hand over their encoded fields with submit, which only updates a dict keyed by
+    room: fields submitted again before they were written replace the older ones, and a
+    delete replaces any pending write. A flush task sends everything pending in one
+    pipeline on a dedicated thread, so Redis latency never reaches the event loop, and
+    writes submitted meanwhile go out with the next pipeline. A failed batch is dropped,
+    the next turn of each game writes a complete snapshot again.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.redis = None
+            # Room token to the fields to write, None to delete the snapshot
+            cls._instance.pending = {}
+            cls._instance.dropped = 0
+            cls._instance.written = 0
+            cls._instance.flush_task = None
+            cls._instance.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshots')
+        return cls._instance
+
+    def submit(self, room_token: str, fields: dict[str, bytes]) -> None:
+        pending = self.pending.get(room_token)
+        if pending is not None:
+            pending.update(fields)
+        else:
+            self.pending[room_token] = dict(fields)
+        self.schedule()
+
+    def delete(self, room_token: str) -> None:
+        self.pending[room_token] = None
+        self.schedule()
+
+    def schedule(self) -> None:
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        try:
+            while self.pending:
+                await self.flush()
+        except asyncio.CancelledError:
+            logger.debug('Snapshot writer was cancelled.')
+        finally:
+            self.flush_task = None
+
+    async def flush(self) -> None:
+        batch, self.pending = self.pending, {}
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self.executor, self.write, batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.warning(f'Snapshots of {len(batch)} games were not written: {e}')
+            return
+
+        self.written += len(batch)
+
+    def write(self, batch: dict[str, Optional[dict[str, bytes]]]) -> None:
+        if self.redis is None:
+            self.redis = RedisServer()
+        self.redis.write_game_snapshots(batch)
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.flush_task is not None:
+            cls._instance.flush_task.cancel()
+        cls._instance = None
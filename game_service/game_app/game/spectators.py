@@ -0,0 +1,181 @@
+"""
+Spectator fan-out through the channel layer.
+
+Player sockets are observers of their game in its own process. Spectators may be
+connected to any worker, so the game publishes each event once to the channel layer
+group of its room, already encoded in every wire format; SpectatorConsumer only writes
+the frame of its codec. Joining spectators get the current state from SnapshotCache,
+which reads the game or its Redis snapshot at most once per SNAPSHOT_INTERVAL per room.
+Spectators count themselves in Redis, so games skip publishing to rooms nobody watches.
+"""
+import asyncio
+import logging
+import time
+
+from typing import Optional
+
+from channels.layers import get_channel_layer
+
+from game_app.game import protocol
+
+
+logger = logging.getLogger('game_server')
+
+CODECS = (protocol.JSON_CODEC, protocol.MSGPACK_CODEC)
+
+
+def group_name(room_token: str) -> str:
+    return f'spectators_{room_token}'
+
+
+def spectator_event(data: dict) -> dict:
+    event = {'type': 'spectator.frame'}
+    for codec in CODECS:
+        event[codec] = protocol.encode(data, codec)
+    return event
+
+
+async def publish(room_token: str, data: dict) -> None:
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    await channel_layer.group_send(group_name(room_token), spectator_event(data))
+
+
+async def add_spectators(room_token: str, amount: int) -> bool:
+    """
+    Counts spectators joining (amount > 0) or leaving a room; returns False if Redis failed.
+    """
+    from game_app.utils import RedisServer
+
+    if amount > 0:
+        # Seen at once if the game is hosted here, by the next refresh otherwise
+        SpectatorCounter().forget(room_token)
+
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, RedisServer().add_spectators, room_token, amount)
+    except Exception as e:
+        logger.warning(f'Game {room_token}: spectators were not counted: {e}')
+        return False
+    return True
+
+
+class SpectatorCounter:
+    """
+    Which rooms hosted by this worker have spectators, wherever they are connected.
+
+    Games ask is_watched before publishing. The answer comes from counts refreshed every
+    REFRESH_INTERVAL seconds, with one Redis read on a thread for every room asked about
+    meanwhile. A room not counted yet, or whose count could not be read, is watched. A
+    spectator joining on another worker than the game's may miss the events published
+    before the next refresh; it has the state of the room from SnapshotCache.
+    """
+    _instance = None
+
+    REFRESH_INTERVAL = 2.0  # Seconds
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.counts = {}
+            cls._instance.asked = set()
+            cls._instance.refresh_task = None
+        return cls._instance
+
+    def is_watched(self, room_token: str) -> bool:
+        self.asked.add(room_token)
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = asyncio.create_task(self.run())
+        return self.counts.get(room_token, 1) > 0
+
+    def forget(self, room_token: str) -> None:
+        self.counts.pop(room_token, None)
+
+    async def run(self) -> None:
+        try:
+            while self.asked:
+                rooms, self.asked = list(self.asked), set()
+                self.counts = await self.read(rooms)
+                await asyncio.sleep(SpectatorCounter.REFRESH_INTERVAL)
+        except asyncio.CancelledError:
+            logger.debug('Spectator counter was cancelled.')
+        finally:
+            self.refresh_task = None
+
+    @staticmethod
+    async def read(room_tokens: list[str]) -> dict[str, int]:
+        from game_app.utils import RedisServer
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, RedisServer().count_spectators, room_tokens)
+        except Exception as e:
+            logger.warning(f'Spectators of {len(room_tokens)} games were not counted: {e}')
+            return {}
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None and cls._instance.refresh_task is not None:
+            cls._instance.refresh_task.cancel()
+        cls._instance = None
+
+
+class SnapshotCache:
+    """
+    Rate-limited state of the rooms spectators join.
+
+    The messages of a room are loaded once per SNAPSHOT_INTERVAL per worker; spectators
+    joining meanwhile share the same load, so a burst of joins costs one Redis read.
+    """
+    SNAPSHOT_INTERVAL = 1.0  # Seconds
+    MAX_CACHED = 4096
+
+    cache: dict[str, tuple[float, asyncio.Future]] = {}
+
+    @classmethod
+    async def get(cls, room_token: str) -> Optional[list[dict]]:
+        """
+        Returns the messages describing the current state of the room, None if there is no game.
+        """
+        now = time.monotonic()
+        entry = cls.cache.get(room_token)
+        if entry is None or entry[0] <= now:
+            if len(cls.cache) >= cls.MAX_CACHED:
+                cls.cache = {token: entry for token, entry in cls.cache.items() if entry[0] > now}
+                if len(cls.cache) >= cls.MAX_CACHED:
+                    cls.cache.clear()
+
+            entry = (now + cls.SNAPSHOT_INTERVAL, asyncio.ensure_future(cls.load(room_token)))
+            cls.cache[room_token] = entry
+
+        return await asyncio.shield(entry[1])
+
+    @classmethod
+    async def load(cls, room_token: str) -> Optional[list[dict]]:
+        from game_app.game.game import Game, GameHandler
+        from game_app.utils import RedisServer
+
+        game = GameHandler.get(room_token)
+        if game is None:
+            # The game runs on another worker: rebuild its state from the snapshot
+            loop = asyncio.get_running_loop()
+            try:
+                snapshot = await loop.run_in_executor(None, RedisServer().get_game_snapshot, room_token)
+            except Exception as e:
+                logger.warning(f'Game {room_token}: snapshot for spectators was not loaded: {e}')
+                return None
+            game = Game.from_snapshot(room_token, snapshot) if snapshot else None
+
+        if game is None or not game.game_started:
+            return None
+
+        messages = [game.start_message('spectate')]
+        if game.turn_deadline_at is not None:
+            messages.append(game.turn_started_message())
+        return messages
+
+    @classmethod
+    def reset(cls) -> None:
+        cls.cache = {}
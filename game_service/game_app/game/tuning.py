@@ -0,0 +1,127 @@
+"""
+Self-play tuning of the bot policy weights.
+
+Every candidate weight vector is compiled into a BotPolicy and fought headlessly in
+BatchSimulator against a set of opponents, from both seats. Its score is the mean of
+wins minus losses per fight. Candidates are independent, so each generation is spread
+over a ProcessPoolExecutor and the run scales with the number of cores. All candidates
+of a generation fight with the same seed, so they are compared on the same random draws.
+"""
+import contextlib
+import itertools
+import logging
+import random
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import django
+import numpy as np
+
+from game_app.game.bot_policy import BotPolicy
+from game_app.game.simulation import BatchSimulator, P1_WIN, P2_WIN, bot_policy, random_policy, table_policy
+
+
+logger = logging.getLogger('game_server')
+
+# Vectorised opponents a candidate has to beat
+OPPONENTS: dict = {
+    'bot': bot_policy,
+    'random': random_policy,
+}
+
+DEFAULT_ALLOCATION = (5, 5, 5, 5)
+
+
+def init_worker() -> None:
+    # Workers started with spawn import the game modules from scratch
+    django.setup()
+
+
+def evaluate(weights: dict, fights: int, seed: int, opponents: tuple = tuple(OPPONENTS),
+             allocation: tuple = DEFAULT_ALLOCATION) -> float:
+    """
+    Score of a weight vector: mean wins minus losses per fight, over every opponent and both seats.
+    """
+    candidate = table_policy(BotPolicy(weights))
+    stats = np.tile(allocation, (fights, 1))
+
+    scores = []
+    for index, name in enumerate(opponents):
+        opponent = OPPONENTS[name]
+        for seat, (p1_policy, p2_policy) in enumerate(((candidate, opponent), (opponent, candidate))):
+            simulator = BatchSimulator(p1_policy, p2_policy, seed=seed * 1000 + index * 2 + seat)
+            results = simulator.run(stats, stats)
+            wins, losses = (P1_WIN, P2_WIN) if seat == 0 else (P2_WIN, P1_WIN)
+            scores.append(((results == wins).sum() - (results == losses).sum()) / fights)
+
+    return float(np.mean(scores))
+
+
+class PolicyTuner:
+    """
+    Searches the weight vector of BotPolicy, by evolution or over a grid.
+    """
+    MAX_WEIGHT = 4
+
+    def __init__(self, workers: int = 1, fights: int = 500, seed: Optional[int] = None,
+                 opponents: tuple = tuple(OPPONENTS)) -> None:
+        self.workers: int = workers
+        self.fights: int = fights
+        self.seed: int = seed if seed is not None else random.randrange(2 ** 31)
+        self.rng: random.Random = random.Random(self.seed)
+        self.opponents: tuple = opponents
+
+    def executor(self):
+        if self.workers <= 1:
+            return contextlib.nullcontext()
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+
+    def score(self, executor: Optional[ProcessPoolExecutor], candidates: list[dict], seed: int) -> list[float]:
+        args = (candidates, itertools.repeat(self.fights), itertools.repeat(seed), itertools.repeat(self.opponents))
+        if executor is None:
+            return list(map(evaluate, *args))
+
+        chunksize = max(1, len(candidates) // (self.workers * 4))
+        return list(executor.map(evaluate, *args, chunksize=chunksize))
+
+    def mutate(self, weights: dict) -> dict:
+        child = dict(weights)
+        for name in self.rng.sample(sorted(child), k=self.rng.randint(1, 2)):
+            child[name] = min(PolicyTuner.MAX_WEIGHT, max(0, child[name] + self.rng.choice((-1, 1))))
+        return child
+
+    def evolve(self, generations: int, population: int) -> tuple[dict, float]:
+        """
+        (mu + lambda) evolution from the default weights: the best quarter of every
+        generation survives and is mutated into the rest of the next one.
+        """
+        elite_size = max(1, population // 4)
+        candidates = [dict(BotPolicy.DEFAULT_WEIGHTS)]
+        candidates += [self.mutate(candidates[0]) for _ in range(population - 1)]
+
+        ranked = []
+        with self.executor() as executor:
+            for generation in range(generations):
+                scores = self.score(executor, candidates, self.seed + generation)
+                ranked = sorted(zip(scores, range(len(candidates))), reverse=True)
+                elite = [candidates[index] for _, index in ranked[:elite_size]]
+                logger.info(f'Generation {generation + 1}/{generations}: best score {ranked[0][0]:.4f} '
+                            f'{candidates[ranked[0][1]]}')
+
+                if generation < generations - 1:
+                    candidates = elite + [self.mutate(self.rng.choice(elite)) for _ in range(population - elite_size)]
+
+        best_score, best_index = ranked[0]
+        return candidates[best_index], best_score
+
+    def grid(self, values: tuple) -> tuple[dict, float]:
+        """
+        Scores every combination of the given values for every weight.
+        """
+        names = sorted(BotPolicy.DEFAULT_WEIGHTS)
+        candidates = [dict(zip(names, combination)) for combination in itertools.product(values, repeat=len(names))]
+        with self.executor() as executor:
+            scores = self.score(executor, candidates, self.seed)
+        best_score, best_index = max(zip(scores, range(len(candidates))))
+        return candidates[best_index], best_score
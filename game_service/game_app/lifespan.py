@@ -0,0 +1,17 @@
+from game_app.loop_monitor import LoopMonitor
+
+
+async def lifespan(scope, receive, send):
+    """
+    ASGI lifespan handler: the loop monitor runs on the server loop from startup to shutdown,
+    before any socket connects.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            LoopMonitor().start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            LoopMonitor.reset()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
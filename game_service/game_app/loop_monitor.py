@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from collections import deque
+from typing import Optional
+
+from django.conf import settings
+
+from game_app import metrics
+
+
+logger = logging.getLogger('game_server')
+
+
+class LoopMonitor:
+    """
+    Watchdog of the event loop serving the consumers.
+
+    A heartbeat task sleeps INTERVAL seconds at a time and measures how late it wakes up:
+    that is the scheduling lag every other callback saw, recorded in a histogram. A daemon
+    thread checks the heartbeat every INTERVAL; when the loop is late by more than the
+    threshold it is stuck in a callback right now, so the thread takes the stack of the
+    loop thread and the running task, which names the code that blocks. Stalls go to a
+    ring buffer served by the loop stalls admin endpoint.
+
+    Unlike asyncio debug mode, nothing wraps the callbacks: the cost is one task and one
+    thread waking ten times per second.
+    """
+    _instance = None
+
+    INTERVAL = 0.1  # Seconds between heartbeats
+    MAX_STALLS = 100
+    MAX_FRAMES = 30  # Innermost frames kept per stack
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.stalls = deque(maxlen=cls.MAX_STALLS)
+            cls._instance.lock = threading.Lock()
+            cls._instance.loop = None
+            cls._instance.loop_thread_id = None
+            cls._instance.deadline = None  # Monotonic time the heartbeat is due to wake up
+            cls._instance.captured_deadline = None
+            cls._instance.stopped = threading.Event()
+            cls._instance.loop_task = None
+            cls._instance.thread = None
+        return cls._instance
+
+    @staticmethod
+    def threshold() -> float:
+        return settings.LOOP_LAG_THRESHOLD
+
+    def start(self) -> None:
+        """
+        Starts watching the running loop; does nothing when disabled or already running.
+        """
+        if not settings.LOOP_MONITOR_ENABLED:
+            return
+        if self.loop_task is not None and not self.loop_task.done():
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.loop_task = asyncio.create_task(self.run())
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.watch, name='loop_monitor', daemon=True)
+            self.thread.start()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                self.deadline = time.monotonic() + LoopMonitor.INTERVAL
+                await asyncio.sleep(LoopMonitor.INTERVAL)
+                lag = max(0.0, time.monotonic() - self.deadline)
+                metrics.LOOP_LAG.observe(lag)
+                if lag >= self.threshold():
+                    self.stall_ended(self.deadline, lag)
+        except asyncio.CancelledError:
+            logger.debug('Loop monitor was cancelled.')
+        finally:
+            self.deadline = None
+            self.loop_task = None
+
+    def watch(self) -> None:
+        while not self.stopped.wait(LoopMonitor.INTERVAL):
+            deadline = self.deadline
+            if deadline is None or deadline == self.captured_deadline:
+                continue
+
+            late = time.monotonic() - deadline
+            if late >= self.threshold():
+                self.captured_deadline = deadline
+                self.capture(deadline, late)
+
+    def capture(self, deadline: float, late: float) -> None:
+        """
+        Records the stack the loop thread is stuck in, from the monitor thread.
+        """
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = traceback.format_stack(frame)[-LoopMonitor.MAX_FRAMES:] if frame is not None else []
+        task = asyncio.current_task(self.loop)
+
+        stall = {
+            'deadline': deadline,
+            'detected_at': time.time(),
+            'lag': round(late, 4),
+            'finished': False,
+            'task': task.get_name() if task is not None else None,
+            'coroutine': task.get_coro().__qualname__ if task is not None else None,
+            'stack': [line.rstrip() for line in stack],
+        }
+        with self.lock:
+            self.stalls.append(stall)
+        logger.warning(f'Event loop blocked for {late:.3f}s in {stall["coroutine"] or "a callback"}')
+
+    def stall_ended(self, deadline: float, lag: float) -> None:
+        """
+        Completes the stall caught by the thread, or records a shorter one it did not see.
+        """
+        metrics.LOOP_STALLS.inc()
+        with self.lock:
+            if self.stalls and self.stalls[-1]['deadline'] == deadline:
+                self.stalls[-1]['lag'] = round(lag, 4)
+                self.stalls[-1]['finished'] = True
+                return
+
+            self.stalls.append({
+                'deadline': deadline,
+                'detected_at': time.time(),
+                'lag': round(lag, 4),
+                'finished': True,
+                'task': None,
+                'coroutine': None,
+                'stack': [],
+            })
+
+    def get_stalls(self) -> list[dict]:
+        """Recorded stalls, newest first."""
+        with self.lock:
+            stalls = list(self.stalls)
+        return [{key: value for key, value in stall.items() if key != 'deadline'} for stall in reversed(stalls)]
+
+    @classmethod
+    def reset(cls) -> None:
+        if cls._instance is not None:
+            cls._instance.stopped.set()
+            if cls._instance.loop_task is not None:
+                cls._instance.loop_task.cancel()
+        cls._instance = None
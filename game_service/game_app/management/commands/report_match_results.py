@@ -0,0 +1,20 @@
+import logging
+import socket
+
+from django.core.management.base import BaseCommand
+
+from game_app.game.outbox import ResultsReporter
+
+
+class Command(BaseCommand):
+    help = 'Drains the match results outbox stream into the users service.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', default=socket.gethostname(), help='Consumer name in the group')
+        parser.add_argument('--batch-size', type=int, default=ResultsReporter.BATCH_SIZE)
+        parser.add_argument('--once', action='store_true', help='Report a single batch and exit')
+
+    def handle(self, *args, **options):
+        reporter = ResultsReporter(options['consumer'], batch_size=options['batch_size'])
+        logging.getLogger('game_server').info(f'Reporting match results as {options["consumer"]}')
+        reporter.run(once=options['once'])
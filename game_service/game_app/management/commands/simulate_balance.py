@@ -0,0 +1,48 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_app.game.simulation import BatchSimulator
+
+
+class Command(BaseCommand):
+    help = 'Simulates fights between stat allocations and prints win-rate matrices.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'allocations',
+            nargs='+',
+            help='Stat allocations as strength,agility,stamina,endurance (for example 5,5,5,5)',
+        )
+        parser.add_argument('--fights', type=int, default=1000, help='Fights per pair of allocations')
+        parser.add_argument('--p1-policy', default='random', choices=BatchSimulator.POLICIES.keys())
+        parser.add_argument('--p2-policy', default='random', choices=BatchSimulator.POLICIES.keys())
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            allocations = [[int(value) for value in allocation.split(',')] for allocation in options['allocations']]
+        except ValueError:
+            raise CommandError('Allocations must be comma separated integers')
+
+        if any(len(allocation) != 4 or min(allocation) < 1 for allocation in allocations):
+            raise CommandError('Each allocation needs four positive stats: strength,agility,stamina,endurance')
+
+        simulator = BatchSimulator(
+            p1_policy=BatchSimulator.POLICIES[options['p1_policy']],
+            p2_policy=BatchSimulator.POLICIES[options['p2_policy']],
+            seed=options['seed'],
+        )
+
+        started = time.perf_counter()
+        matrices = simulator.win_rate_matrix(allocations, fights=options['fights'])
+        elapsed = time.perf_counter() - started
+
+        data = {
+            'allocations': options['allocations'],
+            'fights_per_pair': options['fights'],
+            'seconds': round(elapsed, 3),
+            **{name: matrix.round(4).tolist() for name, matrix in matrices.items()},
+        }
+        self.stdout.write(json.dumps(data, indent=2))
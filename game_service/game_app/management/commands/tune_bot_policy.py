@@ -0,0 +1,53 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game_app.game.bot_policy import BotPolicy
+from game_app.game.tuning import OPPONENTS, PolicyTuner
+
+
+class Command(BaseCommand):
+    help = 'Tunes the bot policy weights by self-play and writes a policy file for BOT_POLICY_PATH.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', default='evolve', choices=('evolve', 'grid'))
+        parser.add_argument('--generations', type=int, default=20)
+        parser.add_argument('--population', type=int, default=32)
+        parser.add_argument('--grid-values', default='0,1,2', help='Comma separated values tried for every weight')
+        parser.add_argument('--fights', type=int, default=500, help='Fights per opponent and seat')
+        parser.add_argument('--opponents', nargs='+', default=list(OPPONENTS), choices=OPPONENTS.keys())
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes, 1 runs in-process')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--output', default='bot_policy.json', help='Path of the policy file')
+
+    def handle(self, *args, **options):
+        tuner = PolicyTuner(
+            workers=options['workers'],
+            fights=options['fights'],
+            seed=options['seed'],
+            opponents=tuple(options['opponents']),
+        )
+
+        started = time.perf_counter()
+        if options['mode'] == 'grid':
+            try:
+                values = tuple(int(value) for value in options['grid_values'].split(','))
+            except ValueError:
+                raise CommandError('Grid values must be comma separated integers')
+            weights, score = tuner.grid(values)
+        else:
+            weights, score = tuner.evolve(options['generations'], options['population'])
+        elapsed = time.perf_counter() - started
+
+        meta = {
+            'score': round(score, 4),
+            'mode': options['mode'],
+            'seed': tuner.seed,
+            'fights': options['fights'],
+            'opponents': options['opponents'],
+            'seconds': round(elapsed, 3),
+        }
+        BotPolicy(weights).to_file(options['output'], **meta)
+        self.stdout.write(json.dumps({'weights': weights, **meta}, indent=2))
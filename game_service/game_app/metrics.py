@@ -0,0 +1,151 @@
+"""
+Process-wide metrics of the game service, exposed in the Prometheus text format.
+
+Counters and histograms are plain objects created once at import: recording a value is an
+attribute update and, for histograms, one bisect into fixed bucket bounds, with no label
+lookup and no allocation per event. Gauges are read from a callback when /metrics is
+scraped. Every worker process exposes its own values; rates such as turns per second
+per worker come from rate() over the counters in Prometheus.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Optional
+
+
+REGISTRY: list = []
+
+# Upper bounds in seconds, the last bucket is +Inf
+LATENCY_BUCKETS: tuple = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Metric(ABC):
+    TYPE = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Optional[dict] = None,
+                 registry: list = REGISTRY) -> None:
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labels: str = format_labels(labels or {})
+        registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """
+        Sample lines of the metric in the text exposition format, without HELP and TYPE.
+        """
+
+
+class Counter(Metric):
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Optional[dict] = None,
+                 registry: list = REGISTRY) -> None:
+        super().__init__(name, documentation, labels, registry)
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def samples(self) -> list[str]:
+        return [f'{self.name}{braces(self.labels)} {self.value}']
+
+
+class Gauge(Metric):
+    """
+    Value read from a callback at scrape time, so the code it describes is not touched.
+    """
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float],
+                 labels: Optional[dict] = None, registry: list = REGISTRY) -> None:
+        super().__init__(name, documentation, labels, registry)
+        self.callback: Callable[[], float] = callback
+
+    def samples(self) -> list[str]:
+        return [f'{self.name}{braces(self.labels)} {self.callback()}']
+
+
+class Histogram(Metric):
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = LATENCY_BUCKETS,
+                 labels: Optional[dict] = None, registry: list = REGISTRY) -> None:
+        super().__init__(name, documentation, labels, registry)
+        self.buckets: tuple = tuple(buckets)
+        # One count per bucket plus +Inf, not cumulative until rendered
+        self.counts: list[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> list[str]:
+        separator = ',' if self.labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{self.name}_bucket{{{self.labels}{separator}le="{le}"}} {cumulative}')
+        lines.append(f'{self.name}_sum{braces(self.labels)} {self.sum}')
+        lines.append(f'{self.name}_count{braces(self.labels)} {self.count}')
+        return lines
+
+
+def format_labels(labels: dict) -> str:
+    return ','.join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def braces(labels: str) -> str:
+    return f'{{{labels}}}' if labels else ''
+
+
+def render(registry: list = REGISTRY) -> str:
+    """
+    All metrics in the Prometheus text exposition format, version 0.0.4.
+    """
+    lines = []
+    described = set()
+    for metric in registry:
+        if metric.name not in described:
+            described.add(metric.name)
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def live_games() -> int:
+    from game_app.game.game import GameHandler, GameState
+
+    return sum(game.state == GameState.RUNNING for game in GameHandler.games.values())
+
+
+def open_games() -> int:
+    from game_app.game.game import GameHandler
+
+    return len(GameHandler.games)
+
+
+# Frames are only queued per observer here, the socket writes are in game_observer_send_seconds
+TURN_ENQUEUE = Histogram(
+    'game_turn_enqueue_seconds',
+    "Time from the second player's action until the turn frames are queued for every observer "
+    "and published to spectators",
+)
+TURNS_VOLUNTARY = Counter('game_turns_total', 'Turns resolved', {'reason': 'voluntary'})
+TURNS_TIMEOUT = Counter('game_turns_total', 'Turns resolved', {'reason': 'timeout'})
+OBSERVER_SEND = Histogram('game_observer_send_seconds', 'Time to write one frame to one observer socket')
+RESULT_REPORT = Histogram('game_result_report_seconds', 'Time to hand a finished game to the match history '
+                                                        'and the results outbox')
+GAMES_FINISHED = Counter('game_games_finished_total', 'Games played to their result')
+SOCKET_CONNECTIONS = Counter('game_socket_connections_total', 'Game sockets accepted')
+SOCKET_DISCONNECTIONS = Counter('game_socket_disconnections_total', 'Game sockets closed')
+SOCKET_MESSAGES = Counter('game_socket_messages_received_total', 'Messages received from players')
+LIVE_GAMES = Gauge('game_live_games', 'Running games held by this worker', live_games)
+OPEN_GAMES = Gauge('game_open_games', 'Games of any state held by this worker', open_games)
+LOOP_LAG = Histogram('game_event_loop_lag_seconds', 'How late the event loop ran the monitor heartbeat')
+LOOP_STALLS = Counter('game_event_loop_stalls_total', 'Heartbeats late by more than LOOP_LAG_THRESHOLD')
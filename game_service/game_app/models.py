@@ -1,6 +1,6 @@
 import datetime
 
-from mongoengine import Document, DateTimeField, StringField, DictField
+from mongoengine import Document, DateTimeField, StringField, DictField, BinaryField
 
 
 class GameModel(Document):
@@ -8,6 +8,8 @@ class GameModel(Document):
     game_log = StringField()
     # Players usernames, game result (winner, ratings change)
     game_result = DictField(required=True)
+    # Binary replay, see game_app.game.replay
+    replay = BinaryField()
 
     meta = {
         'indexes': ['game_date']
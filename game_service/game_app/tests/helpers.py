@@ -0,0 +1,22 @@
+"""
+Observers shared by the test cases.
+"""
+
+
+class FakeObserver:
+    """In-process player observer recording the messages it was sent."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_start(self, message):
+        self.messages.append(message)
+
+    async def send_turn(self, message):
+        self.messages.append(message)
+
+    async def send_timer(self, message):
+        self.messages.append(message)
+
+    async def send_game_result(self, message):
+        self.messages.append(message)
@@ -0,0 +1,37 @@
+import itertools
+
+from django.test import SimpleTestCase
+
+from game_app.game.actions import Action, ActionsFactory, ResolutionTable
+
+
+class ResolutionTableTestCase(SimpleTestCase):
+    """
+    Test cases for the precompiled action resolution table.
+    """
+
+    def test_table_covers_every_action_pair(self):
+        """
+        The table holds an entry for each of the 5x5 action pairs.
+        """
+        names = ActionsFactory.action_classes.values()
+        assert set(ResolutionTable.table.keys()) == set(itertools.product(names, names))
+
+    def test_table_matches_reference_resolution(self):
+        """
+        Table lookups produce exactly the statuses of Action.resolve_actions.
+        """
+        names = list(ActionsFactory.action_classes.keys())
+        values = (0, 1, 7, 20, 33)
+
+        for left_name, right_name in itertools.product(names, names):
+            for lc, lp, rc, rp in itertools.product(values, repeat=4):
+                left = ActionsFactory.create_action(action_name=left_name, energy_cost=lc, action_power=lp)
+                right = ActionsFactory.create_action(action_name=right_name, energy_cost=rc, action_power=rp)
+
+                expected = Action.resolve_actions(left, right)
+                compiled = ResolutionTable.resolve(left, right)
+
+                for side in range(2):
+                    with self.subTest(left=left_name, right=right_name, params=(lc, lp, rc, rp), side=side):
+                        assert compiled[side] == expected[side]
@@ -0,0 +1,95 @@
+import random
+from collections import Counter
+from fractions import Fraction
+from itertools import product
+
+from django.test import SimpleTestCase
+
+from game_app.game.actions import PASS_ACTION
+from game_app.game.ai_logic import Bot
+from game_app.game.bot_policy import BotPolicy, DEFAULT_POLICY
+
+
+def reference_probabilities(status, opponent_status, available_actions):
+    """The hand-written weighting Bot.make_move used before it was compiled into a table."""
+    actions_dict = {'attack': 1, 'defence': 1, 'feint': 1, 'rest': 0, 'pass': 0}
+    if status[1] < 50:
+        actions_dict['rest'] += 1
+    if status[1] > opponent_status[1]:
+        actions_dict['attack'] += 1
+    if status[0] > opponent_status[0]:
+        actions_dict['feint'] += 1
+    if status[0] < opponent_status[0]:
+        actions_dict['defence'] += 1
+    if all(action not in opponent_status[2] for action in ('attack', 'defend')):
+        actions_dict['defence'] = 0
+        actions_dict['feint'] = 0
+    for action in actions_dict:
+        if action not in available_actions:
+            actions_dict[action] = 0
+
+    actions_list = [action for action, weight in actions_dict.items() for _ in range(weight)] or ['pass']
+    return {action: Fraction(count, len(actions_list)) for action, count in Counter(actions_list).items()}
+
+
+def table_probabilities(policy, status, opponent_status, available_actions):
+    names, cumulative = policy.table[policy.key(status, opponent_status, available_actions)]
+    weights = [cumulative[0]] + [high - low for low, high in zip(cumulative, cumulative[1:])]
+    return {name: Fraction(weight, cumulative[-1]) for name, weight in zip(names, weights)}
+
+
+class BotPolicyTestCase(SimpleTestCase):
+    """
+    Test cases for the compiled bot decision table.
+    """
+
+    def test_default_policy_matches_hand_written_rules(self):
+        """
+        Every state gets the same action probabilities as the original weighting.
+        """
+        action_sets = [set(), {'pass'}, {'rest', 'feint'}, {'attack', 'defence', 'feint', 'rest'}]
+        opponent_sets = [[], ['pass'], ['feint', 'rest'], ['attack', 'defence', 'feint', 'rest']]
+
+        for health, energy, opponent_health, opponent_energy, actions, opponent_actions in product(
+                (40, 50, 60), (20, 49, 50, 80), (50,), (49, 50, 51), action_sets, opponent_sets):
+            status = (health, energy, sorted(actions), False)
+            opponent_status = (opponent_health, opponent_energy, opponent_actions, False)
+
+            assert table_probabilities(DEFAULT_POLICY, status, opponent_status, actions) == \
+                reference_probabilities(status, opponent_status, actions), (status, opponent_status)
+
+    def test_weights_are_configurable(self):
+        """
+        Custom weights change the compiled table.
+        """
+        policy = BotPolicy({'attack': 0, 'defence': 0, 'feint': 0, 'rest_on_low_energy': 3})
+        actions = {'attack', 'defence', 'feint', 'rest'}
+
+        probabilities = table_probabilities(policy, (50, 30, [], False), (50, 60, ['attack'], False), actions)
+
+        assert probabilities == {'rest': 1}
+
+    def test_decide_follows_weights(self):
+        """
+        Sampled decisions follow the cumulative weights.
+        """
+        actions = {'attack', 'defence', 'feint', 'rest'}
+        status, opponent_status = (60, 40, [], False), (50, 30, ['attack'], False)
+        rng = random.Random(7)
+
+        counts = Counter(DEFAULT_POLICY.decide(status, opponent_status, actions, rng) for _ in range(6000))
+
+        # attack 2, defence 1, feint 2, rest 1
+        assert set(counts) == actions
+        assert 1800 < counts['attack'] < 2200
+        assert 800 < counts['rest'] < 1200
+
+    def test_bot_passes_on_low_energy(self):
+        """
+        Bots without energy for anything but passing do not consult the table.
+        """
+        bot = Bot(seed=1)
+        bot.status = (100, 10, ['rest'], False)
+        bot.opponent_status = (100, 100, ['attack'], False)
+
+        assert bot.make_move() is PASS_ACTION
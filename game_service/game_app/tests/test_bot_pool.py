@@ -0,0 +1,126 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from game_app.game.actions import PASS_ACTION
+from game_app.game.ai_logic import Bot
+from game_app.game.bot_pool import BotPool
+from game_app.game.characters import make_character
+from game_app.game.game import Game, GameState
+from game_app.game.scheduler import TurnScheduler
+
+
+def make_bot_game(seed):
+    game = Game()
+    game.characters[1] = make_character('p1')
+    game.characters[2] = Bot(seed=seed)
+    for character in game.characters.values():
+        character.game = game
+        character.get_actions()
+    game.state = GameState.RUNNING
+    game.record_state()
+    return game
+
+
+class BotPoolTestCase(SimpleTestCase):
+    """
+    Test cases for bots driven by the process-wide BotPool.
+    """
+
+    def setUp(self):
+        BotPool.reset()
+        TurnScheduler.reset()
+
+    def tearDown(self):
+        BotPool.reset()
+        TurnScheduler.reset()
+
+    def test_bot_game_runs_without_observers(self):
+        """
+        Two bots play a whole game reading the state from the game itself.
+        """
+        async def run():
+            game = Game()
+            for seed in (1, 2):
+                bot = Bot(seed=seed)
+                bot.name = f'Bot{seed}'
+                await game.set_character(bot)
+            await game.game_task
+            return game
+
+        with mock.patch('game_app.game.game.AsyncUsersManager') as users_manager:
+            users_manager.return_value.report_match = mock.AsyncMock()
+            game = asyncio.run(run())
+
+        assert game.observers == []
+        assert game.state == GameState.FINISHED
+        assert len(game.replay_actions) == game.turn_number
+        users_manager.return_value.report_match.assert_awaited_once()
+
+    def test_bot_acts_right_away_without_think_time(self):
+        """
+        Without think time the bot has chosen its action once the state is published.
+        """
+        game = make_bot_game(seed=3)
+
+        async def run():
+            game.schedule_bots()
+
+        asyncio.run(run())
+
+        assert game.characters[2].ready_to_act
+        assert not game.characters[1].ready_to_act
+
+    def test_pass_is_submitted_at_once(self):
+        """
+        A bot too tired to act submits its pass instead of waiting for the turn to time out.
+        """
+        game = make_bot_game(seed=5)
+        game.characters[2].energy = 10
+        game.characters[2].status_version += 1
+
+        async def run():
+            game.schedule_bots()
+
+        asyncio.run(run())
+
+        assert game.characters[2].ready_to_act
+        assert game.characters[2].current_action is PASS_ACTION
+
+    def test_think_time_is_served_by_one_task(self):
+        """
+        Thinking bots wait in one queue and act once their think time passed.
+        """
+        games = [make_bot_game(seed) for seed in range(200)]
+
+        async def run():
+            for game in games:
+                game.schedule_bots()
+            waiting = sum(game.characters[2].ready_to_act for game in games)
+            tasks = len(asyncio.all_tasks())
+            await BotPool().loop_task
+            return waiting, tasks
+
+        with mock.patch.object(BotPool, 'MIN_THINK_TIME', 0.01), mock.patch.object(BotPool, 'MAX_THINK_TIME', 0.03):
+            waiting, tasks = asyncio.run(run())
+
+        assert waiting == 0
+        assert tasks == 2  # The test itself and the pool
+        assert all(game.characters[2].ready_to_act for game in games)
+
+    def test_stale_decision_is_dropped(self):
+        """
+        A bot that finished thinking after the game moved on does not act on the old state.
+        """
+        game = make_bot_game(seed=4)
+
+        async def run():
+            game.schedule_bots()
+            game.record_state()
+            await BotPool().loop_task
+
+        with mock.patch.object(BotPool, 'MIN_THINK_TIME', 0.01), mock.patch.object(BotPool, 'MAX_THINK_TIME', 0.01):
+            asyncio.run(run())
+
+        assert not game.characters[2].ready_to_act
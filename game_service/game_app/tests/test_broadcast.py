@@ -0,0 +1,291 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from game_app.game import protocol
+from game_app.game.broadcast import Broadcaster, ObserverQueue
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.scheduler import TurnScheduler
+from game_app.tests.helpers import FakeObserver
+
+
+class SocketObserver:
+    codec = 'json'
+
+    def __init__(self, blocked=False):
+        self.frames = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def send_frame(self, frame):
+        await self.release.wait()
+        self.frames.append(frame)
+
+    async def close(self, code=None):
+        self.closed_with = code
+
+
+class BroadcastTestCase(SimpleTestCase):
+    """
+    Test cases for the serialise-once game broadcaster.
+    """
+
+    def make_game(self):
+        game = Game()
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        return game
+
+    def test_turn_is_encoded_once(self):
+        """
+        Every socket observer receives the same frame, encoded a single time.
+        """
+        async def run():
+            game = self.make_game()
+            sockets = [SocketObserver() for _ in range(5)]
+            bot = FakeObserver()
+            for observer in sockets + [bot]:
+                game.set_observer(observer)
+
+            with mock.patch.object(protocol.json, 'dumps', wraps=json.dumps) as dumps:
+                await game.send_turn('turn message')
+                await asyncio.sleep(0)
+
+            self.assertEqual(dumps.call_count, 1)
+            frames = {socket.frames[0] for socket in sockets}
+            self.assertEqual(len(frames), 1)
+            data = json.loads(frames.pop())
+            self.assertEqual(data['message_type'], 'turn')
+            self.assertEqual(data['message'], 'turn message')
+            self.assertEqual(bot.messages[0]['p1_username'], 'p1')
+
+        asyncio.run(run())
+
+    def test_slow_observer_does_not_block_others(self):
+        """
+        A stalled socket keeps its frames queued while the other observers are served.
+        """
+        async def run():
+            game = self.make_game()
+            slow = SocketObserver(blocked=True)
+            fast = SocketObserver()
+            game.set_observer(slow)
+            game.set_observer(fast)
+
+            await game.send_turn('first')
+            await game.send_turn('second')
+            await asyncio.sleep(0)
+
+            self.assertEqual(len(fast.frames), 2)
+            self.assertEqual(slow.frames, [])
+
+            slow.release.set()
+            await asyncio.sleep(0.01)
+            self.assertEqual(len(slow.frames), 2)
+
+        asyncio.run(run())
+
+    def test_full_buffer_drops_timers_and_closes_on_turns(self):
+        """
+        Timer frames are dropped when the buffer is full, a turn frame closes the client.
+        """
+        async def run():
+            game = self.make_game()
+            slow = SocketObserver(blocked=True)
+            slow.legacy_timer = True
+            game.set_observer(slow)
+            queue = game.broadcaster.queues[slow]
+
+            for timer in range(ObserverQueue.MAX_PENDING + 4):
+                await game.send_timer(timer)
+
+            self.assertIn(slow, game.observers)
+            self.assertEqual(queue.dropped, 4)
+
+            await game.send_turn('turn')
+            await asyncio.sleep(0)
+
+            self.assertNotIn(slow, game.observers)
+            self.assertNotIn(slow, game.broadcaster.queues)
+            self.assertEqual(slow.closed_with, ObserverQueue.CLOSE_CODE)
+
+        asyncio.run(run())
+
+    def test_in_process_observers_get_dicts(self):
+        """
+        Observers without send_frame are called directly and never queued.
+        """
+        async def run():
+            broadcaster = Broadcaster(on_close=lambda observer: None)
+            observer = FakeObserver()
+            broadcaster.add(observer)
+
+            await broadcaster.broadcast([observer], 'send_timer', {'timer': 3}, droppable=True)
+
+            self.assertEqual(broadcaster.queues, {})
+            self.assertEqual(observer.messages, [{'timer': 3}])
+
+        asyncio.run(run())
+
+
+class TurnTimerTestCase(SimpleTestCase):
+    """
+    Test cases for the deadline-based turn timer.
+    """
+
+    def test_turn_started_carries_deadline(self):
+        """
+        Waiting for a turn sends one turn_started frame with the absolute deadline.
+        """
+        async def run():
+            game = Game()
+            game.characters[1] = make_character('p1')
+            game.characters[2] = make_character('p2')
+            socket = SocketObserver()
+            game.set_observer(socket)
+
+            task = asyncio.create_task(game.wait_turn())
+            await asyncio.sleep(0.01)
+            deadline_at = game.turn_deadline_at
+            task.cancel()
+            return socket.frames, deadline_at
+
+        TurnScheduler.reset()
+        try:
+            frames, deadline_at = asyncio.run(run())
+        finally:
+            TurnScheduler.reset()
+
+        self.assertEqual(len(frames), 1)
+        data = json.loads(frames[0])
+        self.assertEqual(data['message_type'], 'turn_started')
+        self.assertEqual(data['deadline'], deadline_at)
+        self.assertAlmostEqual(data['deadline'] - data['server_time'], Game.TURN_TIME, delta=1)
+
+    def test_timer_frames_are_opt_in(self):
+        """
+        Only observers using the legacy timer receive per-second timer frames.
+        """
+        async def run():
+            game = Game()
+            modern = SocketObserver()
+            legacy = SocketObserver()
+            legacy.legacy_timer = True
+            game.set_observer(modern)
+            self.assertFalse(game.needs_timer())
+            game.set_observer(legacy)
+            self.assertTrue(game.needs_timer())
+
+            await game.send_timer(10)
+            await asyncio.sleep(0)
+            return modern.frames, legacy.frames
+
+        modern_frames, legacy_frames = asyncio.run(run())
+
+        self.assertEqual(modern_frames, [])
+        self.assertEqual(json.loads(legacy_frames[0])['timer'], 10)
+
+    def test_timer_follows_legacy_observers(self):
+        """
+        The turn deadline sends timer updates only while a legacy timer observer is connected.
+        """
+        async def run():
+            game = Game()
+            game.turn_deadline = TurnScheduler().schedule(game, Game.TURN_TIME, timer=game.needs_timer())
+            timed = [game.turn_deadline in TurnScheduler().timed]
+
+            legacy = SocketObserver()
+            legacy.legacy_timer = True
+            game.set_observer(legacy)
+            timed.append(game.turn_deadline in TurnScheduler().timed)
+            game.remove_observer(legacy)
+            timed.append(game.turn_deadline in TurnScheduler().timed)
+            return timed
+
+        TurnScheduler.reset()
+        try:
+            timed = asyncio.run(run())
+        finally:
+            TurnScheduler.reset()
+
+        self.assertEqual(timed, [False, True, False])
+
+
+class TurnDeltaTestCase(SimpleTestCase):
+    """
+    Test cases for delta-encoded turn updates.
+    """
+
+    def make_game(self):
+        game = Game()
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        return game
+
+    def play_turn(self, game, p1_action, p2_action):
+        for character in game.characters.values():
+            character.get_actions()
+        game.characters[1].set_action(p1_action)
+        game.characters[2].set_action(p2_action)
+        return game.turn()
+
+    def test_acknowledged_clients_get_deltas(self):
+        """
+        A client that acknowledged a version gets only the fields changed since that version.
+        """
+        async def run():
+            game = self.make_game()
+            fresh = SocketObserver()
+            acked = SocketObserver()
+            game.set_observer(fresh)
+            game.set_observer(acked)
+
+            await game.send_start()
+            acked.acked_version = game.state_version
+
+            await game.send_turn(self.play_turn(game, 'attack', 'rest'))
+            await asyncio.sleep(0)
+            return game, json.loads(fresh.frames[-1]), json.loads(acked.frames[-1])
+
+        game, keyframe, delta = asyncio.run(run())
+
+        self.assertEqual(keyframe['message_type'], 'turn')
+        self.assertEqual(delta['message_type'], 'turn delta')
+        self.assertEqual(delta['version'], keyframe['version'])
+        self.assertEqual(delta['base'], delta['version'] - 1)
+        state, base_state = (
+            {f'p{slot}_{field}': value for slot, fields in zip((1, 2), game.state_history[version])
+             for field, value in fields.items()}
+            for version in (delta['version'], delta['base'])
+        )
+        self.assertEqual(delta['changes'], {field: value for field, value in state.items() if base_state[field] != value})
+        self.assertIn('p2_health', delta['changes'])
+        self.assertNotIn('p1_health', delta['changes'])
+
+    def test_keyframe_interval(self):
+        """
+        Every KEYFRAME_INTERVAL-th update is sent in full even to acknowledged clients.
+        """
+        async def run():
+            game = self.make_game()
+            game.characters[1].health = game.characters[2].health = 10 ** 6
+            socket = SocketObserver()
+            game.set_observer(socket)
+            await game.send_start()
+
+            message_types = []
+            for _ in range(Game.KEYFRAME_INTERVAL):
+                socket.acked_version = game.state_version
+                await game.send_turn(self.play_turn(game, 'feint', 'feint'))
+                await asyncio.sleep(0)
+                message_types.append((game.state_version, json.loads(socket.frames[-1])['message_type']))
+            return message_types
+
+        for version, message_type in asyncio.run(run()):
+            expected = 'turn' if version % Game.KEYFRAME_INTERVAL == 0 else 'turn delta'
+            self.assertEqual(message_type, expected)
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.scheduler import TurnScheduler
+from game_app.tests.helpers import FakeObserver
+
+
+class GameTurnTestCase(SimpleTestCase):
+    """
+    Test cases for turn resolution in Game.
+    """
+
+    def setUp(self):
+        TurnScheduler.reset()
+
+    def tearDown(self):
+        TurnScheduler.reset()
+
+    def test_turn_resolves_when_both_players_acted(self):
+        """
+        The turn is resolved as soon as the second player acts, without waiting for a timer tick.
+        """
+        async def run():
+            game = Game()
+            observer = FakeObserver()
+            game.set_observer(observer)
+            p1, p2 = make_character('p1'), make_character('p2')
+            await game.set_character(p1)
+            await game.set_character(p2)
+            await asyncio.sleep(0)
+            assert game.turn_deadline is not None
+
+            started = time.monotonic()
+            p1.set_action('attack')
+            p2.set_action('rest')
+            while len(observer.messages) < 2:
+                await asyncio.sleep(0.001)
+            elapsed = time.monotonic() - started
+
+            assert observer.messages[1]['p1_action'] == 'attack'
+            assert observer.messages[1]['p2_action'] == 'rest'
+            return elapsed
+
+        elapsed = asyncio.run(run())
+        assert elapsed < 0.1
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from collections import OrderedDict
+from unittest import mock
+
+from asgiref.testing import ApplicationCommunicator
+from channels.routing import URLRouter
+from django.test import SimpleTestCase, override_settings
+
+from game_app.game.characters import make_character
+from game_app.game.game import Game, GameHandler
+from game_app.game.scheduler import TurnScheduler
+from game_service.routing import websocket_urlpatterns
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                   LOOP_MONITOR_ENABLED=False)
+class GameConsumerTestCase(SimpleTestCase):
+    """
+    Test cases for player sockets joining their game.
+    """
+
+    def setUp(self):
+        GameHandler.games = OrderedDict()
+        TurnScheduler.reset()
+
+    def tearDown(self):
+        GameHandler.games = OrderedDict()
+        TurnScheduler.reset()
+
+    def make_running_game(self):
+        game = Game('room1')
+        for slot, character in ((1, make_character('Knight', owner='alice')), (2, make_character('Rogue', owner='bob'))):
+            game.characters[slot] = character
+            game.names_dict[character.get_name()] = character
+            character.game = game
+            character.get_actions()
+        game.game_started = True
+        game.turn_number = 3
+        game.record_state()
+        GameHandler.games['room1'] = game
+        return game
+
+    def play(self, frames):
+        """
+        Reconnects alice as Knight to room1, sends frames and returns the messages received.
+        """
+        async def run():
+            communicator = ApplicationCommunicator(URLRouter(websocket_urlpatterns), {
+                'type': 'websocket',
+                'path': '/ws/game/room1/alice/Knight/token1/',
+                'query_string': b'',
+                'headers': [],
+                'subprotocols': [],
+            })
+            await communicator.send_input({'type': 'websocket.connect'})
+            accepted = await communicator.receive_output()
+            messages = [json.loads((await communicator.receive_output())['text']) for _ in range(2)]
+
+            for frame in frames:
+                await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(frame)})
+            await asyncio.sleep(0.05)
+            while not await communicator.receive_nothing():
+                output = await communicator.receive_output()
+                messages.append(json.loads(output['text']))
+
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait()
+            return accepted, messages
+
+        response = mock.Mock()
+        response.json.return_value = [{
+            'name': 'Knight', 'owner': 'alice', 'strength': 5, 'agility': 5,
+            'stamina': 5, 'endurance': 5, 'level': 1, 'experience': 0,
+        }]
+        with mock.patch('game_app.utils.RedisServer.get_player_by_token', return_value=b'alice'), \
+                mock.patch('game_app.consumers.game_consumer.requests.get', return_value=response):
+            return asyncio.run(run())
+
+    def test_reconnect_finds_character_by_name(self):
+        """
+        A player reconnecting to a running game gets back the character they play, not one named after them.
+        """
+        game = self.make_running_game()
+
+        accepted, messages = self.play([{'choice': 'rest'}])
+
+        assert accepted['type'] == 'websocket.accept'
+        assert 'reconnect' in {message.get('message') for message in messages}
+        assert game.characters[1].ready_to_act
+        assert not game.characters[2].ready_to_act
+
+    def test_null_ack_resends_the_full_state(self):
+        """
+        A client that lost the base of a delta acknowledges null and gets the full state again.
+        """
+        game = self.make_running_game()
+
+        _, messages = self.play([{'ack': game.state_version}, {'ack': None}])
+
+        resync = [message for message in messages if message.get('message') == 'resync']
+        assert len(resync) == 1
+        assert resync[0]['message_type'] == 'game started'
+        assert resync[0]['version'] == game.state_version
@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.game_log import GameLogWriter
+
+
+class InMemoryCollection:
+    """Stand-in for a pymongo collection that records insert_many calls."""
+
+    def __init__(self, delay=0, fail=0):
+        self.delay = delay
+        self.fail = fail
+        self.batches = []
+        self.on_main_thread = []
+
+    def insert_many(self, documents, ordered=True):
+        self.on_main_thread.append(threading.current_thread() is threading.main_thread())
+        time.sleep(self.delay)
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError('mongo is down')
+        self.batches.append(documents)
+
+    @property
+    def documents(self):
+        return [document for batch in self.batches for document in batch]
+
+
+def make_record(number):
+    return {'game_log': [f'Turn: {number}'], 'game_result': {'match_id': str(number), 'result': 'draw'}}
+
+
+class GameLogWriterTestCase(SimpleTestCase):
+    """
+    Test cases for the batched match history writer.
+    """
+
+    def setUp(self):
+        GameLogWriter.reset()
+
+    def tearDown(self):
+        GameLogWriter.reset()
+
+    def test_full_batch_is_written_at_once(self):
+        """
+        BATCH_SIZE finished games go out in one insert_many on the writer thread.
+        """
+        collection = InMemoryCollection()
+        writer = GameLogWriter(collection)
+
+        async def run():
+            for number in range(GameLogWriter.BATCH_SIZE):
+                writer.submit(make_record(number))
+            await writer.flush_task
+
+        asyncio.run(run())
+
+        self.assertEqual([len(batch) for batch in collection.batches], [GameLogWriter.BATCH_SIZE])
+        self.assertEqual(collection.on_main_thread, [False])
+        self.assertEqual(collection.documents[0]['game_log'], 'Turn: 0')
+        self.assertEqual(collection.documents[0]['game_result']['match_id'], '0')
+        self.assertIn('game_date', collection.documents[0])
+
+    def test_partial_batch_is_written_after_interval(self):
+        """
+        Fewer games than BATCH_SIZE are written once FLUSH_INTERVAL passes.
+        """
+        collection = InMemoryCollection()
+        writer = GameLogWriter(collection)
+
+        async def run():
+            writer.submit(make_record(1))
+            await asyncio.sleep(0)
+            self.assertEqual(collection.batches, [])
+            await writer.flush_task
+
+        with mock.patch.object(GameLogWriter, 'FLUSH_INTERVAL', 0.01):
+            asyncio.run(run())
+
+        self.assertEqual(len(collection.documents), 1)
+
+    def test_slow_mongo_does_not_block_the_loop(self):
+        """
+        The event loop keeps running while insert_many is slow.
+        """
+        collection = InMemoryCollection(delay=0.2)
+        writer = GameLogWriter(collection)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            for number in range(GameLogWriter.BATCH_SIZE):
+                writer.submit(make_record(number))
+            await writer.flush_task
+            ticker_task.cancel()
+            return ticks
+
+        self.assertGreater(asyncio.run(run()), 5)
+
+    def test_failed_batch_is_retried(self):
+        """
+        A failed insert puts the batch back in the queue instead of losing it.
+        """
+        collection = InMemoryCollection(fail=1)
+        writer = GameLogWriter(collection)
+
+        async def run():
+            for number in range(3):
+                writer.submit(make_record(number))
+            await writer.flush_task
+
+        with mock.patch.object(GameLogWriter, 'FLUSH_INTERVAL', 0.01):
+            with self.assertLogs('game_server', level='WARNING'):
+                asyncio.run(run())
+
+        self.assertEqual([document['game_result']['match_id'] for document in collection.documents], ['0', '1', '2'])
+
+    def test_queue_is_bounded(self):
+        """
+        Beyond MAX_PENDING waiting games the oldest ones are dropped.
+        """
+        writer = GameLogWriter(InMemoryCollection())
+
+        async def run():
+            with mock.patch.object(GameLogWriter, 'MAX_PENDING', 3):
+                with self.assertLogs('game_server', level='WARNING'):
+                    for number in range(5):
+                        writer.submit(make_record(number))
+            writer.flush_task.cancel()
+
+        asyncio.run(run())
+
+        self.assertEqual([record['game_result']['match_id'] for record in writer.pending], ['2', '3', '4'])
+        self.assertEqual(writer.dropped, 2)
+
+    def test_finished_game_is_submitted(self):
+        """
+        A game with a room token hands its turn log and result to the writer.
+        """
+        game = Game('room1')
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        game.game_log = ['Turn: 1:\np1: attack\np2: block']
+        game.characters[1].is_dead = True
+
+        GameLogWriter(InMemoryCollection())
+        with mock.patch.object(GameLogWriter, 'submit') as submit:
+            game.write_log(game.check_end_condition(0))
+
+        record = submit.call_args.args[0]
+        self.assertEqual(record['game_log'], game.game_log)
+        self.assertEqual(record['game_result']['match_id'], game.match_id)
+
+    def test_game_without_replay_is_logged(self):
+        """
+        A game whose replay can not be encoded is logged without it.
+        """
+        game = Game('room1')
+        game.characters[1] = make_character('p' * 300)
+        game.characters[2] = make_character('p2')
+        game.characters[1].is_dead = True
+
+        GameLogWriter(InMemoryCollection())
+        with mock.patch.object(GameLogWriter, 'submit') as submit:
+            game.write_log(game.check_end_condition(0))
+
+        self.assertIsNone(submit.call_args.args[0]['replay'])
+
+    def test_disabled_writer_skips_the_replay(self):
+        """
+        Without a collection or MONGO_URI a finished game does not encode its replay.
+        """
+        game = Game('room1')
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        game.characters[1].is_dead = True
+
+        with self.settings(MONGO_URI=''), mock.patch.object(Game, 'replay') as replay:
+            game.write_log(game.check_end_condition(0))
+
+        replay.assert_not_called()
+
+    def test_result_is_reported_when_the_log_fails(self):
+        """
+        The result of a finished game is reported even if its log can not be written.
+        """
+        async def run():
+            game = Game('room1')
+            for name in ('p1', 'p2'):
+                character = make_character(name)
+                character.health = 1
+                await game.set_character(character)
+            for character in game.characters.values():
+                character.set_action('attack')
+            await game.game_task
+
+        with mock.patch.object(Game, 'write_log', side_effect=RuntimeError('mongo is gone')), \
+                mock.patch.object(Game, 'report_result') as report_result, \
+                mock.patch.object(Game, 'save_snapshot'), mock.patch.object(Game, 'delete_snapshot'), \
+                mock.patch.object(Game, 'publish'):
+            asyncio.run(run())
+
+        report_result.assert_awaited_once()
+
+    def test_disabled_without_mongo(self):
+        """
+        Without a configured collection or MONGO_URI nothing is queued.
+        """
+        with self.settings(MONGO_URI=''):
+            GameLogWriter().submit(make_record(1))
+        self.assertEqual(len(GameLogWriter().pending), 0)
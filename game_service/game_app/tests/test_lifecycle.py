@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import OrderedDict
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from game_app.game.ai_logic import Bot
+from game_app.game.characters import make_character
+from game_app.game.game import Game, GameHandler, GameState
+from game_app.game.leases import GameLeases
+from game_app.game.scheduler import TurnScheduler
+from game_app.tests.helpers import FakeObserver
+
+
+class GameLifecycleTestCase(SimpleTestCase):
+    """
+    Test cases for room lifecycle states and eviction in GameHandler.
+    """
+
+    def setUp(self):
+        GameHandler.games = OrderedDict()
+        GameHandler.evicted_count = 0
+        TurnScheduler.reset()
+        for patcher in (mock.patch.object(Game, 'restore', return_value=None),
+                        mock.patch.object(GameLeases, 'acquire', return_value=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        GameHandler.games = OrderedDict()
+        GameHandler.evicted_count = 0
+        TurnScheduler.reset()
+
+    def test_states_follow_players(self):
+        """
+        Rooms go from created to waiting to running as players join.
+        """
+        async def run():
+            game = await GameHandler.get_or_add('room')
+            states = [game.state]
+            await game.set_character(make_character('p1'))
+            states.append(game.state)
+            await game.set_character(make_character('p2'))
+            states.append(game.state)
+            return states
+
+        assert asyncio.run(run()) == [GameState.CREATED, GameState.WAITING, GameState.RUNNING]
+
+    def test_sweep_evicts_idle_waiting_and_finished_rooms(self):
+        """
+        Rooms waiting for a player past their TTL and old finished rooms are evicted.
+        """
+        async def run():
+            waiting = await GameHandler.get_or_add('waiting')
+            waiting.state = GameState.WAITING
+            waiting.last_activity = time.monotonic() - GameHandler.WAITING_TTL - 1
+
+            finished = await GameHandler.get_or_add('finished')
+            finished.state = GameState.FINISHED
+            finished.observers.append(FakeObserver())
+            finished.last_activity = time.monotonic() - GameHandler.FINISHED_TTL - 1
+
+            fresh = await GameHandler.get_or_add('fresh')
+            fresh.state = GameState.WAITING
+
+            GameHandler.sweep()
+            return waiting, finished
+
+        waiting, finished = asyncio.run(run())
+
+        assert list(GameHandler.games) == ['fresh']
+        assert waiting.state == GameState.EVICTED
+        assert finished.observers == []
+        assert GameHandler.get_stats() == {'live': 0, 'waiting': 1, 'finished': 0, 'evicted': 2}
+
+    def test_limit_evicts_least_recently_used_abandoned_room(self):
+        """
+        Past the hard cap the least recently used abandoned room is evicted, never a watched live game.
+        """
+        async def run():
+            live = await GameHandler.get_or_add('live')
+            live.state = GameState.RUNNING
+            live.observers.append(FakeObserver())
+
+            await GameHandler.get_or_add('old')
+            await GameHandler.get_or_add('recent')
+            rooms = list(GameHandler.games)
+
+            await GameHandler.get_or_add('recent')
+            await GameHandler.get_or_add('newest')
+            return rooms
+
+        with mock.patch.object(GameHandler, 'MAX_GAMES', 2):
+            rooms = asyncio.run(run())
+
+        assert rooms == ['live', 'recent']
+        assert list(GameHandler.games) == ['live', 'newest']
+        assert GameHandler.evicted_count == 2
+
+    def test_limit_keeps_rooms_with_a_connected_player(self):
+        """
+        A room still waiting for its second player is not evicted while the first one is connected.
+        """
+        async def run():
+            waiting = await GameHandler.get_or_add('waiting')
+            waiting.state = GameState.WAITING
+            waiting.observers.append(FakeObserver())
+
+            await GameHandler.get_or_add('newest')
+            return waiting
+
+        with mock.patch.object(GameHandler, 'MAX_GAMES', 1):
+            waiting = asyncio.run(run())
+
+        assert list(GameHandler.games) == ['waiting', 'newest']
+        assert waiting.state == GameState.WAITING
+        assert GameHandler.evicted_count == 0
+
+    def test_game_against_a_bot_is_abandoned_without_its_player(self):
+        """
+        A running game against a bot is abandoned once the human player's socket is gone.
+        """
+        async def run():
+            game = await GameHandler.get_or_add('room')
+            player = FakeObserver()
+            game.set_observer(player)
+            await game.set_character(make_character('p1'))
+            await game.set_character(Bot(seed=1))
+            watched = game.is_abandoned()
+            game.remove_observer(player)
+            return watched, game.is_abandoned()
+
+        assert asyncio.run(run()) == (False, True)
+
+    def test_evicted_game_stops_its_turn_loop(self):
+        """
+        Evicting a running room cancels its turn loop and deadline.
+        """
+        async def run():
+            game = await GameHandler.get_or_add('room')
+            await game.set_character(make_character('p1'))
+            await game.set_character(make_character('p2'))
+            await asyncio.sleep(0)
+            task = game.game_task
+
+            GameHandler.evict('room')
+            await asyncio.sleep(0)
+            return game, task
+
+        game, task = asyncio.run(run())
+        assert task.cancelled()
+        assert game.turn_deadline is None or game.turn_deadline not in TurnScheduler().active
+        assert all(character.game is None for character in game.characters.values())
@@ -0,0 +1,122 @@
+import random
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from game_app.game import lookahead
+from game_app.game.ai_logic import Bot, MonteCarloBot, bot_class
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+
+
+def fighters(rng):
+    """Two characters with random stat allocations of 20 points."""
+    characters = []
+    for slot in (1, 2):
+        cuts = sorted(rng.sample(range(1, 20), 3))
+        strength, agility, stamina, endurance = cuts[0], cuts[1] - cuts[0], cuts[2] - cuts[1], 20 - cuts[2]
+        characters.append(make_character(f'p{slot}', strength=strength, agility=agility,
+                                         stamina=stamina, endurance=endurance))
+    return characters
+
+
+class LookaheadTestCase(SimpleTestCase):
+    """
+    Test cases for the flat fight state and the Monte Carlo search.
+    """
+
+    def test_step_matches_game_turn(self):
+        """
+        Random fights give the same state after every turn in step and in Game.turn.
+        """
+        rng = random.Random(0)
+        for _ in range(100):
+            game = Game()
+            game.characters[1], game.characters[2] = fighters(rng)
+            left, right = lookahead.constants(game.characters[1]), lookahead.constants(game.characters[2])
+            state = [0] * lookahead.STATE_SIZE
+            lookahead.load(state, game.characters[1], game.characters[2])
+
+            for turn_number in range(1, Game.MAX_TURNS + 1):
+                game.turn_number = turn_number
+                codes = []
+                for character in game.characters.values():
+                    action = rng.choice(sorted(character.get_actions()) or ['pass'])
+                    character.set_action(action)
+                    codes.append(lookahead.ACTION_CODES[action])
+                game.turn()
+                lookahead.step(state, left, right, *codes)
+
+                expected = [0] * lookahead.STATE_SIZE
+                lookahead.load(expected, game.characters[1], game.characters[2])
+                assert state == expected, turn_number
+                if state[lookahead.DEAD] or state[lookahead.SIDE + lookahead.DEAD]:
+                    break
+
+    def test_available_matches_character(self):
+        """
+        The available action codes are the ones Character.get_actions offers.
+        """
+        character, opponent = make_character('p1'), make_character('p2')
+        state = [0] * lookahead.STATE_SIZE
+        epa = lookahead.constants(character)[2]
+
+        for energy, skip, dead in ((100, False, False), (epa - 1, False, False), (100, True, False), (100, False, True)):
+            character.energy, character.skip_turn, character.is_dead = energy, skip, dead
+            lookahead.load(state, character, opponent)
+            codes = lookahead.AVAILABLE[lookahead.available(state, 0, epa)]
+            expected = set(character.get_actions()) or ({'pass'} if skip and not dead else set())
+            assert {lookahead.ACTION_NAMES[code] for code in codes} == expected, (energy, skip, dead)
+
+    def test_search_respects_time_budget(self):
+        """
+        A decision stops at the time budget long before the playout budget.
+        """
+        bot, opponent = MonteCarloBot(seed=1, playouts=10 ** 9, time_budget=0.01), make_character('p1')
+        bot.opponent = opponent
+
+        started = time.perf_counter()
+        code = bot.search.search(bot, opponent)
+
+        assert time.perf_counter() - started < 0.5
+        assert 0 < bot.search.last_playouts < 10 ** 9
+        assert lookahead.ACTION_NAMES[code] in bot.get_actions()
+
+    def test_search_is_deterministic_with_a_seed(self):
+        """
+        With a playout budget only, the same seed makes the same decisions.
+        """
+        decisions = []
+        for _ in range(2):
+            rng = random.Random(3)
+            bot = MonteCarloBot(seed='seed', playouts=200, time_budget=None)
+            opponent = make_character('p1')
+            moves = []
+            for health, energy in ((100, 100), (40, 60), (90, 30), (20, 100)):
+                bot.health, bot.energy = health, energy
+                opponent.health, opponent.energy = rng.randint(10, 100), rng.randint(0, 100)
+                moves.append(bot.search.search(bot, opponent))
+            decisions.append(moves)
+
+        assert decisions[0] == decisions[1]
+
+    def test_single_choice_skips_search(self):
+        """
+        A bot that has to pass does not run playouts.
+        """
+        bot, opponent = MonteCarloBot(seed=1), make_character('p1')
+        bot.skip_turn = True
+
+        assert bot.search.search(bot, opponent) == lookahead.PASS
+        assert bot.search.last_playouts == 0
+
+    def test_bot_class_follows_settings(self):
+        """
+        BOT_DIFFICULTY picks the bot class, unknown values fall back to the normal bot.
+        """
+        with override_settings(BOT_DIFFICULTY='hard'):
+            assert bot_class() is MonteCarloBot
+        with override_settings(BOT_DIFFICULTY='normal'):
+            assert bot_class() is Bot
+        with override_settings(BOT_DIFFICULTY='impossible'):
+            assert bot_class() is Bot
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from asgiref.testing import ApplicationCommunicator
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from game_app import metrics
+from game_app.lifespan import lifespan
+from game_app.loop_monitor import LoopMonitor
+from game_app.views import get_loop_stalls
+
+
+def blocking_handler():
+    # Stands in for a synchronous Redis or HTTP call made from a coroutine
+    time.sleep(0.4)
+
+
+@override_settings(LOOP_MONITOR_ENABLED=True, LOOP_LAG_THRESHOLD=0.1)
+class LoopMonitorTestCase(SimpleTestCase):
+    """
+    Test cases for the event loop watchdog.
+    """
+
+    def setUp(self):
+        LoopMonitor.reset()
+
+    def tearDown(self):
+        LoopMonitor.reset()
+
+    def test_blocking_call_is_captured_with_its_stack(self):
+        """
+        A coroutine blocking the loop is recorded with the stack it was stuck in.
+        """
+        stalls = metrics.LOOP_STALLS.value
+
+        async def blocking_coroutine():
+            blocking_handler()
+
+        async def run():
+            LoopMonitor().start()
+            await asyncio.sleep(0.15)
+            await asyncio.create_task(blocking_coroutine(), name='blocking')
+            await asyncio.sleep(0.25)
+
+        asyncio.run(run())
+
+        recorded = LoopMonitor().get_stalls()
+        assert len(recorded) == 1
+        stall = recorded[0]
+        assert stall['finished']
+        assert stall['lag'] >= 0.3
+        assert stall['task'] == 'blocking'
+        assert stall['coroutine'].endswith('blocking_coroutine')
+        assert any('blocking_handler' in line for line in stall['stack'])
+        assert metrics.LOOP_STALLS.value == stalls + 1
+
+    def test_idle_loop_has_no_stalls(self):
+        """
+        Heartbeats of an idle loop are measured without recording stalls.
+        """
+        heartbeats = metrics.LOOP_LAG.count
+
+        async def run():
+            LoopMonitor().start()
+            await asyncio.sleep(0.45)
+
+        asyncio.run(run())
+
+        assert LoopMonitor().get_stalls() == []
+        assert metrics.LOOP_LAG.count >= heartbeats + 3
+
+    def test_disabled_monitor_does_not_start(self):
+        """
+        LOOP_MONITOR_ENABLED=False leaves the loop alone.
+        """
+        async def run():
+            LoopMonitor().start()
+            return LoopMonitor().loop_task
+
+        with override_settings(LOOP_MONITOR_ENABLED=False):
+            assert asyncio.run(run()) is None
+        assert LoopMonitor().thread is None
+
+    def test_lifespan_starts_and_stops_the_monitor(self):
+        """
+        The monitor runs from server startup to shutdown, without waiting for a socket.
+        """
+        async def run():
+            communicator = ApplicationCommunicator(lifespan, {'type': 'lifespan'})
+            await communicator.send_input({'type': 'lifespan.startup'})
+            started = await communicator.receive_output()
+            running = LoopMonitor().loop_task is not None and not LoopMonitor().loop_task.done()
+            thread = LoopMonitor().thread
+
+            await communicator.send_input({'type': 'lifespan.shutdown'})
+            stopped = await communicator.receive_output()
+            await communicator.wait()
+            await asyncio.sleep(0)
+            return started, running, thread, stopped
+
+        started, running, thread, stopped = asyncio.run(run())
+
+        assert started == {'type': 'lifespan.startup.complete'}
+        assert running
+        assert stopped == {'type': 'lifespan.shutdown.complete'}
+        thread.join(1)
+        assert not thread.is_alive()
+
+    def test_stalls_endpoint_is_admin_only(self):
+        """
+        Only staff users can read the recorded stalls.
+        """
+        factory = APIRequestFactory()
+
+        response = get_loop_stalls(factory.get('/gam/api/v1/admin/loop_stalls/'))
+        assert response.status_code in (401, 403)
+
+        request = factory.get('/gam/api/v1/admin/loop_stalls/')
+        force_authenticate(request, user=SimpleNamespace(is_staff=True, is_authenticated=True))
+        response = get_loop_stalls(request)
+        assert response.status_code == 200
+        assert response.data == {'threshold': 0.1, 'stalls': []}
@@ -0,0 +1,77 @@
+import logging
+import tracemalloc
+
+from django.test import SimpleTestCase
+
+from game_app.game.actions import ActionsFactory, Status, PASS_ACTION
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+
+
+logger = logging.getLogger('game_server')
+
+
+def make_active_game(index):
+    game = Game()
+    for slot in (1, 2):
+        character = make_character(f'p{slot}_{index}')
+        game.characters[slot] = character
+        game.names_dict[character.get_name()] = character
+        character.game = game
+        character.get_actions()
+    game.game_started = True
+    game.turn_number = 1
+    game.characters[1].set_action('attack')
+    game.characters[2].set_action('rest')
+    return game
+
+
+class ActionMemoryTestCase(SimpleTestCase):
+    """
+    Test cases for the memory footprint of the action system.
+    """
+    GAMES = 2000
+    MAX_BYTES_PER_GAME = 8192
+
+    def test_pass_action_is_shared(self):
+        """
+        Parameterless actions are shared flyweights instead of fresh allocations.
+        """
+        character = make_character('p1')
+        character.get_actions()
+        character.set_action('attack')
+        character.get_action()
+
+        assert character.current_action is PASS_ACTION
+        assert ActionsFactory.create_action(action_name='pass') is PASS_ACTION
+
+    def test_actions_have_no_instance_dict(self):
+        """
+        Action, Effect and Status objects use a fixed slot layout.
+        """
+        action = ActionsFactory.create_action(action_name='attack', energy_cost=20, action_power=20)
+        assert not hasattr(action, '__dict__')
+        assert all(not hasattr(effect, '__dict__') for effect in action.effects.values())
+        assert not hasattr(Status(), '__dict__')
+
+    def test_bytes_per_active_game(self):
+        """
+        An active Game with two characters mid-turn holds less than MAX_BYTES_PER_GAME.
+
+        The measured figure is logged on every run, so its trend shows before the limit is hit.
+        """
+        make_active_game(-1)
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            games = [make_active_game(i) for i in range(self.GAMES)]
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        bytes_per_game = allocated / len(games)
+        logger.info(f'Memory: {bytes_per_game:.0f} bytes per active Game, limit {self.MAX_BYTES_PER_GAME}')
+        assert bytes_per_game < self.MAX_BYTES_PER_GAME, f'{bytes_per_game:.0f} bytes per active Game'
+
@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from game_app import metrics
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.scheduler import TurnScheduler
+from game_app.views import get_metrics
+
+
+class MetricsTestCase(SimpleTestCase):
+    """
+    Test cases for the metrics registry and its Prometheus rendering.
+    """
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Rendered buckets count every observation up to their bound, +Inf counts all of them.
+        """
+        registry = []
+        histogram = metrics.Histogram('test_seconds', 'Test', buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        text = metrics.render(registry)
+
+        assert '# TYPE test_seconds histogram' in text
+        assert 'test_seconds_bucket{le="0.1"} 2' in text
+        assert 'test_seconds_bucket{le="1.0"} 3' in text
+        assert 'test_seconds_bucket{le="+Inf"} 4' in text
+        assert 'test_seconds_count 4' in text
+        assert 'test_seconds_sum 3.65' in text
+
+    def test_labelled_counters_share_one_family(self):
+        """
+        Counters of the same name are rendered under one HELP and TYPE line.
+        """
+        registry = []
+        first = metrics.Counter('test_total', 'Test', {'reason': 'a'}, registry=registry)
+        metrics.Counter('test_total', 'Test', {'reason': 'b'}, registry=registry)
+        first.inc(2)
+
+        text = metrics.render(registry)
+
+        assert text.count('# TYPE test_total counter') == 1
+        assert 'test_total{reason="a"} 2' in text
+        assert 'test_total{reason="b"} 0' in text
+
+    def test_metric_without_samples_is_abstract(self):
+        """
+        Every kind of metric has to render its own samples.
+        """
+        class Untyped(metrics.Metric):
+            pass
+
+        with self.assertRaises(TypeError):
+            Untyped('test', 'Test', registry=[])
+
+    def test_metrics_endpoint(self):
+        """
+        /metrics serves the registry as Prometheus text to staff users only.
+        """
+        assert self.client.get('/metrics').status_code in (401, 403)
+
+        request = APIRequestFactory().get('/metrics')
+        force_authenticate(request, user=SimpleNamespace(is_staff=True, is_authenticated=True))
+        response = get_metrics(request)
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        body = response.content.decode()
+        assert '# TYPE game_turn_enqueue_seconds histogram' in body
+        assert 'game_turns_total{reason="timeout"}' in body
+        assert 'game_live_games ' in body
+
+
+class GameMetricsTestCase(SimpleTestCase):
+    """
+    Test cases for the metrics recorded by Game.
+    """
+
+    def setUp(self):
+        TurnScheduler.reset()
+
+    def tearDown(self):
+        TurnScheduler.reset()
+
+    def test_voluntary_turn(self):
+        """
+        A turn both players acted in counts as voluntary and records its enqueue time.
+        """
+        voluntary, timeouts, latencies = (metrics.TURNS_VOLUNTARY.value, metrics.TURNS_TIMEOUT.value,
+                                          metrics.TURN_ENQUEUE.count)
+
+        async def run():
+            game = Game()
+            p1, p2 = make_character('p1'), make_character('p2')
+            await game.set_character(p1)
+            await game.set_character(p2)
+            await asyncio.sleep(0)
+            p1.set_action('rest')
+            p2.set_action('rest')
+            while game.turn_number < 2:
+                await asyncio.sleep(0.001)
+            game.evict()
+
+        asyncio.run(run())
+
+        assert metrics.TURNS_VOLUNTARY.value == voluntary + 1
+        assert metrics.TURNS_TIMEOUT.value == timeouts
+        assert metrics.TURN_ENQUEUE.count == latencies + 1
+
+    def test_timed_out_turn(self):
+        """
+        A turn resolved by its deadline counts as a timeout and has no enqueue time.
+        """
+        timeouts, latencies = metrics.TURNS_TIMEOUT.value, metrics.TURN_ENQUEUE.count
+
+        async def run():
+            game = Game()
+            p1, p2 = make_character('p1'), make_character('p2')
+            await game.set_character(p1)
+            await game.set_character(p2)
+            await asyncio.sleep(0)
+            p1.set_action('rest')
+            while game.turn_number < 2:
+                await asyncio.sleep(0.001)
+            game.evict()
+
+        with mock.patch.object(Game, 'TURN_TIME', 0.01), mock.patch.object(TurnScheduler, 'TICK', 0.01):
+            asyncio.run(run())
+
+        assert metrics.TURNS_TIMEOUT.value == timeouts + 1
+        assert metrics.TURN_ENQUEUE.count == latencies
+
+    def test_finished_game_records_reporting(self):
+        """
+        The end of a game records how long the result took to be handed over.
+        """
+        finished, reports = metrics.GAMES_FINISHED.value, metrics.RESULT_REPORT.count
+
+        async def run():
+            game = Game()
+            p1, p2 = make_character('p1'), make_character('p2')
+            p2.health = 1
+            await game.set_character(p1)
+            await game.set_character(p2)
+            await asyncio.sleep(0)
+            p1.set_action('attack')
+            p2.set_action('rest')
+            await game.game_task
+
+        with mock.patch('game_app.game.game.AsyncUsersManager') as users_manager:
+            users_manager.return_value.report_match = mock.AsyncMock()
+            asyncio.run(run())
+
+        assert metrics.GAMES_FINISHED.value == finished + 1
+        assert metrics.RESULT_REPORT.count == reports + 1
@@ -0,0 +1,213 @@
+import asyncio
+import threading
+from unittest import mock
+
+import msgpack
+import redis
+import requests
+from django.test import SimpleTestCase
+
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.outbox import ResultsPublisher, ResultsReporter, publish_match_result
+
+
+class InMemoryStreamRedisServer:
+    """Stand-in for the match results stream methods of RedisServer, with one consumer group."""
+
+    def __init__(self, fail_reads=0):
+        self.entries = {}
+        self.pending = {}  # Entry id: times delivered
+        self.delivered = set()
+        self.dead = []
+        self.next_id = 0
+        self.fail_reads = fail_reads
+        self.groups_created = 0
+        self.added_on_main_thread = []
+
+    def add_match_result(self, match_id, data):
+        self.added_on_main_thread.append(threading.current_thread() is threading.main_thread())
+        self.next_id += 1
+        entry_id = f'{self.next_id}-0'.encode()
+        self.entries[entry_id] = {b'match_id': match_id.encode(), b'data': data}
+        return entry_id
+
+    def create_results_group(self):
+        self.groups_created += 1
+
+    def read_match_results(self, consumer, count, block_ms):
+        if self.fail_reads:
+            self.fail_reads -= 1
+            raise redis.exceptions.ConnectionError('redis is restarting')
+        new = [entry_id for entry_id in self.entries if entry_id not in self.delivered][:count]
+        for entry_id in new:
+            self.delivered.add(entry_id)
+            self.pending[entry_id] = 1
+        return [(entry_id, self.entries[entry_id]) for entry_id in new]
+
+    def claim_match_results(self, consumer, min_idle_ms, count):
+        # Every pending entry counts as idle
+        claimed = list(self.pending)[:count]
+        for entry_id in claimed:
+            self.pending[entry_id] += 1
+        return [(entry_id, self.entries[entry_id]) for entry_id in claimed]
+
+    def get_match_results_deliveries(self, entry_ids):
+        return {entry_id: self.pending[entry_id] for entry_id in entry_ids if entry_id in self.pending}
+
+    def ack_match_results(self, entry_ids):
+        for entry_id in entry_ids:
+            self.pending.pop(entry_id, None)
+            self.entries.pop(entry_id, None)
+
+    def dead_letter_match_result(self, entry_id, fields, reason):
+        self.dead.append((fields, reason))
+        self.ack_match_results([entry_id])
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = 'invalid' if status_code == 400 else ''
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code}')
+
+
+class FakeUsersSession:
+    """Accepts record_matches batches, rejecting matches without players."""
+
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.batches = []
+
+    def post(self, url, json, timeout):
+        if self.fail:
+            self.fail -= 1
+            raise requests.exceptions.ConnectionError('users service is down')
+
+        self.batches.append([match['match_id'] for match in json['matches']])
+        if any(not match['players'] for match in json['matches']):
+            return FakeResponse(400)
+        return FakeResponse(200)
+
+
+class ResultsOutboxTestCase(SimpleTestCase):
+    """
+    Test cases for the match results outbox and its reporter.
+    """
+
+    def setUp(self):
+        self.redis = InMemoryStreamRedisServer()
+        ResultsPublisher.reset()
+        ResultsPublisher().redis = self.redis
+
+    def tearDown(self):
+        ResultsPublisher.reset()
+
+    def publish(self, match_id, players=True):
+        publish_match_result(self.redis, {
+            'match_id': match_id,
+            'players': [{'username': 'p1', 'outcome': 'draw'}] if players else [],
+        })
+
+    def test_finished_game_is_published(self):
+        """
+        A game with a room token appends its result to the outbox instead of calling the users service.
+        """
+        game = Game('room1')
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        game.characters[1].is_dead = True
+
+        with mock.patch('game_app.game.game.AsyncUsersManager') as users_manager:
+            asyncio.run(game.report_result(game.check_end_condition(0)))
+
+        users_manager.assert_not_called()
+        self.assertEqual(self.redis.added_on_main_thread, [False])
+        (fields,) = self.redis.entries.values()
+        self.assertEqual(fields[b'match_id'], game.match_id.encode())
+        self.assertEqual(msgpack.unpackb(fields[b'data'])['players'][0]['outcome'], 'loss')
+
+    def test_batch_is_reported_once(self):
+        """
+        All pending results go out in one request and are removed from the stream.
+        """
+        for match_id in ('m1', 'm2', 'm3'):
+            self.publish(match_id)
+        session = FakeUsersSession()
+
+        reported = ResultsReporter('worker', self.redis, session).process_batch()
+
+        self.assertEqual(reported, 3)
+        self.assertEqual(session.batches, [['m1', 'm2', 'm3']])
+        self.assertEqual(self.redis.entries, {})
+
+    def test_failed_batch_is_retried(self):
+        """
+        Results stay pending while the users service is down and are claimed again later.
+        """
+        self.publish('m1')
+        session = FakeUsersSession(fail=1)
+        reporter = ResultsReporter('worker', self.redis, session)
+
+        with mock.patch('game_app.game.outbox.time.sleep'):
+            reporter.run(once=True)
+        self.assertIn(b'1-0', self.redis.pending)
+        self.assertEqual(reporter.retry_delay, ResultsReporter.RETRY_DELAY)
+
+        reporter.run(once=True)
+        self.assertEqual(session.batches, [['m1']])
+        self.assertEqual(self.redis.entries, {})
+        self.assertEqual(reporter.retry_delay, 0)
+
+    def test_redis_error_is_retried(self):
+        """
+        A Redis error does not stop the reporter; it backs off and recreates the consumer group.
+        """
+        self.redis = InMemoryStreamRedisServer(fail_reads=1)
+        self.publish('m1')
+        session = FakeUsersSession()
+        reporter = ResultsReporter('worker', self.redis, session)
+
+        with mock.patch('game_app.game.outbox.time.sleep') as sleep:
+            reporter.run(once=True)
+        sleep.assert_called_once_with(ResultsReporter.RETRY_DELAY)
+        self.assertEqual(session.batches, [])
+
+        reporter.run(once=True)
+        self.assertEqual(session.batches, [['m1']])
+        self.assertEqual(self.redis.groups_created, 2)
+        self.assertEqual(reporter.retry_delay, 0)
+
+    def test_invalid_result_is_dead_lettered(self):
+        """
+        A rejected batch is split so only the invalid result goes to the dead letter stream.
+        """
+        self.publish('m1')
+        self.publish('bad', players=False)
+        self.publish('m2')
+        session = FakeUsersSession()
+
+        reported = ResultsReporter('worker', self.redis, session).process_batch()
+
+        self.assertEqual(reported, 2)
+        self.assertEqual(session.batches, [['m1', 'bad', 'm2'], ['m1'], ['bad'], ['m2']])
+        self.assertEqual([fields[b'match_id'] for fields, _ in self.redis.dead], [b'bad'])
+        self.assertEqual(self.redis.entries, {})
+
+    def test_poison_result_is_dead_lettered(self):
+        """
+        Results delivered more than MAX_DELIVERIES times are moved to the dead letter stream.
+        """
+        self.publish('m1')
+        self.redis.read_match_results('worker', 1, None)
+        self.redis.pending[b'1-0'] = ResultsReporter.MAX_DELIVERIES
+        session = FakeUsersSession()
+
+        reported = ResultsReporter('worker', self.redis, session).process_batch()
+
+        self.assertEqual(reported, 0)
+        self.assertEqual(session.batches, [])
+        self.assertEqual(self.redis.dead[0][1], 'too many deliveries')
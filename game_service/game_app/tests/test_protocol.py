@@ -0,0 +1,98 @@
+import json
+
+import msgpack
+from django.test import SimpleTestCase
+
+from game_app.game import protocol
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+
+
+class ProtocolTestCase(SimpleTestCase):
+    """
+    Test cases for the JSON and msgpack game WebSocket codecs.
+    """
+
+    def turn_message(self):
+        game = Game()
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        for character in game.characters.values():
+            character.get_actions()
+        game.characters[1].set_action('attack')
+        game.characters[2].set_action('feint')
+        game_message = game.turn()
+        return {
+            'message_type': 'turn',
+            'message': game_message,
+            'p1_username': 'p1',
+            'p1_status': game.characters[1].get_status(),
+            'p1_action': game.characters[1].get_last_action(),
+            'p2_username': 'p2',
+            'p2_status': game.characters[2].get_status(),
+            'p2_action': game.characters[2].get_last_action(),
+        }
+
+    def test_msgpack_turn_layout(self):
+        """
+        Turn frames are arrays of the message type code followed by the turn fields.
+        """
+        data = self.turn_message()
+        frame = protocol.encode(data, protocol.MSGPACK_CODEC)
+
+        self.assertIsInstance(frame, bytes)
+        packed = msgpack.unpackb(frame)
+        self.assertEqual(packed[0], protocol.MESSAGE_CODES['turn'])
+
+        fields = dict(zip(protocol.FIELDS['turn'], packed[1:]))
+        self.assertEqual(fields['p1_action'], protocol.ACTION_CODES['attack'])
+        self.assertEqual(fields['p2_action'], protocol.ACTION_CODES['feint'])
+
+        health, energy, actions, is_dead = fields['p1_status']
+        self.assertEqual((health, energy, is_dead), (data['p1_status'][0], data['p1_status'][1], False))
+        self.assertEqual({protocol.ACTION_NAMES[code] for code in actions}, set(data['p1_status'][2]))
+
+    def test_msgpack_is_smaller_than_json(self):
+        """
+        The binary frame of a turn is smaller than its JSON text frame.
+        """
+        data = self.turn_message()
+        self.assertLess(len(protocol.encode(data, protocol.MSGPACK_CODEC)),
+                        len(protocol.encode(data, protocol.JSON_CODEC).encode()))
+
+    def test_decode_client_message(self):
+        """
+        Choices and acknowledgements are read from JSON objects and msgpack arrays.
+        """
+        self.assertEqual(protocol.decode_client_message(text_data=json.dumps({'choice': 'rest'})), {'choice': 'rest'})
+        frame = msgpack.packb([protocol.ACTION_CODES['defence']])
+        self.assertEqual(protocol.decode_client_message(bytes_data=frame), {'choice': 'defence'})
+        frame = msgpack.packb([protocol.CLIENT_ACK, 7])
+        self.assertEqual(protocol.decode_client_message(bytes_data=frame), {'ack': 7})
+        frame = msgpack.packb([protocol.CLIENT_ACK, None])
+        self.assertEqual(protocol.decode_client_message(bytes_data=frame), {'ack': None})
+
+        with self.assertRaises(ValueError):
+            protocol.decode_client_message(bytes_data=msgpack.packb([len(protocol.ACTION_NAMES)]))
+
+    def test_msgpack_delta_changes(self):
+        """
+        Delta changes are packed as a map keyed by state field codes.
+        """
+        data = {
+            'message_type': 'turn delta',
+            'message': 'turn',
+            'version': 3,
+            'base': 2,
+            'changes': {'p2_health': 80, 'p1_actions': ['feint', 'rest']},
+            'p1_action': 'rest',
+            'p2_action': 'pass',
+        }
+        packed = msgpack.unpackb(protocol.encode(data, protocol.MSGPACK_CODEC), strict_map_key=False)
+        fields = dict(zip(protocol.FIELDS['turn delta'], packed[1:]))
+
+        self.assertEqual(fields['changes'], {
+            protocol.STATE_CODES['p2_health']: 80,
+            protocol.STATE_CODES['p1_actions']: [protocol.ACTION_CODES['feint'], protocol.ACTION_CODES['rest']],
+        })
+        self.assertEqual(fields['p2_action'], protocol.ACTION_CODES['pass'])
@@ -0,0 +1,118 @@
+import random
+
+from django.test import SimpleTestCase
+
+from game_app.game.ai_logic import Bot
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.game.replay import Replay
+
+
+# Not the defaults, so a field mixed up in encoding shows
+STATS = dict(strength=6, agility=4, stamina=5, endurance=7, level=3, experience=120)
+
+
+def play(game, rng, turns=Game.MAX_TURNS):
+    """Plays random turns, returning the state after every turn as seen by the game."""
+    states = []
+    for turn_number in range(1, turns + 1):
+        game.turn_number = turn_number
+        for character in game.characters.values():
+            character.set_action(rng.choice(sorted(character.get_actions()) or ['pass']))
+        game.turn()
+        states.append(tuple((character.health, character.energy, character.is_dead)
+                            for character in game.characters.values()))
+        if any(character.is_dead for character in game.characters.values()):
+            break
+    return states
+
+
+class ReplayTestCase(SimpleTestCase):
+    """
+    Test cases for binary replays and the replay engine.
+    """
+
+    def make_game(self):
+        game = Game()
+        game.characters[1] = make_character('player_1', **STATS)
+        game.characters[2] = make_character('player_2', **STATS)
+        game.characters[1].health = game.characters[2].health = 10 ** 6
+        return game
+
+    def test_round_trip(self):
+        """
+        Seed, stat sheets and actions survive encoding.
+        """
+        game = self.make_game()
+        play(game, random.Random(1), turns=5)
+
+        replay = Replay.decode(game.replay())
+
+        assert replay.seed == game.seed
+        assert replay.actions == bytes(game.replay_actions)
+        assert [sheet['name'] for sheet in replay.sheets] == ['player_1', 'player_2']
+        assert [sheet['level'] for sheet in replay.sheets] == [3, 3]
+
+    def test_full_match_is_compact(self):
+        """
+        A 100 turn match fits in less than 200 bytes.
+        """
+        game = self.make_game()
+        play(game, random.Random(2))
+
+        assert len(game.replay_actions) == Game.MAX_TURNS
+        assert len(game.replay()) < 200
+
+    def test_replay_reproduces_every_state(self):
+        """
+        Re-running the replay yields the same states the game went through.
+        """
+        for seed in range(20):
+            game = Game()
+            game.characters[1] = make_character('p1', **STATS)
+            game.characters[2] = make_character('p2', **STATS)
+            states = play(game, random.Random(seed))
+
+            replayed = [tuple(turn[2:]) for turn in Replay.decode(game.replay()).turns()]
+
+            assert replayed == states, seed
+
+    def test_replay_yields_actions(self):
+        """
+        Every replayed turn names the actions that were resolved.
+        """
+        game = self.make_game()
+        for character, action in zip(game.characters.values(), ('attack', 'defence')):
+            character.get_actions()
+            character.set_action(action)
+        game.turn()
+
+        (turn,) = Replay.decode(game.replay()).turns()
+
+        assert turn[:2] == (1, ('attack', 'defence'))
+
+    def test_invalid_data(self):
+        """
+        Foreign or truncated data is rejected.
+        """
+        game = self.make_game()
+        play(game, random.Random(3), turns=5)
+        data = game.replay()
+
+        for invalid in (b'', b'XX' + data[2:], data[:-1], data[:12]):
+            with self.assertRaises(ValueError):
+                Replay.decode(invalid)
+
+    def test_seeded_bot_is_deterministic(self):
+        """
+        Bots seeded alike make the same moves.
+        """
+        opponent = make_character('p1', **STATS).get_status()
+        moves = []
+        for _ in range(2):
+            bot = Bot(seed=1234)
+            bot.status = bot.get_status()
+            bot.opponent_status = opponent
+            moves.append([bot.make_move() for _ in range(50)])
+
+        assert moves[0] == moves[1]
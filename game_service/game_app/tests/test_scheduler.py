@@ -0,0 +1,114 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from game_app.game.scheduler import TurnScheduler
+
+
+class FakeGame:
+    def __init__(self):
+        self.ready = False
+        self.timers = []
+
+    def turn_ready(self):
+        return self.ready
+
+    async def send_timer(self, timer):
+        self.timers.append(timer)
+
+
+class TurnSchedulerTestCase(SimpleTestCase):
+    """
+    Test cases for the process-wide turn scheduler.
+    """
+
+    def setUp(self):
+        TurnScheduler.reset()
+        self.tick = TurnScheduler.TICK
+        TurnScheduler.TICK = 0.01
+
+    def tearDown(self):
+        TurnScheduler.reset()
+        TurnScheduler.TICK = self.tick
+
+    def test_deadline_expires(self):
+        """
+        A game that never becomes ready is woken by its deadline with a timer update per tick.
+        """
+        async def run():
+            game = FakeGame()
+            deadline = TurnScheduler().schedule(game, 0.03, timer=True)
+            timed_out = await asyncio.wait_for(deadline.wait(), 1)
+            await asyncio.sleep(0)
+            return timed_out, game.timers
+
+        timed_out, timers = asyncio.run(run())
+
+        assert timed_out is True
+        assert timers == [0.02, 0.01, 0]
+
+    def test_only_timed_deadlines_get_timer_updates(self):
+        """
+        A tick sends timer updates only to the games that opted in and stops once they opted out.
+        """
+        async def run():
+            scheduler = TurnScheduler()
+            games = [FakeGame() for _ in range(100)]
+            deadlines = [scheduler.schedule(game, 0.05) for game in games]
+            scheduler.set_timer(deadlines[0], True)
+            scheduler.set_timer(deadlines[1], True)
+            scheduler.tick()
+            scheduler.set_timer(deadlines[1], False)
+            scheduler.tick()
+            await asyncio.sleep(0)
+            return games
+
+        games = asyncio.run(run())
+
+        assert games[0].timers == [0.04, 0.03]
+        assert games[1].timers == [0.04]
+        assert all(game.timers == [] for game in games[2:])
+
+    def test_wake_early(self):
+        """
+        A deadline woken early resolves immediately and is removed from the wheel.
+        """
+        async def run():
+            scheduler = TurnScheduler()
+            deadline = scheduler.schedule(FakeGame(), 10, timer=True)
+            scheduler.wake_early(deadline)
+            timed_out = await asyncio.wait_for(deadline.wait(), 1)
+            return timed_out, scheduler.active
+
+        timed_out, active = asyncio.run(run())
+        assert timed_out is False
+        assert active == set()
+        assert TurnScheduler().timed == set()
+
+    def test_deadline_longer_than_wheel(self):
+        """
+        Deadlines further away than one wheel revolution fire after the right number of rounds.
+        """
+        async def run():
+            scheduler = TurnScheduler()
+            game = FakeGame()
+            deadline = scheduler.schedule(game, TurnScheduler.TICK * (TurnScheduler.WHEEL_SIZE + 2))
+            await asyncio.wait_for(deadline.wait(), 5)
+            return scheduler.current_tick
+
+        assert asyncio.run(run()) == TurnScheduler.WHEEL_SIZE + 2
+
+    def test_many_games_share_one_task(self):
+        """
+        All scheduled games are served by a single ticking task.
+        """
+        async def run():
+            scheduler = TurnScheduler()
+            deadlines = [scheduler.schedule(FakeGame(), 0.02) for _ in range(100)]
+            task = scheduler.loop_task
+            await asyncio.wait_for(asyncio.gather(*(d.wait() for d in deadlines)), 1)
+            return task, scheduler.loop_task
+
+        task, finished_task = asyncio.run(run())
+        assert task is not None
+        assert finished_task is None
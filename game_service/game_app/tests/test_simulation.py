@@ -0,0 +1,88 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from game_app.game.game import Game, Character
+from game_app.game.simulation import (
+    BatchSimulator, ACTION_NAMES, ACTION_CODES, PASS, DRAW, P1_WIN, P2_WIN
+)
+
+
+ALLOCATIONS = [(5, 5, 5, 5), (8, 4, 4, 4), (2, 10, 4, 4), (3, 3, 3, 11)]
+
+
+def scripted_codes(turn, side, available):
+    """Deterministic policy: cycles through the actions, falling back to the first available."""
+    preferred = (turn + side) % (len(ACTION_NAMES) - 1)
+    if available[preferred]:
+        return preferred
+    candidates = np.flatnonzero(available)
+    return candidates[0] if len(candidates) else PASS
+
+
+def scripted_policy(side):
+    state = {'turn': 0}
+
+    def policy(me, enemy, available, rng):
+        codes = np.array([scripted_codes(state['turn'], side, row) for row in available])
+        state['turn'] += 1
+        return codes
+
+    return policy
+
+
+def run_reference(p1_stats, p2_stats):
+    game = Game()
+    for slot, stats in ((1, p1_stats), (2, p2_stats)):
+        strength, agility, stamina, endurance = stats
+        game.characters[slot] = Character({
+            'name': f'p{slot}', 'owner': f'p{slot}', 'strength': strength, 'agility': agility,
+            'stamina': stamina, 'endurance': endurance, 'level': 1, 'experience': 0,
+        })
+
+    for turn in range(Game.MAX_TURNS):
+        for side, character in enumerate((game.characters[1], game.characters[2])):
+            actions = character.get_actions()
+            available = np.array([name in actions for name in ACTION_NAMES])
+            character.set_action(ACTION_NAMES[scripted_codes(turn, side, available)])
+        game.turn()
+
+        p1_dead, p2_dead = game.characters[1].is_dead, game.characters[2].is_dead
+        if p1_dead or p2_dead:
+            if p1_dead and p2_dead:
+                return DRAW, game
+            return (P2_WIN if p1_dead else P1_WIN), game
+
+    return DRAW, game
+
+
+class BatchSimulatorTestCase(SimpleTestCase):
+    """
+    Test cases for the vectorised batch combat simulator.
+    """
+
+    def test_matches_per_object_engine(self):
+        """
+        Scripted fights give the same results and final state as Game.turn.
+        """
+        pairs = [(p1, p2) for p1 in ALLOCATIONS for p2 in ALLOCATIONS]
+        simulator = BatchSimulator(p1_policy=scripted_policy(0), p2_policy=scripted_policy(1))
+        results = simulator.run(np.array([p[0] for p in pairs]), np.array([p[1] for p in pairs]))
+
+        for index, (p1_stats, p2_stats) in enumerate(pairs):
+            expected, _ = run_reference(p1_stats, p2_stats)
+            with self.subTest(p1=p1_stats, p2=p2_stats):
+                assert results[index] == expected
+
+    def test_win_rate_matrix(self):
+        """
+        Win-rate matrices cover every pair of allocations and each row sums to one.
+        """
+        simulator = BatchSimulator(p1_policy=BatchSimulator.POLICIES['bot'], seed=1)
+        matrices = simulator.win_rate_matrix(ALLOCATIONS, fights=50)
+
+        assert matrices['p1_win'].shape == (len(ALLOCATIONS), len(ALLOCATIONS))
+        total = matrices['p1_win'] + matrices['p2_win'] + matrices['draw']
+        assert np.allclose(total, 1)
+
+    def test_action_codes_follow_factory_order(self):
+        assert ACTION_CODES['pass'] == len(ACTION_NAMES) - 1
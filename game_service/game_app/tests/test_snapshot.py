@@ -0,0 +1,267 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from game_app.game.ai_logic import Bot
+from game_app.game.characters import make_character
+from game_app.game.game import Game, GameHandler, Character
+from game_app.game.leases import GameLeases
+from game_app.game.scheduler import TurnScheduler
+from game_app.game.snapshots import SnapshotWriter
+
+
+# Not the defaults, so a field mixed up in encoding shows
+STATS = dict(strength=5, agility=4, stamina=6, endurance=7, level=3, experience=120)
+
+
+class InMemoryRedisServer:
+    """Stand-in for the snapshot and lease methods of RedisServer."""
+    storage = {}
+    batches = []
+    leases = {}
+    reads_on_main_thread = []
+
+    def write_game_snapshots(self, snapshots):
+        self.batches.append(snapshots)
+        for room_token, fields in snapshots.items():
+            if fields is None:
+                self.storage.pop(room_token, None)
+            else:
+                self.storage.setdefault(room_token, {}).update({key.encode(): value for key, value in fields.items()})
+
+    def get_game_snapshot(self, room_token):
+        self.reads_on_main_thread.append(threading.current_thread() is threading.main_thread())
+        return dict(self.storage.get(room_token, {}))
+
+    def acquire_game_lease(self, room_token, owner, ttl):
+        return self.leases.setdefault(room_token, owner) == owner
+
+    def refresh_game_leases(self, room_tokens, owner, ttl):
+        return [self.leases.get(room_token) == owner for room_token in room_tokens]
+
+    def release_game_lease(self, room_token, owner):
+        if self.leases.get(room_token) == owner:
+            del self.leases[room_token]
+
+
+def save(game):
+    async def run():
+        game.save_snapshot(*game.characters.values())
+        await SnapshotWriter().flush_task
+
+    asyncio.run(run())
+
+
+class GameSnapshotTestCase(SimpleTestCase):
+    """
+    Test cases for saving and restoring games through Redis snapshots.
+    """
+
+    def setUp(self):
+        InMemoryRedisServer.storage = {}
+        InMemoryRedisServer.batches = []
+        InMemoryRedisServer.leases = {}
+        InMemoryRedisServer.reads_on_main_thread = []
+        GameHandler.games = OrderedDict()
+        TurnScheduler.reset()
+        SnapshotWriter.reset()
+        GameLeases.reset()
+        for target in ('game_app.game.game.RedisServer', 'game_app.game.snapshots.RedisServer',
+                       'game_app.game.leases.RedisServer'):
+            patcher = mock.patch(target, InMemoryRedisServer)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        GameHandler.games = OrderedDict()
+        TurnScheduler.reset()
+        SnapshotWriter.reset()
+        GameLeases.reset()
+
+    def make_running_game(self):
+        game = Game('room1')
+        for slot, character in ((1, make_character('p1', **STATS)), (2, Bot())):
+            game.characters[slot] = character
+            game.names_dict[character.get_name()] = character
+            character.game = game
+            character.get_actions()
+        game.game_started = True
+        game.turn_number = 7
+        game.replay_actions = bytearray(range(7))
+        game.characters[1].health = 55
+        game.characters[1].energy = 13
+        game.characters[2].skip_turn = True
+        return game
+
+    def test_character_round_trip(self):
+        """
+        Characters are restored with their stats, dynamic state and pending action.
+        """
+        character = make_character('p1', **STATS)
+        character.get_actions()
+        character.health = 42
+        character.set_action('attack')
+
+        restored = Character.from_snapshot(character.snapshot())
+
+        assert restored.stats == character.stats
+        assert (restored.health, restored.energy, restored.epa, restored.damage) == \
+               (character.health, character.energy, character.epa, character.damage)
+        assert restored.ready_to_act
+        assert restored.current_action is character.current_action
+
+    def test_game_round_trip_without_deadline(self):
+        """
+        A turn both players acted in before it started is replayed with the full turn time.
+        """
+        game = self.make_running_game()
+        save(game)
+
+        restored = Game.from_snapshot('room1', InMemoryRedisServer().get_game_snapshot('room1'))
+
+        assert restored.turn_number == 7
+        assert restored.match_id == game.match_id
+        assert restored.seed == game.seed
+        assert restored.replay_actions == game.replay_actions
+        assert restored.resume_delay is None
+        assert restored.characters[1].health == 55
+        assert restored.characters[1].energy == 13
+        assert isinstance(restored.characters[2], Bot)
+        assert restored.characters[2].skip_turn is True
+        assert restored.characters[2] not in restored.observers
+        assert restored.get_character_by_name('p1') is restored.characters[1]
+
+    def test_game_round_trip_mid_turn(self):
+        """
+        A game saved during a turn replays that turn with the time that was left.
+        """
+        game = self.make_running_game()
+        game.turn_deadline_at = time.time() + 12
+        save(game)
+
+        restored = Game.from_snapshot('room1', InMemoryRedisServer().get_game_snapshot('room1'))
+
+        assert restored.turn_number == 7
+        assert restored.turn_deadline_at == game.turn_deadline_at
+        assert 10 < restored.resume_delay <= 12
+
+    def test_get_or_add_rehydrates_game(self):
+        """
+        GameHandler rehydrates a game that is not in memory and resumes its turn loop.
+        """
+        async def run():
+            game = self.make_running_game()
+            game.save_snapshot(*game.characters.values())
+            await SnapshotWriter().flush_task
+
+            restored = await GameHandler.get_or_add('room1')
+            await asyncio.sleep(0)
+            return restored
+
+        restored = asyncio.run(run())
+        assert restored.characters[1].name == 'p1'
+        assert restored.game_task is not None
+        assert InMemoryRedisServer.reads_on_main_thread == [False]
+        assert InMemoryRedisServer.leases == {'room1': GameLeases().owner}
+
+    def test_unsaved_game_is_created(self):
+        """
+        GameHandler creates a new game when there is no snapshot.
+        """
+        game = asyncio.run(GameHandler.get_or_add('room2'))
+        assert game.room_token == 'room2'
+        assert not game.game_started
+
+    def test_game_leased_by_another_worker_is_not_resumed(self):
+        """
+        A worker does not resume a saved game while another worker holds its lease.
+        """
+        async def run():
+            game = self.make_running_game()
+            game.save_snapshot(*game.characters.values())
+            await SnapshotWriter().flush_task
+
+            InMemoryRedisServer.leases['room1'] = 'other worker'
+            return await GameHandler.get_or_add('room1')
+
+        assert asyncio.run(run()) is None
+        assert 'room1' not in GameHandler.games
+        assert InMemoryRedisServer.reads_on_main_thread == []
+
+    def test_lost_lease_evicts_the_room(self):
+        """
+        A room whose lease was taken over is evicted instead of running a second turn loop.
+        """
+        async def run():
+            await GameHandler.get_or_add('room1')
+            await GameHandler.get_or_add('room2')
+            InMemoryRedisServer.leases['room1'] = 'other worker'
+            await GameLeases().refresh()
+
+        asyncio.run(run())
+
+        assert list(GameHandler.games) == ['room2']
+        assert GameLeases().rooms == {'room2'}
+        assert InMemoryRedisServer.leases['room1'] == 'other worker'
+
+    def test_evicted_room_releases_its_lease(self):
+        """
+        Evicting a room hands its lease back, so another worker can take it over right away.
+        """
+        async def run():
+            await GameHandler.get_or_add('room1')
+            GameHandler.evict('room1')
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+
+        assert InMemoryRedisServer.leases == {}
+        assert GameLeases().rooms == set()
+
+    def test_writes_are_coalesced(self):
+        """
+        Snapshots submitted while a write is in flight go out together in the next pipeline.
+        """
+        async def run():
+            writer = SnapshotWriter()
+            writer.submit('room1', {'game': b'1', '1': b'a'})
+            task = writer.flush_task
+            await asyncio.sleep(0)
+            writer.submit('room1', {'game': b'2'})
+            writer.submit('room1', {'game': b'3', '2': b'b'})
+            writer.submit('room2', {'game': b'1'})
+            writer.delete('room2')
+            await task
+
+        asyncio.run(run())
+
+        assert InMemoryRedisServer.batches == [
+            {'room1': {'game': b'1', '1': b'a'}},
+            {'room1': {'game': b'3', '2': b'b'}, 'room2': None},
+        ]
+        assert InMemoryRedisServer.storage == {'room1': {b'game': b'3', b'1': b'a', b'2': b'b'}}
+
+    def test_one_snapshot_per_turn(self):
+        """
+        A game is saved once per turn and its snapshot is deleted when it ends.
+        """
+        async def run():
+            game = Game()
+            for seed in (1, 2):
+                bot = Bot(seed=seed)
+                bot.name = f'Bot{seed}'
+                await game.set_character(bot)
+            await game.game_task
+            return game
+
+        with mock.patch.object(Game, 'save_snapshot', autospec=True) as save_snapshot, \
+                mock.patch.object(Game, 'delete_snapshot', autospec=True) as delete_snapshot, \
+                mock.patch.object(Game, 'report_result', autospec=True):
+            game = asyncio.run(run())
+
+        assert save_snapshot.call_count == game.turn_number
+        delete_snapshot.assert_called_once()
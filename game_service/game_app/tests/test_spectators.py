@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from unittest import mock
+
+import msgpack
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from django.test import SimpleTestCase, override_settings
+
+from game_app.game import protocol, spectators
+from game_app.game.characters import make_character
+from game_app.game.game import Game, GameHandler
+from game_app.game.scheduler import TurnScheduler
+from game_app.game.spectators import SnapshotCache, SpectatorCounter
+from game_app.tests.helpers import FakeObserver
+from game_service.routing import websocket_urlpatterns
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class SpectatorTestCase(SimpleTestCase):
+    """
+    Test cases for spectators fed through the channel layer.
+    """
+
+    def setUp(self):
+        GameHandler.games = OrderedDict()
+        SnapshotCache.reset()
+        SpectatorCounter.reset()
+        TurnScheduler.reset()
+        self.spectator_counts = {}
+        for name, kwargs in (('add_spectators', {}), ('count_spectators', {'side_effect': self.count_spectators})):
+            patcher = mock.patch(f'game_app.utils.RedisServer.{name}', **kwargs)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        GameHandler.games = OrderedDict()
+        SnapshotCache.reset()
+        SpectatorCounter.reset()
+        TurnScheduler.reset()
+
+    def count_spectators(self, room_tokens):
+        return {room_token: self.spectator_counts.get(room_token, 1) for room_token in room_tokens}
+
+    def make_running_game(self):
+        game = Game('room1')
+        game.characters[1] = make_character('p1')
+        game.characters[2] = make_character('p2')
+        game.game_started = True
+        GameHandler.games['room1'] = game
+        return game
+
+    @staticmethod
+    async def connect(room_token, subprotocols=()):
+        communicator = ApplicationCommunicator(URLRouter(websocket_urlpatterns), {
+            'type': 'websocket',
+            'path': f'/ws/spectate/{room_token}/',
+            'query_string': b'',
+            'headers': [],
+            'subprotocols': list(subprotocols),
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        accepted = await communicator.receive_output()
+        return communicator, accepted
+
+    @staticmethod
+    async def disconnect(communicator):
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    def test_join_gets_snapshot_then_events(self):
+        """
+        A spectator first gets the current state, then every event the game publishes.
+        """
+        game = self.make_running_game()
+
+        async def run():
+            communicator, accepted = await self.connect('room1')
+            snapshot = json.loads((await communicator.receive_output())['text'])
+
+            await game.send_turn(game.turn())
+            turn = json.loads((await communicator.receive_output())['text'])
+            await self.disconnect(communicator)
+            return accepted, snapshot, turn
+
+        accepted, snapshot, turn = asyncio.run(run())
+
+        assert accepted['type'] == 'websocket.accept'
+        assert (snapshot['message_type'], snapshot['message']) == ('game started', 'spectate')
+        assert turn['message_type'] == 'turn'
+        assert turn['p1_username'] == 'p1'
+
+    def test_msgpack_spectator(self):
+        """
+        Spectators offering the msgpack subprotocol get the pre-encoded binary frames.
+        """
+        game = self.make_running_game()
+
+        async def run():
+            communicator, accepted = await self.connect('room1', subprotocols=[protocol.MSGPACK_SUBPROTOCOL])
+            await communicator.receive_output()
+            await game.send_game_result('draw')
+            frame = await communicator.receive_output()
+            await self.disconnect(communicator)
+            return accepted, frame
+
+        accepted, frame = asyncio.run(run())
+
+        assert accepted['subprotocol'] == protocol.MSGPACK_SUBPROTOCOL
+        assert msgpack.unpackb(frame['bytes']) == [protocol.MESSAGE_CODES['game result'], 'game ended: draw']
+
+    def test_unknown_room_is_closed(self):
+        """
+        Spectating a room without a game closes the socket.
+        """
+        async def run():
+            communicator, _ = await self.connect('missing')
+            output = await communicator.receive_output()
+            await self.disconnect(communicator)
+            return output
+
+        with mock.patch('game_app.utils.RedisServer.get_game_snapshot', return_value={}):
+            output = asyncio.run(run())
+
+        assert output == {'type': 'websocket.close', 'code': 4004}
+
+    def test_players_stay_in_process(self):
+        """
+        Players get the message directly while spectators get one published copy.
+        """
+        game = self.make_running_game()
+        player = FakeObserver()
+        game.set_observer(player)
+
+        async def run():
+            channel_layer = get_channel_layer()
+            channel = await channel_layer.new_channel()
+            await channel_layer.group_add(spectators.group_name('room1'), channel)
+            with mock.patch.object(channel_layer, 'group_send', wraps=channel_layer.group_send) as group_send:
+                await game.send_turn(game.turn())
+            return group_send.call_count, await channel_layer.receive(channel)
+
+        sends, event = asyncio.run(run())
+
+        assert sends == 1
+        assert player.messages[0]['message_type'] == 'turn'
+        assert json.loads(event[protocol.JSON_CODEC])['message_type'] == 'turn'
+        assert msgpack.unpackb(event[protocol.MSGPACK_CODEC])[0] == protocol.MESSAGE_CODES['turn']
+
+    def test_snapshot_is_rate_limited(self):
+        """
+        A burst of joins loads the room state once per interval.
+        """
+        self.make_running_game()
+
+        async def run():
+            with mock.patch.object(SnapshotCache, 'load', wraps=SnapshotCache.load) as load:
+                results = await asyncio.gather(*(SnapshotCache.get('room1') for _ in range(100)))
+                return load.call_count, results
+
+        loads, results = asyncio.run(run())
+
+        assert loads == 1
+        assert all(result is results[0] for result in results)
+
+    def test_spectators_are_counted(self):
+        """
+        A spectator counts itself in Redis while it watches a room.
+        """
+        self.make_running_game()
+
+        async def run():
+            communicator, _ = await self.connect('room1')
+            await communicator.receive_output()
+            await self.disconnect(communicator)
+
+        asyncio.run(run())
+
+        assert [call.args for call in self.add_spectators.call_args_list] == [('room1', 1), ('room1', -1)]
+
+    def test_unwatched_room_is_not_published(self):
+        """
+        Once the room is known to have no spectators, turns are not encoded for the channel layer.
+        """
+        game = self.make_running_game()
+        self.spectator_counts['room1'] = 0
+
+        async def run():
+            channel_layer = get_channel_layer()
+            with mock.patch.object(SpectatorCounter, 'REFRESH_INTERVAL', 0), \
+                    mock.patch.object(channel_layer, 'group_send', wraps=channel_layer.group_send) as group_send, \
+                    mock.patch.object(spectators, 'spectator_event', wraps=spectators.spectator_event) as encode:
+                await game.send_turn(game.turn())
+                await SpectatorCounter().refresh_task
+                first = group_send.call_count
+                await game.send_turn(game.turn())
+                return first, group_send.call_count, encode.call_count
+
+        first, sends, encodes = asyncio.run(run())
+
+        assert first == 1  # Not counted yet
+        assert sends == 1
+        assert encodes == 1
+
+    def test_restored_game_has_its_deadline(self):
+        """
+        Spectators joining a game of another worker get the deadline of the turn in progress.
+        """
+        game = self.make_running_game()
+        game.turn_number = 4
+        game.turn_deadline_at = time.time() + 20
+        snapshot = {field.encode(): value for field, value in game.snapshot(*game.characters.values()).items()}
+        GameHandler.games = OrderedDict()
+
+        with mock.patch('game_app.utils.RedisServer.get_game_snapshot', return_value=snapshot):
+            messages = asyncio.run(SnapshotCache.load('room1'))
+
+        assert messages[1]['message_type'] == 'turn_started'
+        assert (messages[1]['turn'], messages[1]['deadline']) == (4, game.turn_deadline_at)
@@ -0,0 +1,74 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from game_app.game.bot_policy import BotPolicy, load_default_policy
+from game_app.game.tuning import PolicyTuner, evaluate
+
+
+class PolicyTuningTestCase(SimpleTestCase):
+    """
+    Test cases for self-play tuning and bot policy files.
+    """
+
+    def test_evaluate_is_deterministic(self):
+        """
+        The same weights and seed always get the same score.
+        """
+        weights = dict(BotPolicy.DEFAULT_WEIGHTS)
+        assert evaluate(weights, 200, seed=3) == evaluate(weights, 200, seed=3)
+
+    def test_passive_policy_scores_worse(self):
+        """
+        A policy that never attacks scores below the default weights.
+        """
+        passive = {'attack': 0, 'attack_on_more_energy': 0}
+        assert evaluate(passive, 300, seed=1) < evaluate({}, 300, seed=1)
+
+    def test_evolve_returns_valid_weights(self):
+        """
+        Evolution keeps every weight within bounds.
+        """
+        tuner = PolicyTuner(workers=1, fights=100, seed=5)
+        weights, score = tuner.evolve(generations=2, population=4)
+
+        assert set(weights) == set(BotPolicy.DEFAULT_WEIGHTS)
+        assert all(0 <= weight <= PolicyTuner.MAX_WEIGHT for weight in weights.values())
+        assert -1 <= score <= 1
+
+    def test_workers_give_the_same_result(self):
+        """
+        Spreading a generation over processes does not change the outcome.
+        """
+        results = [PolicyTuner(workers=workers, fights=50, seed=7).evolve(generations=2, population=4)
+                   for workers in (1, 2)]
+        assert results[0] == results[1]
+
+    def test_policy_file_round_trip(self):
+        """
+        Bots load the weights written by the tuner from BOT_POLICY_PATH.
+        """
+        weights = {**BotPolicy.DEFAULT_WEIGHTS, 'attack': 3, 'feint': 0}
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'policy.json'
+            BotPolicy(weights).to_file(path, score=0.5)
+
+            with override_settings(BOT_POLICY_PATH=str(path)):
+                policy = load_default_policy()
+
+        assert policy.weights == weights
+
+    def test_invalid_policy_file_falls_back(self):
+        """
+        A missing or invalid policy file leaves bots on the built-in weights.
+        """
+        with override_settings(BOT_POLICY_PATH='/nonexistent/policy.json'):
+            with self.assertLogs('game_server', level='WARNING'):
+                policy = load_default_policy()
+
+        assert policy.weights == BotPolicy.DEFAULT_WEIGHTS
+        with self.assertRaises(ValueError):
+            BotPolicy({'attack': -1})
+        with self.assertRaises(ValueError):
+            BotPolicy({'unknown': 1})
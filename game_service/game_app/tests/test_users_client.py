@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from game_app.game.characters import make_character
+from game_app.game.game import Game
+from game_app.utils import AsyncUsersManager
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+
+class MatchResultTestCase(SimpleTestCase):
+    """
+    Test cases for match result evaluation in Game.
+    """
+
+    def make_game(self):
+        game = Game()
+        game.characters[1] = make_character('p1', level=2)
+        game.characters[2] = make_character('p2', level=1)
+        return game
+
+    def test_game_goes_on(self):
+        """
+        No result while both characters live and turns remain.
+        """
+        self.assertIsNone(self.make_game().check_end_condition(0))
+
+    def test_win(self):
+        """
+        The winner gains rating and experience, the loser loses rating.
+        """
+        game = self.make_game()
+        game.characters[1].is_dead = True
+        result = game.check_end_condition(3)
+
+        self.assertEqual(result['result'], 'p2 win')
+        self.assertEqual(result['players'], [
+            {'username': 'p1', 'character': 'p1', 'outcome': 'loss', 'rating': -25, 'experience': 0},
+            {'username': 'p2', 'character': 'p2', 'outcome': 'win', 'rating': 25,
+             'experience': game.calc_experience(1, 2)},
+        ])
+
+    def test_draw_on_last_turn(self):
+        """
+        Reaching the last turn is a draw without rating changes.
+        """
+        result = self.make_game().check_end_condition(Game.MAX_TURNS - 1)
+
+        self.assertEqual(result['result'], 'draw')
+        self.assertEqual([player['outcome'] for player in result['players']], ['draw', 'draw'])
+        self.assertEqual([player['rating'] for player in result['players']], [0, 0])
+
+
+class AsyncUsersManagerTestCase(SimpleTestCase):
+    """
+    Test cases for the non-blocking users service client.
+    """
+
+    def setUp(self):
+        AsyncUsersManager._instance = None
+
+    def tearDown(self):
+        AsyncUsersManager._instance = None
+
+    def test_report_match_runs_off_the_loop(self):
+        """
+        Slow requests run concurrently in worker threads while the event loop keeps running.
+        """
+        client = AsyncUsersManager()
+        calls = []
+
+        def slow_request(method, url, timeout, **kwargs):
+            calls.append((method, kwargs['json'], timeout, threading.current_thread() is threading.main_thread()))
+            time.sleep(0.1)
+            return FakeResponse()
+
+        matches = []
+        for _ in range(4):
+            game = Game()
+            game.characters[1] = make_character('p1')
+            game.characters[2] = make_character('p2')
+            game.characters[2].is_dead = True
+            matches.append(game.check_end_condition(0))
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker_task = asyncio.create_task(ticker())
+            started = time.monotonic()
+            await asyncio.gather(*(client.report_match(match) for match in matches))
+            elapsed = time.monotonic() - started
+            ticker_task.cancel()
+            return elapsed, ticks
+
+        with mock.patch.object(client.session, 'request', side_effect=slow_request):
+            elapsed, ticks = asyncio.run(run())
+
+        # One atomic request per match
+        self.assertEqual(len(calls), 4)
+        self.assertEqual({payload['matches'][0]['match_id'] for _, payload, _, _ in calls},
+                         {match['match_id'] for match in matches})
+        self.assertTrue(all(method == 'POST' for method, *_ in calls))
+        self.assertTrue(all(timeout == AsyncUsersManager.TIMEOUT for _, _, timeout, _ in calls))
+        self.assertFalse(any(on_main for *_, on_main in calls))
+        self.assertLess(elapsed, 0.3)
+        self.assertGreater(ticks, 5)
+
+    def test_failures_are_logged(self):
+        """
+        A failing request does not raise into the game.
+        """
+        client = AsyncUsersManager()
+        with mock.patch.object(client.session, 'request', side_effect=requests.exceptions.ConnectTimeout()):
+            with self.assertLogs('game_server', level='WARNING'):
+                self.assertIsNone(asyncio.run(client.record_matches([])))
@@ -1,7 +1,9 @@
 from django.urls import path
 
-from game_app.views import get_auth_token
+from game_app.views import get_auth_token, get_rooms_stats, get_loop_stalls
 
 urlpatterns = {
-    path('get_auth_token/', get_auth_token, name='get_auth_token')
+    path('get_auth_token/', get_auth_token, name='get_auth_token'),
+    path('get_rooms_stats/', get_rooms_stats, name='get_rooms_stats'),
+    path('admin/loop_stalls/', get_loop_stalls, name='get_loop_stalls'),
 }
@@ -1,21 +1,21 @@
+import asyncio
 import json
 import logging
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from typing import Optional
 
 import redis
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 
 from game_service.microservices.users_api import (
-    get_users_add_win_url,
-    get_users_add_loss_url,
-    get_users_add_draw_url,
-    get_users_change_rating_url,
     get_users_get_user_url,
-    get_users_char_experience_url
+    get_users_record_matches_url,
 )
 
 
@@ -75,8 +75,34 @@ class ConsumerUtils:
 class RedisServer:
     MAX_MESSAGES = 1000
     TTL = 3600 * 24
+    GAME_TTL = 3600
+    RESULTS_STREAM = 'match_results'
+    RESULTS_DEAD_STREAM = 'match_results_dead'
+    RESULTS_GROUP = 'users_reporters'
+    RESULTS_MAXLEN = 100000
     TIME_TO_SEARCH = '30'
 
+    # Extends the leases still held by the owner; returns 1 or 0 per key
+    REFRESH_LEASES_SCRIPT = """
+        local owned = {}
+        for index, key in ipairs(KEYS) do
+            if redis.call('get', key) == ARGV[1] then
+                redis.call('expire', key, ARGV[2])
+                owned[index] = 1
+            else
+                owned[index] = 0
+            end
+        end
+        return owned
+    """
+    # Deletes the lease only if the owner still holds it
+    RELEASE_LEASE_SCRIPT = """
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('del', KEYS[1])
+        end
+        return 0
+    """
+
     def __init__(self):
         if settings.RUNNING == 'railway':
             self.redis = redis.Redis(
@@ -173,6 +199,114 @@ class RedisServer:
     def is_p_tokens_member(self, token):
         return self.redis.hexists('player_tokens', token)
 
+    def write_game_snapshots(self, snapshots):
+        """
+        Saves the fields of every room in one pipeline; rooms mapped to None are deleted.
+        """
+        pipeline = self.redis.pipeline(transaction=False)
+        for room_token, fields in snapshots.items():
+            game_key = f'game_{room_token}'
+            if fields is None:
+                pipeline.delete(game_key)
+            else:
+                pipeline.hset(game_key, mapping=fields)
+                pipeline.expire(game_key, RedisServer.GAME_TTL)
+        pipeline.execute()
+
+    def add_spectators(self, room_token, amount):
+        spectators_key = f'spectators_{room_token}'
+        pipeline = self.redis.pipeline(transaction=False)
+        pipeline.incrby(spectators_key, amount)
+        pipeline.expire(spectators_key, RedisServer.GAME_TTL)
+        pipeline.execute()
+
+    def count_spectators(self, room_tokens):
+        values = self.redis.mget([f'spectators_{room_token}' for room_token in room_tokens])
+        return {room_token: int(value or 0) for room_token, value in zip(room_tokens, values)}
+
+    def get_game_snapshot(self, room_token):
+        game_key = f'game_{room_token}'
+        return self.redis.hgetall(game_key)
+
+    def acquire_game_lease(self, room_token, owner, ttl):
+        """
+        Takes the lease of the room unless another owner holds it; returns whether the owner holds it.
+        """
+        if self.redis.set(f'game_owner_{room_token}', owner, nx=True, ex=ttl):
+            return True
+        return self.refresh_game_leases([room_token], owner, ttl)[0]
+
+    def refresh_game_leases(self, room_tokens, owner, ttl):
+        """
+        Extends the leases the owner still holds; returns whether it holds each of them.
+        """
+        keys = [f'game_owner_{room_token}' for room_token in room_tokens]
+        owned = self.redis.eval(RedisServer.REFRESH_LEASES_SCRIPT, len(keys), *keys, owner, ttl)
+        return [bool(value) for value in owned]
+
+    def release_game_lease(self, room_token, owner):
+        self.redis.eval(RedisServer.RELEASE_LEASE_SCRIPT, 1, f'game_owner_{room_token}', owner)
+
+    def add_match_result(self, match_id, data):
+        return self.redis.xadd(
+            RedisServer.RESULTS_STREAM,
+            {'match_id': match_id, 'data': data},
+            maxlen=RedisServer.RESULTS_MAXLEN,
+            approximate=True,
+        )
+
+    def create_results_group(self):
+        try:
+            self.redis.xgroup_create(RedisServer.RESULTS_STREAM, RedisServer.RESULTS_GROUP, id='0', mkstream=True)
+        except redis.exceptions.ResponseError as e:
+            # The group already exists
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def read_match_results(self, consumer, count, block_ms):
+        """
+        Returns new entries for this consumer as a list of (entry id, fields).
+        """
+        response = self.redis.xreadgroup(
+            RedisServer.RESULTS_GROUP, consumer, {RedisServer.RESULTS_STREAM: '>'}, count=count, block=block_ms,
+        )
+        return response[0][1] if response else []
+
+    def claim_match_results(self, consumer, min_idle_ms, count):
+        """
+        Takes over entries left unacknowledged by a failed attempt or a dead consumer.
+        """
+        response = self.redis.xautoclaim(
+            RedisServer.RESULTS_STREAM, RedisServer.RESULTS_GROUP, consumer, min_idle_ms, count=count,
+        )
+        return response[1]
+
+    def get_match_results_deliveries(self, entry_ids):
+        """
+        Returns how many times each of the given pending entries was delivered.
+        """
+        deliveries = {}
+        for entry_id in entry_ids:
+            pending = self.redis.xpending_range(
+                RedisServer.RESULTS_STREAM, RedisServer.RESULTS_GROUP, min=entry_id, max=entry_id, count=1,
+            )
+            if pending:
+                deliveries[entry_id] = pending[0]['times_delivered']
+        return deliveries
+
+    def ack_match_results(self, entry_ids):
+        pipeline = self.redis.pipeline()
+        pipeline.xack(RedisServer.RESULTS_STREAM, RedisServer.RESULTS_GROUP, *entry_ids)
+        pipeline.xdel(RedisServer.RESULTS_STREAM, *entry_ids)
+        pipeline.execute()
+
+    def dead_letter_match_result(self, entry_id, fields, reason):
+        pipeline = self.redis.pipeline()
+        pipeline.xadd(RedisServer.RESULTS_DEAD_STREAM, {**fields, 'reason': reason})
+        pipeline.xack(RedisServer.RESULTS_STREAM, RedisServer.RESULTS_GROUP, entry_id)
+        pipeline.xdel(RedisServer.RESULTS_STREAM, entry_id)
+        pipeline.execute()
+
 
 class RoomManager:
     def __init__(self):
@@ -208,42 +342,65 @@ class GamesManager:
         return None
 
 
-class UsersManager:
-    @staticmethod
-    def add_win(username):
-        url = get_users_add_win_url()
-        data = {'username': username}
-        requests.patch(url, data=data)
-
-    @staticmethod
-    def add_loss(username):
-        url = get_users_add_loss_url()
-        data = {'username': username}
-        requests.patch(url, data=data)
-
-    @staticmethod
-    def add_draw(username):
-        url = get_users_add_draw_url()
-        data = {'username': username}
-        requests.patch(url, data=data)
-
-    @staticmethod
-    def change_rating(username, rating):
-        url = get_users_change_rating_url()
-        data = {
-            'username': username,
-            'rating': rating,
-        }
-        requests.patch(url, data=data)
-
-    @staticmethod
-    def update_experience(charname, experience):
-        url = get_users_char_experience_url()
-        data = {
-            'charname': charname,
-            'experience': experience,
-        }
-        requests.patch(url, data=data)
+class AsyncUsersManager:
+    """
+    Non-blocking users service client for code running in the event loop.
+
+    Requests go through one pooled keep-alive session on a small dedicated thread pool,
+    so they never block the loop; a semaphore bounds how many are in flight and every
+    request has a connect and read timeout.
+    """
+    _instance = None
+
+    MAX_CONCURRENCY = 8
+    TIMEOUT = (3.05, 5)  # Connect and read timeouts in seconds
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=cls.MAX_CONCURRENCY)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            cls._instance.session = session
+            cls._instance.executor = ThreadPoolExecutor(max_workers=cls.MAX_CONCURRENCY,
+                                                        thread_name_prefix='users_client')
+            cls._instance.semaphore = None
+            cls._instance.semaphore_loop = None
+        return cls._instance
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self.semaphore is None or self.semaphore_loop is not loop:
+            self.semaphore = asyncio.Semaphore(AsyncUsersManager.MAX_CONCURRENCY)
+            self.semaphore_loop = loop
+        return self.semaphore
+
+    async def request(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        """
+        Returns the response, or None if the request failed; failures are logged.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.get_semaphore():
+            try:
+                response = await loop.run_in_executor(
+                    self.executor,
+                    lambda: self.session.request(method, url, timeout=AsyncUsersManager.TIMEOUT, **kwargs),
+                )
+                response.raise_for_status()
+                return response
+            except requests.exceptions.RequestException as e:
+                logger.warning(f'Users service request to {url} failed: {e}')
+                return None
+
+    async def record_matches(self, matches: list) -> Optional[requests.Response]:
+        """
+        Applies a batch of match results in one atomic, idempotent request.
+        """
+        return await self.request('POST', get_users_record_matches_url(), json={'matches': matches})
+
+    async def report_match(self, match: dict) -> None:
+        await self.record_matches([{'match_id': match['match_id'], 'players': match['players']}])
 
 
 def token_auth(func):
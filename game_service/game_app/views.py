@@ -1,9 +1,14 @@
 import logging
 
+from django.http import HttpResponse
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
+from game_app import metrics
+from game_app.game.game import GameHandler
+from game_app.loop_monitor import LoopMonitor
 from game_app.utils import token_auth, GamesManager
 
 
@@ -23,3 +28,26 @@ def get_auth_token(request, user=None):
 
     data = {'token': token}
     return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def get_rooms_stats(request):
+    data = GameHandler.get_stats()
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_loop_stalls(request):
+    data = {
+        'threshold': LoopMonitor.threshold(),
+        'stalls': LoopMonitor().get_stalls(),
+    }
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_metrics(request):
+    """Prometheus scrape endpoint for staff users; returns a plain response, the DRF renderers would wrap the text."""
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
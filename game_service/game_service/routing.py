@@ -2,8 +2,10 @@ from django.urls import path
 
 from game_app.consumers.chat_consumer import GlobalConsumer
 from game_app.consumers.game_consumer import GameConsumer
+from game_app.consumers.spectator_consumer import SpectatorConsumer
 
 websocket_urlpatterns = [
     path('ws/global/<str:username>/', GlobalConsumer.as_asgi()),
     path('ws/game/<str:room_token>/<str:username>/<str:char_name>/<str:token>/', GameConsumer.as_asgi()),
+    path('ws/spectate/<str:room_token>/', SpectatorConsumer.as_asgi()),
 ]
@@ -105,6 +105,18 @@ ASGI_APPLICATION = "game_service.asgi.application"
 REDIS_HOST = ENV('REDIS_HOST')
 REDIS_PORT = ENV('REDIS_PORT')
 
+# Match history (GameModel) is only written when a Mongo connection string is configured
+MONGO_URI = ENV('MONGO_URI', default='')
+
+# Weights written by the tune_bot_policy command; the built-in weights are used when empty
+BOT_POLICY_PATH = ENV('BOT_POLICY_PATH', default='')
+# normal: weighted policy, hard: Monte Carlo lookahead (game_app.game.ai_logic.BOT_CLASSES)
+BOT_DIFFICULTY = ENV('BOT_DIFFICULTY', default='normal')
+
+# Event loop watchdog, see game_app.loop_monitor.LoopMonitor
+LOOP_MONITOR_ENABLED = ENV.bool('LOOP_MONITOR_ENABLED', default=True)
+LOOP_LAG_THRESHOLD = ENV.float('LOOP_LAG_THRESHOLD', default=0.1)  # Seconds
+
 RUNNING = ENV('RUNNING')
 if RUNNING == 'railway':
     REDIS_USERNAME = ENV('REDIS_USERNAME')
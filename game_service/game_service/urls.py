@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from game_app.views import get_metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('gam/api/v1/', include('game_app.urls'))
+    path('gam/api/v1/', include('game_app.urls')),
+    path('metrics', get_metrics, name='metrics'),
 ]
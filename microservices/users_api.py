@@ -21,6 +21,7 @@ USERS_GET_USER = 'get_user/'
 USERS_CREATE_CHARACTER = 'create_character/'
 USERS_GET_USER_CHARACTERS = 'get_user_characters/'
 USERS_UPDATE_CHAR_EXPERIENCE = 'update_char_experience/'
+USERS_RECORD_MATCHES = 'record_matches/'
 
 RUNNING = env('RUNNING')
 if RUNNING == 'railway':
@@ -93,3 +94,7 @@ def get_users_user_characters_url():
 
 def get_users_char_experience_url():
     return f'{USERS_API}{USERS_UPDATE_CHAR_EXPERIENCE}'
+
+
+def get_users_record_matches_url():
+    return f'{USERS_API}{USERS_RECORD_MATCHES}'
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users_app', '0007_charactermodel_unused_points_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchRecordModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_id', models.CharField(max_length=64, unique=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -82,3 +82,16 @@ class CharacterModel(models.Model):
     def __str__(self):
         return self.name
 
+
+
+class MatchRecordModel(models.Model):
+    """
+    Match results already applied by record_matches, so that retried batches are not counted twice.
+    """
+    match_id = models.CharField(max_length=64, unique=True, blank=False, null=False)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return self.match_id
@@ -34,3 +34,16 @@ class CharacterSerializer(serializers.ModelSerializer):
             'experience': {'read_only': True},
             'unused_points': {'read_only': True},
         }
+
+
+class MatchPlayerSerializer(serializers.Serializer):
+    username = serializers.CharField(max_length=32)
+    character = serializers.CharField(max_length=40)
+    outcome = serializers.ChoiceField(choices=['win', 'loss', 'draw'])
+    rating = serializers.IntegerField()
+    experience = serializers.IntegerField(min_value=0)
+
+
+class MatchResultSerializer(serializers.Serializer):
+    match_id = serializers.CharField(max_length=64)
+    players = MatchPlayerSerializer(many=True)
@@ -1,7 +1,12 @@
+from collections import defaultdict
+
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
 from rest_framework.generics import get_object_or_404
 
-from users_app.models import CustomUserModel, CharacterModel
+from users_app.models import CustomUserModel, CharacterModel, MatchRecordModel
+from users_app.utils import calc_experience
 
 
 class UserService:
@@ -51,3 +56,90 @@ class CharacterService:
     def get_user_characters(username):
         characters_query = CharacterModel.objects.select_related('owner').filter(owner__username=username)
         return characters_query
+
+
+class MatchService:
+    OUTCOME_FIELDS = {
+        'win': 'wins',
+        'loss': 'losses',
+        'draw': 'draws',
+    }
+
+    @staticmethod
+    def record_matches(matches):
+        """
+        Applies a batch of match results in one transaction.
+
+        Matches whose id was already recorded are skipped, so a batch can be retried safely.
+        User counters and ratings are changed with a single UPDATE of F() expressions; the
+        characters are locked and their experience is applied in order, as level-ups depend
+        on the current level.
+
+        Args:
+            matches (list): Validated MatchResultSerializer data.
+
+        Returns:
+            tuple: Lists of recorded and of duplicate match ids.
+
+        Raises:
+            IntegrityError: If a concurrent request recorded one of the matches first.
+        """
+        with transaction.atomic():
+            match_ids = [match['match_id'] for match in matches]
+            known = set(MatchRecordModel.objects.filter(match_id__in=match_ids).values_list('match_id', flat=True))
+
+            new_matches = {}
+            for match in matches:
+                if match['match_id'] not in known:
+                    new_matches.setdefault(match['match_id'], match)
+
+            duplicates = [match_id for match_id in match_ids if match_id not in new_matches]
+            if not new_matches:
+                return [], duplicates
+
+            MatchRecordModel.objects.bulk_create(
+                [MatchRecordModel(match_id=match_id) for match_id in new_matches]
+            )
+
+            user_changes = defaultdict(lambda: defaultdict(int))
+            experience_gains = defaultdict(list)
+            for match in new_matches.values():
+                for player in match['players']:
+                    changes = user_changes[player['username']]
+                    changes[MatchService.OUTCOME_FIELDS[player['outcome']]] += 1
+                    changes['rating'] += player['rating']
+                    if player['experience']:
+                        experience_gains[player['character']].append(player['experience'])
+
+            MatchService.update_users(user_changes)
+            MatchService.update_experience(experience_gains)
+
+        return list(new_matches), duplicates
+
+    @staticmethod
+    def update_users(user_changes):
+        updates = {}
+        for field in ('wins', 'losses', 'draws', 'rating'):
+            whens = [
+                When(username=username, then=Value(changes[field]))
+                for username, changes in user_changes.items() if changes[field]
+            ]
+            if whens:
+                updates[field] = F(field) + Case(*whens, default=Value(0), output_field=IntegerField())
+
+        CustomUserModel.objects.filter(username__in=list(user_changes)).update(**updates)
+
+    @staticmethod
+    def update_experience(experience_gains):
+        if not experience_gains:
+            return
+
+        characters = list(CharacterModel.objects.select_for_update().filter(name__in=list(experience_gains)))
+        for character in characters:
+            for experience in experience_gains[character.name]:
+                character.experience, level_gain = calc_experience(character, experience)
+                if level_gain:
+                    character.level += 1
+                    character.unused_points += 5
+
+        CharacterModel.objects.bulk_update(characters, ['experience', 'level', 'unused_points'])
@@ -0,0 +1,111 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+
+from users_app.models import CharacterModel, MatchRecordModel
+
+CustomUserModel = get_user_model()
+
+
+class RecordMatchesTestCase(APITestCase):
+    """
+    Test cases for the record_matches view.
+    """
+
+    def setUp(self):
+        """Register two test users, each with a character."""
+        self.url = reverse('record_matches')
+
+        for username in ('winner', 'loser'):
+            data = {
+                'username': username,
+                'email': f'{username}@example.com',
+                'password1': 'Qecz1357',
+                'password2': 'Qecz1357',
+            }
+            self.client.post(reverse('register_user'), data, format='json')
+            CharacterModel.objects.create(
+                owner=CustomUserModel.objects.get(username=username),
+                char_type='Human',
+                name=f'{username}_char',
+            )
+
+    @staticmethod
+    def match(match_id, experience=10):
+        return {
+            'match_id': match_id,
+            'players': [
+                {'username': 'winner', 'character': 'winner_char', 'outcome': 'win',
+                 'rating': 25, 'experience': experience},
+                {'username': 'loser', 'character': 'loser_char', 'outcome': 'loss',
+                 'rating': -25, 'experience': 0},
+            ],
+        }
+
+    def test_record_batch(self):
+        """
+        Test applying several matches in one request.
+        Expected: 200 OK, counters, ratings and experience of every match applied.
+        """
+        matches = [self.match('m1'), self.match('m2')]
+        response = self.client.post(self.url, {'matches': matches}, format='json')
+
+        with self.subTest('Check response status'):
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['recorded'] == ['m1', 'm2']
+            assert response.data['duplicates'] == []
+
+        winner = CustomUserModel.objects.get(username='winner')
+        loser = CustomUserModel.objects.get(username='loser')
+        with self.subTest('Check users'):
+            assert (winner.wins, winner.losses, winner.rating) == (2, 0, 1050)
+            assert (loser.wins, loser.losses, loser.rating) == (0, 2, 950)
+
+        with self.subTest('Check experience'):
+            assert CharacterModel.objects.get(name='winner_char').experience == 20
+            assert CharacterModel.objects.get(name='loser_char').experience == 0
+
+    def test_record_is_idempotent(self):
+        """
+        Test sending the same match id twice, also within one batch.
+        Expected: 200 OK, the match applied once and reported as duplicate afterwards.
+        """
+        self.client.post(self.url, {'matches': [self.match('m1'), self.match('m1')]}, format='json')
+        response = self.client.post(self.url, {'matches': [self.match('m1')]}, format='json')
+
+        with self.subTest('Check response data'):
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['recorded'] == []
+            assert response.data['duplicates'] == ['m1']
+
+        with self.subTest('Check users'):
+            assert CustomUserModel.objects.get(username='winner').wins == 1
+            assert MatchRecordModel.objects.count() == 1
+
+    def test_level_up(self):
+        """
+        Test experience crossing the next level threshold.
+        Expected: level and unused points increased.
+        """
+        self.client.post(self.url, {'matches': [self.match('m1', experience=100)]}, format='json')
+        character = CharacterModel.objects.get(name='winner_char')
+
+        with self.subTest('Check level'):
+            assert character.level == 2
+            assert character.unused_points == 17
+
+    def test_invalid_batch(self):
+        """
+        Test a match with an unknown outcome.
+        Expected: 400 Bad Request and nothing applied.
+        """
+        match = self.match('m1')
+        match['players'][0]['outcome'] = 'surrender'
+        response = self.client.post(self.url, {'matches': [match]}, format='json')
+
+        with self.subTest('Check response status'):
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        with self.subTest('Check nothing recorded'):
+            assert MatchRecordModel.objects.count() == 0
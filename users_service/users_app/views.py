@@ -2,6 +2,7 @@ import logging
 
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.generics import get_object_or_404
@@ -10,8 +11,8 @@ from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 
 from users_app.models import CustomUserModel, CharacterModel
-from users_app.serializers import CustomUserSerializer, CharacterSerializer
-from users_app.services import UserService, CharacterService
+from users_app.serializers import CustomUserSerializer, CharacterSerializer, MatchResultSerializer
+from users_app.services import UserService, CharacterService, MatchService
 from users_app.utils import get_auth_user, auth_service, calc_experience
 
 logger = logging.getLogger('game_server')
@@ -274,6 +275,33 @@ def update_char_experience(request):
     return Response(data=data, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+def record_matches(request):
+    """
+    API endpoint applying a batch of match results atomically.
+
+    Expects {'matches': [{'match_id': ..., 'players': [...]}, ...]}; every player carries
+    username, character, outcome ('win', 'loss' or 'draw'), rating change and experience gained.
+    Matches already recorded are reported as duplicates and not applied again.
+    """
+    serializer = MatchResultSerializer(data=request.data.get('matches'), many=True)
+    if not serializer.is_valid():
+        return Response(data={'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        recorded, duplicates = MatchService.record_matches(serializer.validated_data)
+    except IntegrityError:
+        # A concurrent request recorded some of these matches, the batch can be retried
+        return Response(data={'error': 'Conflicting match ids, retry'}, status=status.HTTP_409_CONFLICT)
+
+    logger.debug(f'Recorded matches: {len(recorded)}, duplicates: {len(duplicates)}')
+    data = {
+        'recorded': recorded,
+        'duplicates': duplicates,
+    }
+    return Response(data=data, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def get_rating(request):
     users = CustomUserModel.objects.all().order_by('-rating')